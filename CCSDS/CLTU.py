@@ -12,9 +12,13 @@
 # General Public License for more details.                                    *
 #******************************************************************************
 # CCSDS Stack - CLTU Handling Module                                          *
+# encodeCltuBatch() and decodeCltuBatch() process many equally sized frames   *
+# or CLTUs as rows of NumPy arrays.                                           *
+# CltuSynchroniser extracts CLTUs from a continuous byte stream.              *
+# Single bit errors per code block can optionally be corrected.               *
 #******************************************************************************
 import array
-import UTIL.BCH
+import UTIL.BATCH, UTIL.BCH
 
 #############
 # constants #
@@ -32,100 +36,217 @@ CLTU_TRAILER_SEQUENCE_SIZE = len(CLTU_TRAILER_SEQUENCE)
 # derived constants
 BCH_NETTO_SIZE = UTIL.BCH.CODE_BLOCK_SIZE - 1
 BCH_MAX_NETTO_INDEX = BCH_NETTO_SIZE - 1
+CLTU_START_STRING = str(bytearray(CLTU_START_SEQUENCE))
+CLTU_TRAILER_STRING = str(bytearray(CLTU_TRAILER_SEQUENCE))
+# maximum TC frame size (CCSDS 232.0) and related number of code blocks
+TC_FRAME_MAX_SIZE = 1024
+CLTU_MAX_CODE_BLOCKS = (TC_FRAME_MAX_SIZE + BCH_MAX_NETTO_INDEX) / BCH_NETTO_SIZE
+# states of the CLTU synchroniser
+CLTU_SEARCH_START = 0
+CLTU_DECODE_BODY = 1
+
+###########
+# classes #
+###########
+# =============================================================================
+class CltuSynchroniser(object):
+  """
+  extracts TC frames from a continuous stream of bytes,
+  the stream can be passed in chunks of arbitrary size
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self, maxCodeBlocks=CLTU_MAX_CODE_BLOCKS, correctErrors=False):
+    """initialise the synchroniser in the start sequence search state"""
+    self.maxCodeBlocks = maxCodeBlocks
+    self.correctErrors = correctErrors
+    self.cltuCounter = 0
+    self.errorCounter = 0
+    self.correctedCounter = 0
+    self.reset()
+  # ---------------------------------------------------------------------------
+  def reset(self):
+    """discards unprocessed bytes and searches for the next start sequence"""
+    self.buffer = bytearray()
+    self.state = CLTU_SEARCH_START
+    self.frameBytes = bytearray()
+  # ---------------------------------------------------------------------------
+  def pushData(self, data):
+    """
+    consumes the next chunk of the byte stream,
+    returns the list of TC frames that are completed by this chunk,
+    the frames might contain additional fill bytes like in decodeCltu
+    """
+    self.buffer.extend(data)
+    buffer = self.buffer
+    bufferSize = len(buffer)
+    frames = []
+    pos = 0
+    while True:
+      if self.state == CLTU_SEARCH_START:
+        startPos = buffer.find(CLTU_START_STRING, pos)
+        if startPos < 0:
+          # keep the bytes that might be the beginning of a start sequence
+          pos = max(pos, bufferSize - CLTU_START_SEQUENCE_SIZE + 1)
+          break
+        pos = startPos + CLTU_START_SEQUENCE_SIZE
+        self.state = CLTU_DECODE_BODY
+        self.frameBytes = bytearray()
+        continue
+      # decode the next complete code block
+      nextPos = pos + UTIL.BCH.CODE_BLOCK_SIZE
+      if nextPos > bufferSize:
+        break
+      if buffer[pos:nextPos] == CLTU_TRAILER_STRING:
+        # end of the CLTU
+        frames.append(array.array("B", str(self.frameBytes)))
+        self.cltuCounter += 1
+        self.state = CLTU_SEARCH_START
+        pos = nextPos
+        continue
+      if len(self.frameBytes) >= self.maxCodeBlocks * BCH_NETTO_SIZE or \
+         not self.checkCodeBlock(buffer, pos):
+        # corrupted code block or missing trailer: the CLTU is discarded,
+        # the search continues inside the rejected code block
+        self.errorCounter += 1
+        self.state = CLTU_SEARCH_START
+        continue
+      self.frameBytes += buffer[pos:pos + BCH_NETTO_SIZE]
+      pos = nextPos
+    # only the unprocessed bytes are kept
+    del buffer[:pos]
+    return frames
+  # ---------------------------------------------------------------------------
+  def checkCodeBlock(self, buffer, pos):
+    """checks and optionally corrects the code block at pos"""
+    code = UTIL.BCH.encodeCodeBlock(buffer, pos)
+    if code == buffer[pos + BCH_NETTO_SIZE]:
+      return True
+    if not self.correctErrors:
+      return False
+    result = UTIL.BCH.correctCodeBlock(buffer, pos)
+    if result == UTIL.BCH.CODE_BLOCK_UNCORRECTABLE:
+      return False
+    if result == UTIL.BCH.CODE_BLOCK_CORRECTED:
+      self.correctedCounter += 1
+    return True
 
 #############
 # functions #
 #############
+# -----------------------------------------------------------------------------
+def extractCltuFrames(chunks, maxCodeBlocks=CLTU_MAX_CODE_BLOCKS,
+                      correctErrors=False):
+  """
+  generator that yields the TC frames of the CLTUs in an iterable of
+  byte chunks (e.g. socket reads or blocks of a recorded uplink file)
+  """
+  synchroniser = CltuSynchroniser(maxCodeBlocks, correctErrors)
+  for chunk in chunks:
+    for frame in synchroniser.pushData(chunk):
+      yield frame
+
 # -----------------------------------------------------------------------------
 def encodeCltu(frame):
   """Converts a TC Frame into a CLTU"""
-  # iterate over the frame bytes, which are copied
-  # into the CLTU body together with BCH code bytes
-  frameIdx = 0
+  # the frame bytes are filled up to complete code blocks
   frameSize = len(frame)
   nrCltuCodeBlocks = (frameSize + BCH_MAX_NETTO_INDEX) / BCH_NETTO_SIZE
+  nettoSize = nrCltuCodeBlocks * BCH_NETTO_SIZE
+  netto = array.array("B", frame)
+  netto.extend([CLTU_FILL_BYTE] * (nettoSize - frameSize))
+  # the BCH code of each code block is calculated in one step
+  codes = array.array("B", [UTIL.BCH.encodeCodeBlock(netto, nettoIdx)
+                            for nettoIdx in xrange(0, nettoSize, BCH_NETTO_SIZE)])
+  # the netto bytes and codes are copied with strided slice assignments
   cltuBodySize = nrCltuCodeBlocks * UTIL.BCH.CODE_BLOCK_SIZE
   cltuBody = array.array("B", "\0" * cltuBodySize)
-  cltuBodyIdx = 0
-  codeBlkIdx = 0
-  while frameIdx < frameSize:
-    # handle start of a code block
-    if codeBlkIdx == 0:
-      sreg = UTIL.BCH.encodeStart()
-    # take the next byte from the frame for the CLTU and the BCH encoding
-    nextByte = frame[frameIdx]
-    cltuBody[cltuBodyIdx] = nextByte
-    sreg = UTIL.BCH.encodeStep(sreg, nextByte)
-    frameIdx += 1
-    cltuBodyIdx += 1
-    codeBlkIdx += 1
-    # handle end of a code block
-    if codeBlkIdx >= BCH_NETTO_SIZE:
-      code = UTIL.BCH.encodeStop(sreg)
-      cltuBody[cltuBodyIdx] = code
-      cltuBodyIdx += 1
-      codeBlkIdx = 0
-  # fill up remaining bytes in the cltuBody (incl. BCH code byte)
-  while cltuBodyIdx < cltuBodySize:
-    nextByte = CLTU_FILL_BYTE
-    cltuBody[cltuBodyIdx] = nextByte
-    sreg = UTIL.BCH.encodeStep(sreg, nextByte)
-    cltuBodyIdx += 1
-    codeBlkIdx += 1
-    # handle end of the code block
-    if codeBlkIdx >= BCH_NETTO_SIZE:
-      code = UTIL.BCH.encodeStop(sreg)
-      cltuBody[cltuBodyIdx] = code
-      cltuBodyIdx += 1
+  for codeBlkIdx in xrange(BCH_NETTO_SIZE):
+    cltuBody[codeBlkIdx::UTIL.BCH.CODE_BLOCK_SIZE] = \
+      netto[codeBlkIdx::BCH_NETTO_SIZE]
+  cltuBody[BCH_NETTO_SIZE::UTIL.BCH.CODE_BLOCK_SIZE] = codes
   # CLTU body is completely processed
   return (array.array("B", CLTU_START_SEQUENCE) +
           cltuBody +
           array.array("B", CLTU_TRAILER_SEQUENCE))
 # -----------------------------------------------------------------------------
-def decodeCltu(cltu):
-  """Converts a CLTU into a TC Frame"""
-  # Note: the returned frame might contain additional fill bytes,
-  #       these bytes must be removed at the frame layer
-  # calculate the frame size from the CLTU size
+def getCltuBody(cltu):
+  """
+  checks the general CLTU properties,
+  returns a copy of the CLTU body (code blocks) or None
+  """
   cltuSize = len(cltu)
   cltuBodySize = cltuSize - CLTU_START_SEQUENCE_SIZE - CLTU_TRAILER_SEQUENCE_SIZE
-  # check general CLTU properties
   if cltuBodySize < 0:
     return None
   if cltuBodySize % UTIL.BCH.CODE_BLOCK_SIZE != 0:
     return None
+  if not isinstance(cltu, array.array):
+    cltu = array.array("B", cltu)
   if cltu[:CLTU_START_SEQUENCE_SIZE] != array.array("B", CLTU_START_SEQUENCE):
     return None
   if cltu[-CLTU_TRAILER_SEQUENCE_SIZE:] != array.array("B", CLTU_TRAILER_SEQUENCE):
     return None
-  # iterate over the CLTU body bytes, which are copied
-  # into the frame, BCH code is checked during the iteration
-  nrCltuCodeBlocks = cltuBodySize / UTIL.BCH.CODE_BLOCK_SIZE
+  return cltu[CLTU_START_SEQUENCE_SIZE:-CLTU_TRAILER_SEQUENCE_SIZE]
+# -----------------------------------------------------------------------------
+def getCltuFrame(cltuBody):
+  """copies the netto bytes of the code blocks with strided slices"""
+  nrCltuCodeBlocks = len(cltuBody) / UTIL.BCH.CODE_BLOCK_SIZE
   frameSize = nrCltuCodeBlocks * BCH_NETTO_SIZE
   frame = array.array("B", "\0" * frameSize)
-  frameIdx = 0
-  cltuIdx = CLTU_START_SEQUENCE_SIZE
-  codeBlkIdx = 0
-  while frameIdx < frameSize:
-    # handle start of a code block
-    if codeBlkIdx == 0:
-      sreg = UTIL.BCH.encodeStart()
-    # take the next byte from the CLTU for the frame and the BCH decoding
-    nextByte = cltu[cltuIdx]
-    frame[frameIdx] = nextByte
-    sreg = UTIL.BCH.encodeStep(sreg, nextByte)
-    frameIdx += 1
-    cltuIdx += 1
-    codeBlkIdx += 1
-    # handle end of a code block
-    if codeBlkIdx >= BCH_NETTO_SIZE:
-      code = UTIL.BCH.encodeStop(sreg)
-      if cltu[cltuIdx] != code:
-        return None
-      cltuIdx += 1
-      codeBlkIdx = 0
+  for codeBlkIdx in xrange(BCH_NETTO_SIZE):
+    frame[codeBlkIdx::BCH_NETTO_SIZE] = \
+      cltuBody[codeBlkIdx::UTIL.BCH.CODE_BLOCK_SIZE]
+  return frame
+# -----------------------------------------------------------------------------
+def decodeCltu(cltu, correctErrors=False):
+  """
+  Converts a CLTU into a TC Frame,
+  correctErrors enables the single bit error correction per code block
+  """
+  # Note: the returned frame might contain additional fill bytes,
+  #       these bytes must be removed at the frame layer
+  if correctErrors:
+    frame, nrCorrected, nrUncorrectable = decodeCltuCorrected(cltu)
+    return frame
+  cltuBody = getCltuBody(cltu)
+  if cltuBody == None:
+    return None
+  # the BCH code is checked per code block
+  frame = getCltuFrame(cltuBody)
+  codes = cltuBody[BCH_NETTO_SIZE::UTIL.BCH.CODE_BLOCK_SIZE]
+  codeIdx = 0
+  for frameIdx in xrange(0, len(frame), BCH_NETTO_SIZE):
+    if UTIL.BCH.encodeCodeBlock(frame, frameIdx) != codes[codeIdx]:
+      return None
+    codeIdx += 1
   return frame
 # -----------------------------------------------------------------------------
+def decodeCltuCorrected(cltu):
+  """
+  Converts a CLTU into a TC Frame with single bit error correction,
+  returns (frame, nrCorrected, nrUncorrectable), where the counters are
+  the number of corrected and uncorrectable code blocks,
+  frame is None if the CLTU is invalid or not correctable
+  """
+  cltuBody = getCltuBody(cltu)
+  if cltuBody == None:
+    return (None, 0, 0)
+  nrCorrected = 0
+  nrUncorrectable = 0
+  for cltuIdx in xrange(0, len(cltuBody), UTIL.BCH.CODE_BLOCK_SIZE):
+    code = UTIL.BCH.encodeCodeBlock(cltuBody, cltuIdx)
+    if code == cltuBody[cltuIdx + BCH_NETTO_SIZE]:
+      continue
+    # the CLTU body is a copy and can be corrected in place
+    result = UTIL.BCH.correctCodeBlock(cltuBody, cltuIdx)
+    if result == UTIL.BCH.CODE_BLOCK_CORRECTED:
+      nrCorrected += 1
+    elif result == UTIL.BCH.CODE_BLOCK_UNCORRECTABLE:
+      nrUncorrectable += 1
+  if nrUncorrectable > 0:
+    return (None, nrCorrected, nrUncorrectable)
+  return (getCltuFrame(cltuBody), nrCorrected, nrUncorrectable)
+# -----------------------------------------------------------------------------
 def checkCltu(cltu):
   """Checks the consistency of a CLTU"""
   # calculate the frame size from the CLTU size
@@ -143,25 +264,72 @@ def checkCltu(cltu):
   for i in range(-CLTU_TRAILER_SEQUENCE_SIZE, 0):
     if cltu[i] != CLTU_TRAILER_SEQUENCE[i]:
       return False, "wrong cltu trailer sequence"
-  # iterate over the CLTU body bytes and check the BCH code
-  nrCltuCodeBlocks = cltuBodySize / UTIL.BCH.CODE_BLOCK_SIZE
-  frameSize = nrCltuCodeBlocks * BCH_NETTO_SIZE
+  # iterate over the CLTU code blocks and check the BCH code
   cltuIdx = CLTU_START_SEQUENCE_SIZE
-  codeBlkIdx = 0
   while cltuIdx < cltuTrailerStartIdx:
-    # handle start of a code block
-    if codeBlkIdx == 0:
-      sreg = UTIL.BCH.encodeStart()
-    # take the next byte from the CLTU for the frame and the BCH decoding
-    nextByte = cltu[cltuIdx]
-    sreg = UTIL.BCH.encodeStep(sreg, nextByte)
-    cltuIdx += 1
-    codeBlkIdx += 1
-    # handle end of a code block
-    if codeBlkIdx >= BCH_NETTO_SIZE:
-      code = UTIL.BCH.encodeStop(sreg)
-      if cltu[cltuIdx] != code:
-        return False, "wrong BCH check byte"
-      cltuIdx += 1
-      codeBlkIdx = 0
+    code = UTIL.BCH.encodeCodeBlock(cltu, cltuIdx)
+    if cltu[cltuIdx + BCH_NETTO_SIZE] != code:
+      return False, "wrong BCH check byte"
+    cltuIdx += UTIL.BCH.CODE_BLOCK_SIZE
   return True, "cltu OK"
+# -----------------------------------------------------------------------------
+def encodeCltuBatch(frames):
+  """
+  Converts the rows of an N x frameSize uint8 NumPy array of equally sized
+  TC Frames into an N x cltuSize uint8 array of CLTUs
+  """
+  UTIL.BATCH.checkNumpy()
+  numpy = UTIL.BATCH.numpy
+  frames = numpy.asarray(frames, dtype=numpy.uint8)
+  if frames.ndim != 2:
+    raise ValueError("frames must be a N x frameSize array")
+  nrFrames, frameSize = frames.shape
+  nrCltuCodeBlocks = (frameSize + BCH_MAX_NETTO_INDEX) / BCH_NETTO_SIZE
+  nettoSize = nrCltuCodeBlocks * BCH_NETTO_SIZE
+  cltuBodySize = nrCltuCodeBlocks * UTIL.BCH.CODE_BLOCK_SIZE
+  cltuSize = CLTU_START_SEQUENCE_SIZE + cltuBodySize + CLTU_TRAILER_SEQUENCE_SIZE
+  cltus = numpy.empty((nrFrames, cltuSize), dtype=numpy.uint8)
+  cltus[:, :CLTU_START_SEQUENCE_SIZE] = CLTU_START_SEQUENCE
+  cltus[:, cltuSize - CLTU_TRAILER_SEQUENCE_SIZE:] = CLTU_TRAILER_SEQUENCE
+  # the CLTU body is viewed as N x nrCltuCodeBlocks x 8 array
+  codeBlocks = cltus[:, CLTU_START_SEQUENCE_SIZE:
+                        CLTU_START_SEQUENCE_SIZE + cltuBodySize].reshape(
+    nrFrames, nrCltuCodeBlocks, UTIL.BCH.CODE_BLOCK_SIZE)
+  netto = numpy.empty((nrFrames, nettoSize), dtype=numpy.uint8)
+  netto[:, :frameSize] = frames
+  netto[:, frameSize:] = CLTU_FILL_BYTE
+  codeBlocks[:, :, :BCH_NETTO_SIZE] = netto.reshape(
+    nrFrames, nrCltuCodeBlocks, BCH_NETTO_SIZE)
+  codeBlocks[:, :, BCH_NETTO_SIZE] = \
+    UTIL.BCH.encodeBatch(codeBlocks[:, :, :BCH_NETTO_SIZE])
+  return cltus
+# -----------------------------------------------------------------------------
+def decodeCltuBatch(cltus):
+  """
+  Converts the rows of an N x cltuSize uint8 NumPy array of equally sized
+  CLTUs into TC Frames, returns (frames, valid):
+  frames is an N x frameSize uint8 array (incl. fill bytes),
+  valid is a boolean array that flags the correctly decoded frames
+  """
+  UTIL.BATCH.checkNumpy()
+  numpy = UTIL.BATCH.numpy
+  cltus = numpy.asarray(cltus, dtype=numpy.uint8)
+  if cltus.ndim != 2:
+    raise ValueError("cltus must be a N x cltuSize array")
+  nrCltus, cltuSize = cltus.shape
+  cltuBodySize = cltuSize - CLTU_START_SEQUENCE_SIZE - CLTU_TRAILER_SEQUENCE_SIZE
+  if cltuBodySize < 0 or cltuBodySize % UTIL.BCH.CODE_BLOCK_SIZE != 0:
+    raise ValueError("wrong cltuBodySize")
+  nrCltuCodeBlocks = cltuBodySize / UTIL.BCH.CODE_BLOCK_SIZE
+  codeBlocks = cltus[:, CLTU_START_SEQUENCE_SIZE:
+                        CLTU_START_SEQUENCE_SIZE + cltuBodySize].reshape(
+    nrCltus, nrCltuCodeBlocks, UTIL.BCH.CODE_BLOCK_SIZE)
+  netto = codeBlocks[:, :, :BCH_NETTO_SIZE]
+  codes = UTIL.BCH.encodeBatch(netto)
+  valid = (codes == codeBlocks[:, :, BCH_NETTO_SIZE]).all(axis=1)
+  valid &= (cltus[:, :CLTU_START_SEQUENCE_SIZE] ==
+            CLTU_START_SEQUENCE).all(axis=1)
+  valid &= (cltus[:, cltuSize - CLTU_TRAILER_SEQUENCE_SIZE:] ==
+            CLTU_TRAILER_SEQUENCE).all(axis=1)
+  frames = netto.reshape(nrCltus, nrCltuCodeBlocks * BCH_NETTO_SIZE)
+  return frames, valid
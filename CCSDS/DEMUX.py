@@ -0,0 +1,286 @@
+#******************************************************************************
+# (C) 2017, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under the terms of the GNU Lesser General Public License as       *
+# published by the Free Software Foundation; either version 2.1 of the        *
+# License, or (at your option) any later version.                             *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser     *
+# General Public License for more details.                                    *
+#******************************************************************************
+# CCSDS Stack - TM Frame Demultiplexer                                        *
+# Extracts the TM packets from a stream of TM or AOS transfer frames. Packets *
+# that span several frames are reassembled per virtual channel, the frame     *
+# header is decoded directly from the bytes to keep the per frame overhead    *
+# small.                                                                      *
+#******************************************************************************
+import CCSDS.FRAME, CCSDS.PACKET
+import UTIL.CRC
+from UTIL.DU import BinaryUnit
+
+#############
+# constants #
+#############
+IDLE_PACKET_APID = 0x7FF
+VC_FRAME_COUNT_MODULO = 256
+# reasons for a discontinuity of the packet stream
+FRAME_COUNT_GAP = "frame count gap"
+FRAME_CRC_ERROR = "frame CRC error"
+FHP_MISMATCH = "firstHeaderPointer mismatch"
+
+###########
+# classes #
+###########
+# =============================================================================
+class VirtualChannelReassembly(object):
+  """reassembly state of a virtual channel"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, virtualChannelId):
+    """initialise an unsynchronised virtual channel"""
+    self.virtualChannelId = virtualChannelId
+    # expected VC frame count of the next frame, None before the first frame
+    self.nextFrameCount = None
+    # the packet stream is only synchronised after a firstHeaderPointer
+    self.synchronised = False
+    # bytes of the packet that continues in the next frame
+    self.packetBuffer = bytearray()
+  # ---------------------------------------------------------------------------
+  def resynchronise(self):
+    """drops the incomplete packet, the next packet start synchronises"""
+    self.synchronised = False
+    del self.packetBuffer[:]
+
+# =============================================================================
+class TMframeDemultiplexer(object):
+  """streaming extraction of TM packets from TM frames"""
+  # ---------------------------------------------------------------------------
+  def __init__(self,
+               enableSecondaryHeader=False,
+               packetFactory=None,
+               idlePacketAPID=IDLE_PACKET_APID,
+               checkCRC=CCSDS.FRAME.CRC_CHECK):
+    """
+    packetFactory creates a packet object from the packet bytes,
+    e.g. PUS.PACKET.TMpacket, default is CCSDS.PACKET.TMpacket
+    """
+    if packetFactory == None:
+      packetFactory = CCSDS.PACKET.TMpacket
+    self.packetFactory = packetFactory
+    self.idlePacketAPID = idlePacketAPID
+    self.checkCRC = checkCRC
+    self.dataFieldPos = CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_BYTE_SIZE
+    if enableSecondaryHeader:
+      self.dataFieldPos += CCSDS.FRAME.TM_FRAME_SECONDARY_HEADER_BYTE_SIZE
+    self.frameCountModulo = VC_FRAME_COUNT_MODULO
+    self.virtualChannels = {}
+    self.resetCounters()
+  # ---------------------------------------------------------------------------
+  def resetCounters(self):
+    """resets the statistics counters"""
+    self.frameCounter = 0
+    self.idleFrameCounter = 0
+    self.packetCounter = 0
+    self.idlePacketCounter = 0
+    self.discontinuityCounter = 0
+    self.crcErrorCounter = 0
+  # ---------------------------------------------------------------------------
+  def reset(self):
+    """drops all reassembly states"""
+    self.virtualChannels = {}
+  # ---------------------------------------------------------------------------
+  def getVirtualChannel(self, virtualChannelId):
+    """returns the reassembly state of a virtual channel"""
+    virtualChannel = self.virtualChannels.get(virtualChannelId)
+    if virtualChannel == None:
+      virtualChannel = VirtualChannelReassembly(virtualChannelId)
+      self.virtualChannels[virtualChannelId] = virtualChannel
+    return virtualChannel
+  # ---------------------------------------------------------------------------
+  def pushFrame(self, frame):
+    """
+    consumes a frame (binary string, bytearray, memoryview or frame data
+    unit), returns the list of TM packets that are completed by this frame
+    """
+    # the frame bytes are only read (the packets are created from slices),
+    # a bytearray is used directly, all other frames are copied once
+    if isinstance(frame, BinaryUnit):
+      if type(frame.buffer) == bytearray and frame.bufferOffset == 0 and \
+         len(frame.buffer) == frame.usedBufferSize:
+        frame = frame.buffer
+      else:
+        frame = frame.getMemoryView()
+    if type(frame) != bytearray:
+      frame = bytearray(frame)
+    self.frameCounter += 1
+    dataFieldEndPos = len(frame)
+    if self.checkCRC:
+      dataFieldEndPos -= 2
+      crc = (frame[dataFieldEndPos] << 8) | frame[dataFieldEndPos + 1]
+      if UTIL.CRC.calculate(memoryview(frame)[:dataFieldEndPos]) != crc:
+        # the header is not trustworthy ---> the VC is not known, the
+        # frame count gap of the next frame leads to the resynchronisation
+        self.crcErrorCounter += 1
+        self.notifyDiscontinuity(None, FRAME_CRC_ERROR)
+        return []
+    virtualChannelId, frameCount, firstHeaderPointer, dataFieldEndPos = \
+      self.decodeFrameHeader(frame, dataFieldEndPos)
+    # frame continuity
+    virtualChannel = self.virtualChannels.get(virtualChannelId)
+    if virtualChannel == None:
+      virtualChannel = self.getVirtualChannel(virtualChannelId)
+    elif virtualChannel.nextFrameCount != frameCount:
+      self.resynchronise(virtualChannel, FRAME_COUNT_GAP)
+    virtualChannel.nextFrameCount = (frameCount + 1) % self.frameCountModulo
+    if firstHeaderPointer == CCSDS.FRAME.FHP_IDLE_FRAME:
+      self.idleFrameCounter += 1
+      return []
+    packets = []
+    dataFieldPos = self.dataFieldPos
+    if firstHeaderPointer == CCSDS.FRAME.FHP_NO_PACKET_START:
+      if virtualChannel.synchronised:
+        # the whole data field continues the pending packet
+        if not self.continuePacket(virtualChannel, frame, dataFieldPos,
+                                   dataFieldEndPos, packets):
+          self.resynchronise(virtualChannel, FHP_MISMATCH)
+      return packets
+    packetPos = dataFieldPos + firstHeaderPointer
+    if packetPos > dataFieldEndPos:
+      self.resynchronise(virtualChannel, FHP_MISMATCH)
+      return packets
+    if virtualChannel.synchronised:
+      # the bytes before the first packet header complete the pending packet
+      if not self.continuePacket(virtualChannel, frame, dataFieldPos,
+                                 packetPos, packets) or \
+         len(virtualChannel.packetBuffer) > 0:
+        self.resynchronise(virtualChannel, FHP_MISMATCH)
+    virtualChannel.synchronised = True
+    self.extractPackets(virtualChannel, frame, packetPos, dataFieldEndPos,
+                        packets)
+    return packets
+  # ---------------------------------------------------------------------------
+  def decodeFrameHeader(self, frame, dataFieldEndPos):
+    """
+    returns the virtualChannelId, the frame count, the firstHeaderPointer
+    and the data field end position (before the OCF) of a TM frame
+    """
+    if frame[1] & 0x01:
+      # operational control field
+      dataFieldEndPos -= CCSDS.FRAME.CLCW_BYTE_SIZE
+    return ((frame[1] >> 1) & 0x07,
+            frame[3],
+            ((frame[4] & 0x07) << 8) | frame[5],
+            dataFieldEndPos)
+  # ---------------------------------------------------------------------------
+  def continuePacket(self, virtualChannel, frame, bytePos, endPos, packets):
+    """
+    appends frame bytes to the pending packet of the virtual channel,
+    returns False if the pending packet ends before endPos
+    """
+    packetBuffer = virtualChannel.packetBuffer
+    if bytePos == endPos:
+      return True
+    if len(packetBuffer) == 0:
+      # no pending packet, but the data do not start with a packet header
+      return False
+    headerSize = CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE
+    if len(packetBuffer) < headerSize:
+      # complete the packet header first
+      nextPos = min(bytePos + headerSize - len(packetBuffer), endPos)
+      packetBuffer += frame[bytePos:nextPos]
+      bytePos = nextPos
+      if len(packetBuffer) < headerSize:
+        return True
+    packetSize = ((packetBuffer[4] << 8) | packetBuffer[5]) + 7
+    nextPos = min(bytePos + packetSize - len(packetBuffer), endPos)
+    packetBuffer += frame[bytePos:nextPos]
+    if len(packetBuffer) == packetSize:
+      virtualChannel.packetBuffer = bytearray()
+      self.emitPacket(packetBuffer, packets)
+    return nextPos == endPos
+  # ---------------------------------------------------------------------------
+  def extractPackets(self, virtualChannel, frame, bytePos, endPos, packets):
+    """
+    extracts the packets that start in the frame, the last packet is
+    buffered when it continues in the next frame
+    """
+    headerEndOffset = CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE - 1
+    while bytePos < endPos:
+      if bytePos + headerEndOffset >= endPos:
+        # the packet header continues in the next frame
+        virtualChannel.packetBuffer = frame[bytePos:endPos]
+        return
+      packetEndPos = bytePos + \
+                     ((frame[bytePos + 4] << 8) | frame[bytePos + 5]) + 7
+      if packetEndPos > endPos:
+        # the packet continues in the next frame
+        virtualChannel.packetBuffer = frame[bytePos:endPos]
+        return
+      self.emitPacket(frame[bytePos:packetEndPos], packets)
+      bytePos = packetEndPos
+  # ---------------------------------------------------------------------------
+  def emitPacket(self, packetData, packets):
+    """creates a packet from the completed packet bytes"""
+    if ((packetData[0] & 0x07) << 8) | packetData[1] == self.idlePacketAPID:
+      self.idlePacketCounter += 1
+      return
+    self.packetCounter += 1
+    packets.append(self.packetFactory(packetData))
+  # ---------------------------------------------------------------------------
+  def resynchronise(self, virtualChannel, reason):
+    """drops the pending packet after an inconsistency"""
+    self.discontinuityCounter += 1
+    virtualChannel.resynchronise()
+    self.notifyDiscontinuity(virtualChannel.virtualChannelId, reason)
+  # ---------------------------------------------------------------------------
+  def notifyDiscontinuity(self, virtualChannelId, reason):
+    """discontinuity of the packet stream: hook for derived classes"""
+    pass
+
+# =============================================================================
+class AOSframeDemultiplexer(TMframeDemultiplexer):
+  """streaming extraction of TM packets from the M_PDUs of AOS frames"""
+  # ---------------------------------------------------------------------------
+  def __init__(self,
+               insertZoneSize=0,
+               packetFactory=None,
+               idlePacketAPID=IDLE_PACKET_APID,
+               checkCRC=CCSDS.FRAME.CRC_CHECK,
+               operationalControlField=True):
+    """
+    the insert zone size and the presence of the operational control field
+    are managed parameters of the physical channel
+    """
+    TMframeDemultiplexer.__init__(self,
+                                  packetFactory=packetFactory,
+                                  idlePacketAPID=idlePacketAPID,
+                                  checkCRC=checkCRC)
+    self.mpduPos = CCSDS.FRAME.AOS_FRAME_PRIMARY_HEADER_BYTE_SIZE + \
+                   insertZoneSize
+    self.dataFieldPos = self.mpduPos + CCSDS.FRAME.MPDU_HEADER_BYTE_SIZE
+    self.frameCountModulo = CCSDS.FRAME.AOS_VC_FRAME_COUNT_MODULO
+    if operationalControlField:
+      self.trailerSize = CCSDS.FRAME.CLCW_BYTE_SIZE
+    else:
+      self.trailerSize = 0
+  # ---------------------------------------------------------------------------
+  def decodeFrameHeader(self, frame, dataFieldEndPos):
+    """
+    returns the virtualChannelId, the 24 bit frame count, the M_PDU
+    firstHeaderPointer and the packet zone end position of an AOS frame
+    """
+    virtualChannelId = frame[1] & 0x3F
+    frameCount = (frame[2] << 16) | (frame[3] << 8) | frame[4]
+    if virtualChannelId == CCSDS.FRAME.AOS_IDLE_VIRTUAL_CHANNEL_ID:
+      # idle frame without M_PDU
+      return (virtualChannelId,
+              frameCount,
+              CCSDS.FRAME.FHP_IDLE_FRAME,
+              dataFieldEndPos)
+    mpduPos = self.mpduPos
+    return (virtualChannelId,
+            frameCount,
+            ((frame[mpduPos] & 0x07) << 8) | frame[mpduPos + 1],
+            dataFieldEndPos - self.trailerSize)
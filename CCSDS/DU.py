@@ -17,7 +17,7 @@
 #******************************************************************************
 from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit
 import CCSDS.TIME
-import UTIL.CRC
+import UTIL.BATCH, UTIL.CRC
 
 #############
 # constants #
@@ -29,6 +29,7 @@ CRC_BYTE_SIZE = 2
 ###########
 class DataUnit(BinaryUnit):
   """binary CCSDS data based unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None, attributesSize1=0, attributeMap1=None, attributesSize2=0, attributeMap2=None):
     """initialise the date structure with binaryString and attribute maps"""
@@ -36,25 +37,44 @@ class DataUnit(BinaryUnit):
   # ---------------------------------------------------------------------------
   def getTime(self, bytePos, timeFormat):
     """extracts a time"""
-    byteSize = CCSDS.TIME.byteArraySize(timeFormat)
-    timeData = self.getBytes(bytePos, byteSize)
-    timeDU = CCSDS.TIME.createCCSDS(timeData, timeFormat)
-    return CCSDS.TIME.convertFromCCSDS(timeDU, timeFormat)
+    self.checkTimePos(bytePos, timeFormat)
+    return CCSDS.TIME.unpackTime(self.buffer,
+                                 self.bufferOffset + bytePos,
+                                 timeFormat)
   # ---------------------------------------------------------------------------
   def setTime(self, bytePos, timeFormat, value):
     """set a time"""
-    timeDU = CCSDS.TIME.convertToCCSDS(value, timeFormat)
-    byteSize = len(timeDU)
-    timeData = timeDU.getBufferString()
-    self.setBytes(bytePos, byteSize, timeData)
+    self.checkTimePos(bytePos, timeFormat)
+    CCSDS.TIME.packTime(self.buffer,
+                        self.bufferOffset + bytePos,
+                        value,
+                        timeFormat)
+  # ---------------------------------------------------------------------------
+  def checkTime(self, bytePos, timeFormat, value):
+    """consistency checks for setTime"""
+    self.checkTimePos(bytePos, timeFormat)
+    # the time is converted into a scratch buffer with the same checks
+    scratch = bytearray(CCSDS.TIME.byteArraySize(timeFormat))
+    CCSDS.TIME.packTime(scratch, 0, value, timeFormat)
+  # ---------------------------------------------------------------------------
+  def checkTimePos(self, bytePos, timeFormat):
+    """consistency checks for time access"""
+    byteSize = CCSDS.TIME.byteArraySize(timeFormat)
+    if byteSize == None:
+      raise ValueError("invalid time format")
+    if bytePos < 0:
+      raise IndexError("invalid bytePos")
+    if bytePos + byteSize > self.usedBufferSize:
+      raise IndexError("bytePos/byteLength out of buffer")
   # ---------------------------------------------------------------------------
   def setChecksum(self):
     """
     sets the checksum out of the binary data,
     buffer must be correctly initialised
     """
+    bufferOffset = self.bufferOffset
     crcPos = self.usedBufferSize - 2
-    crc = UTIL.CRC.calculate(self.buffer[0:crcPos])
+    crc = UTIL.CRC.calculate(self.buffer[bufferOffset:bufferOffset + crcPos])
     self.setUnsigned(crcPos, 2, crc)
   # ---------------------------------------------------------------------------
   def checkChecksum(self):
@@ -62,6 +82,15 @@ class DataUnit(BinaryUnit):
     checks the checksum out of the binary data,
     buffer must be correctly initialised
     """
+    bufferOffset = self.bufferOffset
     crcPos = self.usedBufferSize - 2
-    crc = UTIL.CRC.calculate(self.buffer[0:crcPos])
+    crc = UTIL.CRC.calculate(self.buffer[bufferOffset:bufferOffset + crcPos])
     return self.getUnsigned(crcPos, 2) == crc
+
+# =============================================================================
+class BatchDecoder(UTIL.BATCH.BatchDecoder):
+  """batch decoder for CCSDS data units, supports CCSDS time attributes"""
+  # ---------------------------------------------------------------------------
+  def getTimeByteSize(self, timeFormat):
+    """returns the byte size of a time field"""
+    return CCSDS.TIME.byteArraySize(timeFormat)
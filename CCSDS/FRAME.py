@@ -13,13 +13,23 @@
 #******************************************************************************
 # CCSDS Stack - Transfer Frame Module                                         *
 #******************************************************************************
-from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit
-import CCSDS.DU
+from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit, \
+                    compileBinaryUnit
+import CCSDS.DU, CCSDS.PACKET
+import UTIL.BATCH
 
 #############
 # constants #
 #############
 CRC_CHECK = True
+# special values of the firstHeaderPointer
+FHP_IDLE_FRAME = 0x7FE
+FHP_NO_PACKET_START = 0x7FF
+# AOS transfer frames
+AOS_VERSION_NUMBER = 1
+AOS_IDLE_VIRTUAL_CHANNEL_ID = 63
+AOS_MAX_SPACECRAFT_ID = 0xFF
+AOS_VC_FRAME_COUNT_MODULO = 0x1000000
 
 # =============================================================================
 # the attribute dictionaries contain for each transfer frame attribute:
@@ -47,6 +57,27 @@ TM_FRAME_SECONDARY_HEADER_ATTRIBUTES = {
   "secondaryHeaderSize":      ( 2,  6, BITS),
   "virtualChannelFCountHigh": ( 1,  3, UNSIGNED)}
 # -----------------------------------------------------------------------------
+# AOS frame primary header without the optional frame header error control,
+# the 8 bit spacecraftId and the 6 bit virtualChannelId form the VCDU-ID
+AOS_FRAME_PRIMARY_HEADER_BYTE_SIZE = 6
+AOS_FRAME_PRIMARY_HEADER_ATTRIBUTES = {
+  "versionNumber":            ( 0,  2, BITS),
+  "spacecraftId":             ( 2,  8, BITS),
+  "virtualChannelId":         (10,  6, BITS),
+  "virtualChannelFrameCount": ( 2,  3, UNSIGNED),
+  # byte 5: signaling field
+  "replayFlag":               (40,  1, BITS),
+  "vcFrameCountUsageFlag":    (41,  1, BITS),
+  "spareField":               (42,  2, BITS),
+  "vcFrameCountCycle":        (44,  4, BITS)}
+# -----------------------------------------------------------------------------
+# multiplexing protocol data unit in the data field of an AOS frame,
+# it is located after the optional insert zone
+MPDU_HEADER_BYTE_SIZE = 2
+MPDU_HEADER_ATTRIBUTES = {
+  "spareField":               ( 0,  5, BITS),
+  "firstHeaderPointer":       ( 5, 11, BITS)}
+# -----------------------------------------------------------------------------
 CLCW_BYTE_SIZE = 4
 CLCW_ATTRIBUTES = {
   "type":                     ( 0,  1, BITS),
@@ -83,8 +114,13 @@ TC_FRAME_HEADER_ATTRIBUTES = {
 # classes #
 ###########
 # =============================================================================
-class TMframe(CCSDS.DU.DataUnit):
+class TMframe(compileBinaryUnit(CCSDS.DU.DataUnit,
+    TM_FRAME_PRIMARY_HEADER_ATTRIBUTES,
+    TM_FRAME_PRIMARY_HEADER_BYTE_SIZE,
+    TM_FRAME_SECONDARY_HEADER_ATTRIBUTES,
+    optionalAttributeMap2=True)):
   """telemetry transfer frame"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None, enableSecondaryHeader=False):
     # default constructor: initialise with primary header size
@@ -110,8 +146,52 @@ class TMframe(CCSDS.DU.DataUnit):
       self.secondaryHeaderFlag = 1
 
 # =============================================================================
-class CLCW(BinaryUnit):
+class AOSframe(compileBinaryUnit(CCSDS.DU.DataUnit,
+                                 AOS_FRAME_PRIMARY_HEADER_ATTRIBUTES)):
+  """AOS transfer frame"""
+  __slots__ = ()
+  # ---------------------------------------------------------------------------
+  def __init__(self, binaryString=None):
+    """default constructor: initialise with primary header size"""
+    CCSDS.DU.DataUnit.__init__(self,
+                               binaryString,
+                               AOS_FRAME_PRIMARY_HEADER_BYTE_SIZE,
+                               AOS_FRAME_PRIMARY_HEADER_ATTRIBUTES)
+  # ---------------------------------------------------------------------------
+  def initAttributes(self):
+    """hook for initializing attributes, delegates to parent class"""
+    CCSDS.DU.DataUnit.initAttributes(self)
+    self.versionNumber = AOS_VERSION_NUMBER
+  # ---------------------------------------------------------------------------
+  def getMPDU(self, insertZoneSize=0, trailerSize=0):
+    """
+    returns the M_PDU after the insert zone as view on the frame buffer,
+    trailerSize is the size of the OCF and the CRC at the frame end
+    """
+    mpduPos = AOS_FRAME_PRIMARY_HEADER_BYTE_SIZE + insertZoneSize
+    return MPDU(self.getBufferView(mpduPos,
+                                   len(self) - mpduPos - trailerSize))
+
+# =============================================================================
+class MPDU(compileBinaryUnit(CCSDS.DU.DataUnit, MPDU_HEADER_ATTRIBUTES)):
+  """multiplexing protocol data unit: M_PDU header + packet zone"""
+  __slots__ = ()
+  # ---------------------------------------------------------------------------
+  def __init__(self, binaryString=None):
+    """default constructor"""
+    CCSDS.DU.DataUnit.__init__(self,
+                               binaryString,
+                               MPDU_HEADER_BYTE_SIZE,
+                               MPDU_HEADER_ATTRIBUTES)
+  # ---------------------------------------------------------------------------
+  def getPacketZone(self):
+    """returns the packet zone as binary string"""
+    return self.getBufferBody()
+
+# =============================================================================
+class CLCW(compileBinaryUnit(BinaryUnit, CLCW_ATTRIBUTES)):
   """Command link control word"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor"""
@@ -121,8 +201,10 @@ class CLCW(BinaryUnit):
                         CLCW_ATTRIBUTES)
 
 # =============================================================================
-class TCframe(CCSDS.DU.DataUnit):
+class TCframe(compileBinaryUnit(CCSDS.DU.DataUnit,
+                                TC_FRAME_HEADER_ATTRIBUTES)):
   """telecommand transfer frame"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor"""
@@ -161,3 +243,47 @@ class TCframe(CCSDS.DU.DataUnit):
     if CRC_CHECK:
       self.append("\0" * 2)
     self.frameLength = len(self) - 1
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def decodeTMframeHeaders(frames, enableSecondaryHeader=False, names=None):
+  """
+  decodes the headers of many TM frames (N x frameSize uint8 NumPy array),
+  returns a dictionary with a column array per header attribute
+  """
+  if enableSecondaryHeader:
+    decoder = CCSDS.DU.BatchDecoder(TM_FRAME_PRIMARY_HEADER_ATTRIBUTES,
+                                    TM_FRAME_PRIMARY_HEADER_BYTE_SIZE,
+                                    TM_FRAME_SECONDARY_HEADER_ATTRIBUTES)
+  else:
+    decoder = CCSDS.DU.BatchDecoder(TM_FRAME_PRIMARY_HEADER_ATTRIBUTES)
+  return decoder.decode(frames, names)
+# -----------------------------------------------------------------------------
+def decodeFirstPacketHeaders(frames,
+                             enableSecondaryHeader=False,
+                             attributeMap2=None,
+                             names=None):
+  """
+  decodes the header of the first packet that starts in each TM frame,
+  returns a tuple (valid, columns): valid is a boolean array that marks
+  the frames with a complete packet header at the firstHeaderPointer
+  """
+  UTIL.BATCH.checkNumpy()
+  frames = UTIL.BATCH.numpy.asarray(frames, dtype=UTIL.BATCH.numpy.uint8)
+  dataFieldOffset = TM_FRAME_PRIMARY_HEADER_BYTE_SIZE
+  if enableSecondaryHeader:
+    dataFieldOffset += TM_FRAME_SECONDARY_HEADER_BYTE_SIZE
+  firstHeaderPointers = decodeTMframeHeaders(
+    frames, names=["firstHeaderPointer"])["firstHeaderPointer"]
+  packetOffsets = firstHeaderPointers.astype(UTIL.BATCH.numpy.intp)
+  packetOffsets += dataFieldOffset
+  decoder = CCSDS.DU.BatchDecoder(CCSDS.PACKET.PRIMARY_HEADER_ATTRIBUTES,
+                                  CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE,
+                                  attributeMap2)
+  valid = (firstHeaderPointers < FHP_IDLE_FRAME) & \
+          (packetOffsets + decoder.headerSize <= frames.shape[1])
+  # invalid frames are decoded at the data field start and masked via valid
+  packetOffsets[~valid] = dataFieldOffset
+  return (valid, decoder.decode(frames, names, packetOffsets))
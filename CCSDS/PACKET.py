@@ -13,7 +13,7 @@
 #******************************************************************************
 # CCSDS Stack - CCSDS Packet Module                                           *
 #******************************************************************************
-from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME
+from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, compileBinaryUnit
 import CCSDS.DU
 
 #############
@@ -49,8 +49,10 @@ PRIMARY_HEADER_ATTRIBUTES = {
 # classes #
 ###########
 # =============================================================================
-class Packet(CCSDS.DU.DataUnit):
+class Packet(compileBinaryUnit(CCSDS.DU.DataUnit,
+                               PRIMARY_HEADER_ATTRIBUTES)):
   """telemetry or telecommand packet"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None, attributesSize2=0, attributeMap2=None):
     """default constructor: initialise primary header"""
@@ -117,6 +119,7 @@ class Packet(CCSDS.DU.DataUnit):
 # =============================================================================
 class TMpacket(Packet):
   """telemetry packet"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None, attributesSize2=0, attributeMap2=None):
     """default constructor"""
@@ -130,6 +133,7 @@ class TMpacket(Packet):
 # =============================================================================
 class TCpacket(Packet):
   """telecommand packet"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None, attributesSize2=0, attributeMap2=None):
     """default constructor"""
@@ -139,3 +143,22 @@ class TCpacket(Packet):
     """hook for initializing attributes, delegates to parent class"""
     Packet.initAttributes(self)
     self.packetType = TC_PACKET_TYPE
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def decodePacketHeaders(packets,
+                        byteOffset=0,
+                        attributeMap2=None,
+                        names=None):
+  """
+  decodes the headers of many packets (N x dataUnitSize uint8 NumPy array),
+  byteOffset can be a number or an array with a packet position per row,
+  attributeMap2 (e.g. a PUS data field header) starts after the primary
+  header, returns a dictionary with a column array per header attribute
+  """
+  decoder = CCSDS.DU.BatchDecoder(PRIMARY_HEADER_ATTRIBUTES,
+                                  PRIMARY_HEADER_BYTE_SIZE,
+                                  attributeMap2)
+  return decoder.decode(packets, names, byteOffset)
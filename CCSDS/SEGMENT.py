@@ -13,7 +13,8 @@
 #******************************************************************************
 # CCSDS Stack - Telecommand Segmentation Module                               *
 #******************************************************************************
-from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit
+from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit, \
+                    compileBinaryUnit
 
 #############
 # constants #
@@ -46,8 +47,9 @@ UNSEGMENTED = 3
 # classes #
 ###########
 # =============================================================================
-class TCsegment(BinaryUnit):
+class TCsegment(compileBinaryUnit(BinaryUnit, TC_SEGMENT_HEADER_ATTRIBUTES)):
   """Telecommand segment"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor"""
@@ -17,10 +17,15 @@
 # Note: Time format CUC4 (4 bytes coarse time and 4 bytes fine time) can only *
 #       be represented in a CCSDS time p-field when the p-field extension is  *
 #       used. This is only relevant when the p-field is transmitted.          *
+#                                                                             *
+# packTime() and unpackTime() convert directly between python time and the   *
+# raw time in a buffer with precompiled struct layouts.                       *
+# packTimeArray() and unpackTimeArray() convert NumPy arrays of times and     *
+# N x byteSize raw time columns in bulk, consistent with the scalar path.     *
 #******************************************************************************
-import time
+import struct, time
 from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit
-import UTIL.TIME
+import UTIL.BATCH, UTIL.TIME
 
 #############
 # constants #
@@ -64,6 +69,21 @@ CUC4_TIME_BYTE_SIZE = 8
 CUC4_TIME_ATTRIBUTES = {
   "coarse": (0, 4, UNSIGNED),
   "fine":   (4, 4, UNSIGNED)}
+# struct layouts of the time formats (CUC3 fine time = 1 byte + 2 bytes)
+CDS1_TIME_STRUCT = struct.Struct(">HI")
+CDS2_TIME_STRUCT = struct.Struct(">HIH")
+CUC0_TIME_STRUCT = struct.Struct(">I")
+CUC1_TIME_STRUCT = struct.Struct(">IB")
+CUC2_TIME_STRUCT = struct.Struct(">IH")
+CUC3_TIME_STRUCT = struct.Struct(">IBH")
+CUC4_TIME_STRUCT = struct.Struct(">II")
+# number of fine time bits of the CUC time formats
+CUC_FINE_TIME_BITS = {
+  TIME_FORMAT_CUC0: 0,
+  TIME_FORMAT_CUC1: 8,
+  TIME_FORMAT_CUC2: 16,
+  TIME_FORMAT_CUC3: 24,
+  TIME_FORMAT_CUC4: 32}
 
 #############
 # functions #
@@ -221,7 +241,9 @@ def convertFromCUC(timeDU):
   """returns python time representation from CUC binary data unit"""
   fineTime = 0.0
   duSize = len(timeDU)
-  if duSize == CUC1_TIME_BYTE_SIZE:
+  if duSize == CUC0_TIME_BYTE_SIZE:
+    pass
+  elif duSize == CUC1_TIME_BYTE_SIZE:
     fineTime += timeDU.fine
     fineTime /= 0x100
   elif duSize == CUC2_TIME_BYTE_SIZE:
@@ -270,3 +292,196 @@ def convertFromCCSDS(timeDU, timeFormat):
   if isCUCtimeFormat(timeFormat):
     return convertFromCUC(timeDU)
   return None
+# -----------------------------------------------------------------------------
+def packTime(buffer, bytePos, pyTime, timeFormat):
+  """
+  writes python time in the raw time format into a writable buffer
+  (array.array, bytearray) at bytePos, no boundary checks of the buffer,
+  raises ValueError if the time does not fit into the time format
+  """
+  # negative times would also produce negative fine fields
+  if pyTime < 0:
+    raise ValueError("negative time cannot be packed")
+  if isCDStimeFormat(timeFormat):
+    # same conversion as in convertToCDS
+    secs = int(pyTime)
+    mics = int(round((pyTime - secs) * 1000000))
+    days = secs / UTIL.TIME.SECONDS_OF_DAY
+    secs %= UTIL.TIME.SECONDS_OF_DAY
+    mils = (secs * 1000) + (mics / 1000)
+    # mils and mics are < 2^32 and < 2^16 for all days
+    if days > 0xFFFF:
+      raise ValueError("time out of range for CDS time format")
+    if timeFormat == TIME_FORMAT_CDS1:
+      CDS1_TIME_STRUCT.pack_into(buffer, bytePos, days, mils)
+    else:
+      CDS2_TIME_STRUCT.pack_into(buffer, bytePos, days, mils, mics % 1000)
+    return
+  # same conversion as in convertToCUC,
+  # the fine time is < 2^(8 * fine bytes) because pyTime - coarseTime < 1
+  coarseTime = int(pyTime)
+  if coarseTime > 0xFFFFFFFF:
+    raise ValueError("time out of range for CUC time format")
+  if timeFormat == TIME_FORMAT_CUC0:
+    CUC0_TIME_STRUCT.pack_into(buffer, bytePos, coarseTime)
+  elif timeFormat == TIME_FORMAT_CUC1:
+    fineTime = int((pyTime - coarseTime) * 0x100)
+    CUC1_TIME_STRUCT.pack_into(buffer, bytePos, coarseTime, fineTime)
+  elif timeFormat == TIME_FORMAT_CUC2:
+    fineTime = int((pyTime - coarseTime) * 0x10000)
+    CUC2_TIME_STRUCT.pack_into(buffer, bytePos, coarseTime, fineTime)
+  elif timeFormat == TIME_FORMAT_CUC3:
+    fineTime = int((pyTime - coarseTime) * 0x1000000)
+    CUC3_TIME_STRUCT.pack_into(buffer, bytePos, coarseTime,
+                               fineTime >> 16, fineTime & 0xFFFF)
+  elif timeFormat == TIME_FORMAT_CUC4:
+    fineTime = int((pyTime - coarseTime) * 0x100000000)
+    CUC4_TIME_STRUCT.pack_into(buffer, bytePos, coarseTime, fineTime)
+  else:
+    raise ValueError("invalid time format")
+# -----------------------------------------------------------------------------
+def unpackTime(buffer, bytePos, timeFormat):
+  """
+  returns python time from the raw time format in a buffer at bytePos,
+  no boundary checks
+  """
+  if timeFormat == TIME_FORMAT_CDS1:
+    days, mils = CDS1_TIME_STRUCT.unpack_from(buffer, bytePos)
+    secs = days * UTIL.TIME.SECONDS_OF_DAY + (mils / 1000)
+    return secs + 0.0
+  if timeFormat == TIME_FORMAT_CDS2:
+    days, mils, mics = CDS2_TIME_STRUCT.unpack_from(buffer, bytePos)
+    secs = days * UTIL.TIME.SECONDS_OF_DAY + (mils / 1000)
+    mics += (mils % 1000) * 1000
+    return (mics / 1000000.0) + secs
+  if timeFormat == TIME_FORMAT_CUC0:
+    coarseTime, = CUC0_TIME_STRUCT.unpack_from(buffer, bytePos)
+    return coarseTime + 0.0
+  if timeFormat == TIME_FORMAT_CUC1:
+    coarseTime, fineTime = CUC1_TIME_STRUCT.unpack_from(buffer, bytePos)
+    return coarseTime + (fineTime / 256.0)
+  if timeFormat == TIME_FORMAT_CUC2:
+    coarseTime, fineTime = CUC2_TIME_STRUCT.unpack_from(buffer, bytePos)
+    return coarseTime + (fineTime / 65536.0)
+  if timeFormat == TIME_FORMAT_CUC3:
+    coarseTime, fineHigh, fineLow = \
+      CUC3_TIME_STRUCT.unpack_from(buffer, bytePos)
+    return coarseTime + (((fineHigh << 16) | fineLow) / 16777216.0)
+  if timeFormat == TIME_FORMAT_CUC4:
+    coarseTime, fineTime = CUC4_TIME_STRUCT.unpack_from(buffer, bytePos)
+    return coarseTime + (fineTime / 4294967296.0)
+  raise ValueError("invalid time format")
+# -----------------------------------------------------------------------------
+def roundArray(values):
+  """
+  rounds a float64 array half away from zero like the python round(),
+  the fraction is compared exactly to avoid double rounding in (x + 0.5)
+  """
+  numpy = UTIL.BATCH.numpy
+  absValues = numpy.abs(values)
+  rounded = numpy.floor(absValues)
+  rounded += ((absValues - rounded) >= 0.5)
+  return numpy.copysign(rounded, values)
+# -----------------------------------------------------------------------------
+def putBigEndianColumns(timeBytes, bytePos, byteSize, values):
+  """writes integer values as big-endian byte columns"""
+  for i in xrange(byteSize):
+    shift = (byteSize - 1 - i) << 3
+    timeBytes[:, bytePos + i] = (values >> shift) & 0xFF
+# -----------------------------------------------------------------------------
+def checkArrayRange(values, maxValue, name):
+  """raises a ValueError if a value is not in the range 0...maxValue"""
+  if len(values) > 0 and (values.min() < 0 or values.max() > maxValue):
+    raise ValueError(name + " out of range")
+# -----------------------------------------------------------------------------
+def packTimeArray(pyTimes, timeFormat):
+  """
+  converts an array of python times into an N x byteSize uint8 array
+  of raw times, float arrays are times in seconds (same conversion as
+  convertToCDS/convertToCUC), integer arrays are times in microseconds
+  """
+  UTIL.BATCH.checkNumpy()
+  numpy = UTIL.BATCH.numpy
+  byteSize = byteArraySize(timeFormat)
+  if byteSize == None:
+    raise ValueError("invalid time format")
+  pyTimes = numpy.asarray(pyTimes)
+  if pyTimes.ndim != 1:
+    raise ValueError("pyTimes must be a one dimensional array")
+  micros = (pyTimes.dtype.kind in "iu")
+  if micros:
+    pyTimes = pyTimes.astype(numpy.int64)
+    secs = pyTimes // 1000000
+    mics = pyTimes % 1000000
+  else:
+    pyTimes = pyTimes.astype(numpy.float64)
+    floatSecs = numpy.trunc(pyTimes)
+    secs = floatSecs.astype(numpy.int64)
+  timeBytes = numpy.empty((len(pyTimes), byteSize), dtype=numpy.uint8)
+  if isCDStimeFormat(timeFormat):
+    if not micros:
+      mics = roundArray((pyTimes - floatSecs) * 1000000).astype(numpy.int64)
+    days = secs // UTIL.TIME.SECONDS_OF_DAY
+    secs %= UTIL.TIME.SECONDS_OF_DAY
+    mils = (secs * 1000) + (mics // 1000)
+    checkArrayRange(days, 0xFFFF, "days")
+    checkArrayRange(mils, 0xFFFFFFFF, "mils")
+    putBigEndianColumns(timeBytes, 0, 2, days)
+    putBigEndianColumns(timeBytes, 2, 4, mils)
+    if timeFormat == TIME_FORMAT_CDS2:
+      putBigEndianColumns(timeBytes, 6, 2, mics % 1000)
+    return timeBytes
+  # CUC time
+  checkArrayRange(secs, 0xFFFFFFFF, "coarse time")
+  putBigEndianColumns(timeBytes, 0, 4, secs)
+  fineTimeBits = CUC_FINE_TIME_BITS[timeFormat]
+  if fineTimeBits > 0:
+    if micros:
+      fineTime = (mics << fineTimeBits) // 1000000
+    else:
+      fineTime = numpy.trunc((pyTimes - floatSecs) * (1 << fineTimeBits))
+      fineTime = fineTime.astype(numpy.int64)
+    putBigEndianColumns(timeBytes, 4, fineTimeBits >> 3, fineTime)
+  return timeBytes
+# -----------------------------------------------------------------------------
+def unpackTimeArray(timeBytes, timeFormat, bytePos=0, micros=False):
+  """
+  converts the raw times in an N x L uint8 array at bytePos into a
+  float64 array of python times (same conversion as convertFromCCSDS)
+  or into an int64 array of microseconds (micros=True, CUC fine time
+  is truncated to microseconds)
+  """
+  UTIL.BATCH.checkNumpy()
+  numpy = UTIL.BATCH.numpy
+  byteSize = byteArraySize(timeFormat)
+  if byteSize == None:
+    raise ValueError("invalid time format")
+  timeBytes = numpy.asarray(timeBytes, dtype=numpy.uint8)
+  if timeBytes.ndim != 2 or bytePos < 0 or \
+     bytePos + byteSize > timeBytes.shape[1]:
+    raise ValueError("timeBytes must be a N x L array with L >= bytePos + byteSize")
+  combineBytes = UTIL.BATCH.combineBytes
+  if isCDStimeFormat(timeFormat):
+    days = combineBytes(timeBytes[:, bytePos:bytePos + 2]).astype(numpy.int64)
+    mils = combineBytes(timeBytes[:, bytePos + 2:bytePos + 6]).astype(numpy.int64)
+    secs = days * UTIL.TIME.SECONDS_OF_DAY + (mils // 1000)
+    mics = (mils % 1000) * 1000
+    if timeFormat == TIME_FORMAT_CDS2:
+      mics += combineBytes(timeBytes[:, bytePos + 6:bytePos + 8]).astype(numpy.int64)
+    if micros:
+      return secs * 1000000 + mics
+    if timeFormat == TIME_FORMAT_CDS1:
+      return secs.astype(numpy.float64)
+    return (mics / 1000000.0) + secs
+  # CUC time
+  coarseTime = combineBytes(timeBytes[:, bytePos:bytePos + 4]).astype(numpy.int64)
+  fineTimeBits = CUC_FINE_TIME_BITS[timeFormat]
+  if fineTimeBits == 0:
+    if micros:
+      return coarseTime * 1000000
+    return coarseTime.astype(numpy.float64)
+  fineTime = combineBytes(
+    timeBytes[:, bytePos + 4:bytePos + 4 + (fineTimeBits >> 3)]).astype(numpy.int64)
+  if micros:
+    return coarseTime * 1000000 + ((fineTime * 1000000) >> fineTimeBits)
+  return coarseTime + (fineTime / float(1 << fineTimeBits))
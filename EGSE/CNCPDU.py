@@ -49,6 +49,7 @@ TC_ACKNAK_DATAFIELD_HEADER_ATTRIBUTES = {
 # =============================================================================
 class CNCcommand(CCSDS.PACKET.TCpacket):
   """CnC command"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor"""
@@ -70,6 +71,7 @@ class CNCcommand(CCSDS.PACKET.TCpacket):
 # =============================================================================
 class CNCackNak(CCSDS.PACKET.TMpacket):
   """CnC command ACK/NAK response"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor"""
@@ -91,6 +93,7 @@ class CNCackNak(CCSDS.PACKET.TMpacket):
 # =============================================================================
 class TCackNak(PUS.PACKET.TMpacket):
   """generic TC ACK/NAK packet"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise with header size"""
@@ -14,7 +14,8 @@
 # EGSE interfaces - EDEN protocol Data Units Module                           *
 # implements Core_EGSE_AD03_GAL_REQ_ALS_SA_R_0002_EGSE_IRD_issue2.pdf         *
 #******************************************************************************
-from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit
+from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit, \
+                    compileBinaryUnit
 
 #############
 # constants #
@@ -167,8 +168,9 @@ TM_SCOE_STRUCTURE_TYPE = 3
 # classes #
 ###########
 # =============================================================================
-class PDU(BinaryUnit):
+class PDU(compileBinaryUnit(BinaryUnit, PDU_HEADER_ATTRIBUTES)):
   """Generic EDEN protocol data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None, attributesSize2=0, attributeMap2=None):
     """default constructor: initialise with header size"""
@@ -206,6 +208,7 @@ class PDU(BinaryUnit):
 # =============================================================================
 class CCSDSpdu(PDU):
   """Superclass for different CCSDS PDUs"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None, attributesSize2=0, attributeMap2=None):
     """default constructor"""
@@ -228,8 +231,11 @@ class CCSDSpdu(PDU):
     self.setDataFieldLength()
 
 # =============================================================================
-class TCspace(CCSDSpdu):
+class TCspace(compileBinaryUnit(CCSDSpdu,
+    attributesSize1=PDU_HEADER_BYTE_SIZE,
+    attributeMap2=TC_SPACE_SEC_HEADER_ATTRIBUTES)):
   """(TC,SPACE) PDU"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise (TC,SPACE) secondary header"""
@@ -255,6 +261,7 @@ class TCspace(CCSDSpdu):
 # =============================================================================
 class TC_Espace(TCspace):
   """(TC_E,SPACE) PDU"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: delegates to TCspace"""
@@ -269,8 +276,11 @@ class TC_Espace(TCspace):
     self.pduType = PDU_TYPE_TC_E
 
 # =============================================================================
-class TCscoe(CCSDSpdu):
+class TCscoe(compileBinaryUnit(CCSDSpdu,
+    attributesSize1=PDU_HEADER_BYTE_SIZE,
+    attributeMap2=TC_SCOE_SEC_HEADER_ATTRIBUTES)):
   """(TC,SCOE) PDU"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise (TC,SCOE) secondary header"""
@@ -293,6 +303,7 @@ class TCscoe(CCSDSpdu):
 # =============================================================================
 class TC_Escoe(TCscoe):
   """(TC_E,SCOE) PDU"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: delegates to TCscoe"""
@@ -307,8 +318,11 @@ class TC_Escoe(TCscoe):
     self.pduType = PDU_TYPE_TC_E
 
 # =============================================================================
-class TMspace(CCSDSpdu):
+class TMspace(compileBinaryUnit(CCSDSpdu,
+    attributesSize1=PDU_HEADER_BYTE_SIZE,
+    attributeMap2=TM_SPACE_SEC_HEADER_ATTRIBUTES)):
   """(TM,SPACE) PDU"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise (TM,SPACE) secondary header"""
@@ -326,8 +340,11 @@ class TMspace(CCSDSpdu):
     self.structureType = TM_SPACE_STRUCTURE_TYPE
 
 # =============================================================================
-class TMscoe(CCSDSpdu):
+class TMscoe(compileBinaryUnit(CCSDSpdu,
+    attributesSize1=PDU_HEADER_BYTE_SIZE,
+    attributeMap2=TM_SCOE_SEC_HEADER_ATTRIBUTES)):
   """(TM,SCOE) PDU"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise (TM,SCOE) secondary header"""
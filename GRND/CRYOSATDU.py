@@ -13,7 +13,8 @@
 #******************************************************************************
 # Ground Simulation - CRYOSAT Data Units Module                               *
 #******************************************************************************
-from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit
+from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, BinaryUnit, \
+                    compileBinaryUnit
 
 #############
 # constants #
@@ -36,8 +37,9 @@ TM_FRAME_DU_ATTRIBUTES = {
 # classes #
 ###########
 # =============================================================================
-class TMframeDataUnit(BinaryUnit):
+class TMframeDataUnit(compileBinaryUnit(BinaryUnit, TM_FRAME_DU_ATTRIBUTES)):
   """CRYOSAT telemetry frame data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise with header size"""
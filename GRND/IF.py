@@ -66,7 +66,12 @@ class TMmcsLink(object):
   """Telemetry interface to the mission control system"""
   # ---------------------------------------------------------------------------
   def pushTMframe(self, tmFrameDu, ertUTC):
-    """consumes a telemetry frame"""
+    """
+    consumes a telemetry frame,
+    tmFrameDu is only valid during the call: the space link recycles the
+    frame buffer afterwards, an implementation that keeps the frame beyond
+    the call must copy it (e.g. via tmFrameDu.getBufferString())
+    """
     pass
   # ---------------------------------------------------------------------------
   def recordFrames(self, recordFileName):
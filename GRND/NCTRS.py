@@ -16,6 +16,7 @@
 #******************************************************************************
 import sys
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import CCSDS.DEMUX
 import GRND.IF, GRND.NCTRSDU
 import UTIL.TASK, UTIL.TCO, UTIL.TCP, UTIL.TIME
 
@@ -95,6 +96,33 @@ class TMreceiver(UTIL.TCP.SingleServerReceivingClient):
     """error notification: hook for derived classes"""
     pass
 
+# =============================================================================
+class TMpacketReceiver(TMreceiver):
+  """NCTRS telemetry receiver that extracts the TM packets from the frames"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, enableSecondaryHeader=False, packetFactory=None,
+               tmFrameDemultiplexer=None):
+    """
+    Initialise attributes only,
+    packetFactory creates the packets (e.g. PUS.PACKET.TMpacket),
+    tmFrameDemultiplexer replaces the default TM frame demultiplexer
+    (e.g. CCSDS.DEMUX.AOSframeDemultiplexer for AOS frames)
+    """
+    TMreceiver.__init__(self)
+    if tmFrameDemultiplexer == None:
+      tmFrameDemultiplexer = CCSDS.DEMUX.TMframeDemultiplexer(
+        enableSecondaryHeader, packetFactory)
+    self.tmFrameDemultiplexer = tmFrameDemultiplexer
+  # ---------------------------------------------------------------------------
+  def notifyTMdataUnit(self, tmDu):
+    """TM frame received: extracts the completed TM packets"""
+    for tmPacket in self.tmFrameDemultiplexer.pushFrame(tmDu.getFrameView()):
+      self.notifyTMpacket(tmPacket, tmDu.earthReceptionTime)
+  # ---------------------------------------------------------------------------
+  def notifyTMpacket(self, tmPacket, earthReceptionTime):
+    """TM packet received: hook for derived classes"""
+    pass
+
 # =============================================================================
 class NCTRStmFields(object):
   """Helper class that contains static initialization attributes"""
@@ -129,20 +157,23 @@ class TMsender(UTIL.TCP.Server):
     # ensure a correct size attribute
     tmDu.packetSize = len(tmDu)
     # this operation does not verify the contents of the DU
-    self.clientSocket.send(tmDu.getBufferString())
+    self.clientSocket.send(tmDu.getMemoryView())
   # ---------------------------------------------------------------------------
   def sendFrame(self, tmFrame):
     """Send the TM frame to the TM receiver"""
     ertTime = UTIL.TCO.correlateToERTmissionEpoch(UTIL.TIME.getActualTime())
-    tmDu = GRND.NCTRSDU.TMdataUnit()
+    # the bytearray buffer is sent without a further copy
+    tmDu = GRND.NCTRSDU.TMdataUnit(
+      bytearray(GRND.NCTRSDU.TM_DU_HEADER_BYTE_SIZE))
     tmDu.setFrame(tmFrame)
-    tmDu.spacecraftId = self.nctrsTMfields.spacecraftId
-    tmDu.dataStreamType = self.nctrsTMfields.dataStreamType
-    tmDu.virtualChannelId = self.nctrsTMfields.virtualChannelId
-    tmDu.routeId = self.nctrsTMfields.routeId
-    tmDu.earthReceptionTime = ertTime
-    tmDu.sequenceFlag = self.nctrsTMfields.sequenceFlag
-    tmDu.qualityFlag = self.nctrsTMfields.qualityFlag
+    tmDu.setFields({
+      "spacecraftId": self.nctrsTMfields.spacecraftId,
+      "dataStreamType": self.nctrsTMfields.dataStreamType,
+      "virtualChannelId": self.nctrsTMfields.virtualChannelId,
+      "routeId": self.nctrsTMfields.routeId,
+      "earthReceptionTime": ertTime,
+      "sequenceFlag": self.nctrsTMfields.sequenceFlag,
+      "qualityFlag": self.nctrsTMfields.qualityFlag})
     self.sendTmDataUnit(tmDu)
   # ---------------------------------------------------------------------------
   def clientAccepted(self):
@@ -335,15 +366,17 @@ class TCreceiver(UTIL.TCP.SingleClientReceivingServer):
     """sends a response data unit from a request data unit"""
     ertTime = UTIL.TCO.correlateToERTmissionEpoch(UTIL.TIME.getActualTime())
     tcRespDu = requestDataUnit.createResponseDataUnit()
-    tcRespDu.time = ertTime
-    tcRespDu.serviceType = requestDataUnit.serviceType
-    tcRespDu.groundstationId = self.groundstationId
-    tcRespDu.sequenceCounter = requestDataUnit.tcId
-    tcRespDu.acknowledgement = acknowledgement
-    tcRespDu.reason = 0
-    tcRespDu.spaceInQueue = 0
-    tcRespDu.nextADcounter = 0
-    tcRespDu.lastCLCW = [0, 0, 0, 0]
+    requestFields = requestDataUnit.getFields(["serviceType", "tcId"])
+    tcRespDu.setFields({
+      "time": ertTime,
+      "serviceType": requestFields["serviceType"],
+      "groundstationId": self.groundstationId,
+      "sequenceCounter": requestFields["tcId"],
+      "acknowledgement": acknowledgement,
+      "reason": 0,
+      "spaceInQueue": 0,
+      "nextADcounter": 0,
+      "lastCLCW": [0, 0, 0, 0]})
     self.sendTcDataUnit(tcRespDu)
 
 # =============================================================================
@@ -14,7 +14,7 @@
 # Ground Simulation - NCTRS Data Units Module                                 *
 # implements EGOS-NIS-NCTR-ICD-0002-i4r0.2 (Signed).pdf                       *
 #******************************************************************************
-from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME
+from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, compileBinaryUnit
 import CCSDS.DU, CCSDS.TIME
 
 #############
@@ -173,8 +173,9 @@ TC_PAR_AD_FAILURE_REASON =    "%18s"
 # classes #
 ###########
 # =============================================================================
-class TMdataUnit(CCSDS.DU.DataUnit):
+class TMdataUnit(compileBinaryUnit(CCSDS.DU.DataUnit, TM_DU_ATTRIBUTES)):
   """NCTRS telemetry data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None, attributesSize2=0, attributeMap2=None):
     """default constructor: initialise data unit header"""
@@ -196,6 +197,13 @@ class TMdataUnit(CCSDS.DU.DataUnit):
     headerByteSize = TM_DU_HEADER_BYTE_SIZE
     return self.getBytes(headerByteSize, self.packetSize - headerByteSize)
   # ---------------------------------------------------------------------------
+  def getFrameView(self):
+    """returns the transfer frame as memoryview without copying"""
+    # the packetSize must contain the correct size
+    headerByteSize = TM_DU_HEADER_BYTE_SIZE
+    return self.getMemoryView(headerByteSize,
+                              self.packetSize - headerByteSize)
+  # ---------------------------------------------------------------------------
   def setFrame(self, frame):
     """set the transfer frame and the packetSize"""
     self.setLen(TM_DU_HEADER_BYTE_SIZE)
@@ -203,8 +211,10 @@ class TMdataUnit(CCSDS.DU.DataUnit):
     self.packetSize = len(self)
 
 # =============================================================================
-class TCdataUnit(CCSDS.DU.DataUnit):
+class TCdataUnit(compileBinaryUnit(CCSDS.DU.DataUnit,
+                                   TC_DU_HEADER_ATTRIBUTES)):
   """NCTRS telecommand data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None, attributesSize2=0, attributeMap2=None):
     """default constructor: initialise data unit header"""
@@ -265,8 +275,11 @@ class TCdataUnit(CCSDS.DU.DataUnit):
     self.packetSize = len(self)
 
 # =============================================================================
-class TCpacketDataUnit(TCdataUnit):
+class TCpacketDataUnit(compileBinaryUnit(TCdataUnit,
+    attributesSize1=TC_DU_HEADER_BYTE_SIZE,
+    attributeMap2=TC_PACKET_HEADER_ATTRIBUTES)):
   """NCTRS telecommand packet data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise TC packet header"""
@@ -282,8 +295,11 @@ class TCpacketDataUnit(TCdataUnit):
     self.dataUnitType = TC_PACKET_HEADER_DU_TYPE
 
 # =============================================================================
-class TCcltuDataUnit(TCdataUnit):
+class TCcltuDataUnit(compileBinaryUnit(TCdataUnit,
+    attributesSize1=TC_DU_HEADER_BYTE_SIZE,
+    attributeMap2=TC_CLTU_HEADER_ATTRIBUTES)):
   """NCTRS telecommand CLTU data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise TC CLTU header"""
@@ -299,8 +315,11 @@ class TCcltuDataUnit(TCdataUnit):
     self.dataUnitType = TC_CLTU_HEADER_DU_TYPE
 
 # =============================================================================
-class TCdirectivesDataUnit(TCdataUnit):
+class TCdirectivesDataUnit(compileBinaryUnit(TCdataUnit,
+    attributesSize1=TC_DU_HEADER_BYTE_SIZE,
+    attributeMap2=TC_DIRECTIVES_ATTRIBUTES)):
   """NCTRS telecommand directives data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise TC directives"""
@@ -316,8 +335,11 @@ class TCdirectivesDataUnit(TCdataUnit):
     self.dataUnitType = TC_DIRECTIVES_DU_TYPE
 
 # =============================================================================
-class TCpacketResponseDataUnit(TCdataUnit):
+class TCpacketResponseDataUnit(compileBinaryUnit(TCdataUnit,
+    attributesSize1=TC_DU_HEADER_BYTE_SIZE,
+    attributeMap2=TC_PACKET_RESPONSE_ATTRIBUTES)):
   """NCTRS telecommand packet response data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise TC packet response"""
@@ -333,8 +355,11 @@ class TCpacketResponseDataUnit(TCdataUnit):
     self.dataUnitType = TC_PACKET_RESPONSE_DU_TYPE
 
 # =============================================================================
-class TCcltuResponseDataUnit(TCdataUnit):
+class TCcltuResponseDataUnit(compileBinaryUnit(TCdataUnit,
+    attributesSize1=TC_DU_HEADER_BYTE_SIZE,
+    attributeMap2=TC_CLTU_RESPONSE_ATTRIBUTES)):
   """NCTRS telecommand CLTU response data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise TC CLTU response"""
@@ -350,8 +375,11 @@ class TCcltuResponseDataUnit(TCdataUnit):
     self.dataUnitType = TC_CLTU_RESPONSE_DU_TYPE
 
 # =============================================================================
-class TClinkStatusDataUnit(TCdataUnit):
+class TClinkStatusDataUnit(compileBinaryUnit(TCdataUnit,
+    attributesSize1=TC_DU_HEADER_BYTE_SIZE,
+    attributeMap2=TC_LINK_STATUS_ATTRIBUTES)):
   """NCTRS link status data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise TC link status"""
@@ -367,8 +395,10 @@ class TClinkStatusDataUnit(TCdataUnit):
     self.dataUnitType = TC_LINK_STATUS_DU_TYPE
 
 # =============================================================================
-class AdminMessageDataUnit(CCSDS.DU.DataUnit):
+class AdminMessageDataUnit(compileBinaryUnit(CCSDS.DU.DataUnit,
+                                             MESSAGE_HEADER_ATTRIBUTES)):
   """NCTRS admin message data unit"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise message header"""
@@ -14,6 +14,21 @@
 # Link Simulation - Ground to Space Interface                                 *
 #******************************************************************************
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import CCSDS.FRAME
+import UTIL.SYS
+
+#############
+# constants #
+#############
+# scheduling policies of the virtual channel multiplexer
+VC_POLICY_PRIORITY = "PRIORITY"
+VC_POLICY_WEIGHTED_ROUND_ROBIN = "WEIGHTED_ROUND_ROBIN"
+VC_POLICY_RATE_SHARE = "RATE_SHARE"
+# formats of the downlink transfer frames
+TM_FRAME_FORMAT_TM = "TM"
+TM_FRAME_FORMAT_AOS = "AOS"
+# idle VC of TM transfer frames if TM_IDLE_VC is empty
+TM_DEFAULT_IDLE_VIRTUAL_CHANNEL_ID = 7
 
 ###########
 # classes #
@@ -25,11 +40,37 @@ class Configuration(object):
   def __init__(self):
     """Initialise the connection relevant informations"""
     self.enableCLCW = True
+    # TM packets are packed into frames that are sent when they are full
+    # or when the latency is expired, 0 = one TM packet per frame
+    self.tmFrameLatencyMs = int(UTIL.SYS.s_configuration.TM_FRAME_LATENCY_MS)
+    # scheduling policy of the virtual channel multiplexer
+    self.tmVCpolicy = UTIL.SYS.s_configuration.TM_VC_POLICY
+    # constant rate downlink with idle frames on the idle VC,
+    # 0 = frames are sent when they are completed
+    self.tmFrameRate = float(UTIL.SYS.s_configuration.TM_FRAME_RATE)
+    # TM transfer frames or AOS transfer frames with M_PDU packet zones
+    self.tmFrameFormat = UTIL.SYS.s_configuration.TM_FRAME_FORMAT
+    # an empty TM_IDLE_VC selects the idle VC of the frame format
+    tmIdleVC = UTIL.SYS.s_configuration.TM_IDLE_VC
+    if tmIdleVC != "":
+      self.tmIdleVirtualChannelId = int(tmIdleVC)
+    elif self.tmFrameFormat == TM_FRAME_FORMAT_AOS:
+      self.tmIdleVirtualChannelId = CCSDS.FRAME.AOS_IDLE_VIRTUAL_CHANNEL_ID
+    else:
+      self.tmIdleVirtualChannelId = TM_DEFAULT_IDLE_VIRTUAL_CHANNEL_ID
+    self.aosInsertZoneSize = \
+      int(UTIL.SYS.s_configuration.AOS_INSERT_ZONE_SIZE)
   # ---------------------------------------------------------------------------
   def dump(self):
     """Dumps the status of the configuration attributes"""
     LOG_INFO("Space link configuration", "LINK")
     LOG("Enable CLCW = " + str(self.enableCLCW), "LINK")
+    LOG("TM frame latency [ms] = " + str(self.tmFrameLatencyMs), "LINK")
+    LOG("TM VC policy = " + self.tmVCpolicy, "LINK")
+    LOG("TM frame rate [1/s] = " + str(self.tmFrameRate), "LINK")
+    LOG("TM idle VC = " + str(self.tmIdleVirtualChannelId), "LINK")
+    LOG("TM frame format = " + self.tmFrameFormat, "LINK")
+    LOG("AOS insert zone size = " + str(self.aosInsertZoneSize), "LINK")
 
 # =============================================================================
 class CLCWdefaults(object):
@@ -60,11 +101,17 @@ class SpaceLink(object):
   """Interface to the spacecraft"""
   # ---------------------------------------------------------------------------
   def getUplinkQueue(self):
-    """returns the uplink queue"""
+    """
+    returns the uplink queue: list of (receptionTime, tcFrameDu)
+    in reception order
+    """
     pass
   # ---------------------------------------------------------------------------
   def getDownlinkQueue(self):
-    """returns the downlink queue"""
+    """
+    returns the downlink queue: list of (receptionTime, (tmFrameDu, ertUTC))
+    in reception order
+    """
     pass
   # ---------------------------------------------------------------------------
   def pushTCcltu(self, cltu):
@@ -97,6 +144,138 @@ class TMframeGenerator(object):
   def getTMframe(self, tmPacketDu):
     """creates a Transfer TM frame with embedded TM packet"""
     pass
+  # ---------------------------------------------------------------------------
+  def packTMpacket(self, tmPacketDu, virtualChannelId=None):
+    """
+    packs a TM packet into the pending Transfer TM frame,
+    returns the list of Transfer TM frames that are completed
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def isTMframePending(self, virtualChannelId=None):
+    """returns True if a Transfer TM frame is partially filled"""
+    pass
+  # ---------------------------------------------------------------------------
+  def flushTMframe(self, virtualChannelId=None):
+    """
+    completes the pending Transfer TM frame with an idle packet,
+    returns the Transfer TM frame or None if no frame is pending
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def fillTMframes(self, tmPacketDu, virtualChannelId=None):
+    """
+    packs a TM packet into the pending Transfer TM frame,
+    returns the list of Transfer TM frames with a complete data field
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def fillIdleTMframe(self, virtualChannelId=None):
+    """
+    completes the data field of the pending Transfer TM frame with an idle
+    packet, returns the Transfer TM frame or None if no frame is pending
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def getIdleTMframe(self, virtualChannelId=None):
+    """
+    creates an idle Transfer TM frame (OID) without packets,
+    a pending frame of the virtual channel is flushed instead
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def finaliseTMframe(self, tmFrameDu):
+    """
+    sets the master channel frame counter, the CLCW and the CRC
+    of a Transfer TM frame from fillTMframes or fillIdleTMframe
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def recycleTMframe(self, tmFrameDu):
+    """
+    gives a Transfer TM frame back to the generator for reuse,
+    the frames returned by getTMframe, packTMpacket, flushTMframe and
+    getIdleTMframe belong to the caller until they are recycled,
+    afterwards the caller must not access the frame anymore
+    """
+    pass
+
+# =============================================================================
+class VCmultiplexer(object):
+  """Interface of the virtual channel multiplexer for telemetry frames"""
+  # ---------------------------------------------------------------------------
+  def setPolicy(self, policy):
+    """selects the VC scheduling policy (VC_POLICY_...)"""
+    pass
+  # ---------------------------------------------------------------------------
+  def addVirtualChannel(self, virtualChannelId, priority=0, weight=1):
+    """
+    adds a virtual channel, a lower priority value is served first,
+    the weight is used by the round-robin and rate share policies
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def addAPIDrule(self, firstAPID, lastAPID, virtualChannelId):
+    """routes the TM packets of an APID range to a virtual channel"""
+    pass
+  # ---------------------------------------------------------------------------
+  def getVirtualChannelId(self, applicationProcessId):
+    """returns the virtual channel of an APID"""
+    pass
+  # ---------------------------------------------------------------------------
+  def pushTMpacket(self, tmPacketDu, ertUTC, flushTime):
+    """
+    packs a TM packet into the frames of its virtual channel,
+    a new pending frame is flushed at flushTime (None = immediately)
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def flushExpiredFrames(self, actualTime):
+    """flushes the pending frames with an expired flushTime"""
+    pass
+  # ---------------------------------------------------------------------------
+  def getNextFlushTime(self):
+    """returns the earliest flushTime of the pending frames or None"""
+    pass
+  # ---------------------------------------------------------------------------
+  def getNextTMframe(self):
+    """
+    returns (tmFrameDu, ertUTC) of the next frame to be sent
+    or None if all virtual channel queues are empty
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def getQueueDepth(self):
+    """returns the number of frames in the virtual channel queues"""
+    pass
+
+# =============================================================================
+class FrameClock(object):
+  """Interface of the frame clock of a constant rate downlink"""
+  # ---------------------------------------------------------------------------
+  def start(self, startTime):
+    """(re)starts the frame schedule, the first frame is sent at startTime"""
+    pass
+  # ---------------------------------------------------------------------------
+  def getFrameRate(self):
+    """returns the frames per second"""
+    pass
+  # ---------------------------------------------------------------------------
+  def getNextFrameTime(self):
+    """returns the send time of the next frame slot"""
+    pass
+  # ---------------------------------------------------------------------------
+  def tick(self, actualTime):
+    """
+    selects the frames of all slots up to actualTime, a slot without
+    TM frame gets an idle frame, returns the list of
+    (tmFrameDu, ertUTC, sendTime)
+    """
+    pass
+  # ---------------------------------------------------------------------------
+  def getQueueDepth(self):
+    """returns the number of frames that wait for a frame slot"""
+    pass
 
 ####################
 # global variables #
@@ -109,3 +288,7 @@ s_spaceLink = None
 s_packetLink = None
 # telemetry frame generator is a singleton
 s_tmFrameGenerator = None
+# virtual channel multiplexer is a singleton
+s_vcMultiplexer = None
+# frame clock is a singleton, None if frames are sent when completed
+s_frameClock = None
@@ -0,0 +1,138 @@
+#******************************************************************************
+# (C) 2017, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under the terms of the GNU Lesser General Public License as       *
+# published by the Free Software Foundation; either version 2.1 of the        *
+# License, or (at your option) any later version.                             *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser     *
+# General Public License for more details.                                    *
+#******************************************************************************
+# Link Simulation - Constant Rate Frame Clock                                 *
+# The downlink sends exactly frameRate frames per second. Each frame slot is  *
+# filled with the next frame of the VC multiplexer or with an idle frame      *
+# (OID, firstHeaderPointer 0x7FE). The send time of frame n is computed as    *
+# startTime + n / frameRate and not accumulated from the previous slot, the   *
+# schedule has no drift, independent of the tick period and the rate.         *
+#******************************************************************************
+from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import LINK.IF
+
+#############
+# constants #
+#############
+# if the clock is more late (e.g. suspended process), the missed frame
+# slots are skipped instead of being sent in one burst
+MAX_LATENESS_SEC = 1.0
+
+###########
+# classes #
+###########
+# =============================================================================
+class ConstantRateFrameClock(LINK.IF.FrameClock):
+  """Implementation of the constant rate frame clock"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, frameRate, vcMultiplexer, tmFrameGenerator,
+               idleVirtualChannelId):
+    """
+    initialises the clock, the idle frames are sent on idleVirtualChannelId,
+    which shall not be used for TM packets
+    """
+    if frameRate <= 0:
+      raise Error("invalid frame rate: " + str(frameRate))
+    self.frameRate = float(frameRate)
+    self.vcMultiplexer = vcMultiplexer
+    self.tmFrameGenerator = tmFrameGenerator
+    self.idleVirtualChannelId = idleVirtualChannelId
+    self.startTime = None
+    self.frameNumber = 0
+    self.frameCounter = 0
+    self.idleFrameCounter = 0
+    self.skippedFrameCounter = 0
+  # ---------------------------------------------------------------------------
+  def start(self, startTime):
+    """
+    (re)starts the frame schedule, the first frame is sent at startTime:
+    implementation of LINK.IF.FrameClock.start
+    """
+    self.startTime = startTime
+    self.frameNumber = 0
+  # ---------------------------------------------------------------------------
+  def getFrameRate(self):
+    """
+    returns the frames per second:
+    implementation of LINK.IF.FrameClock.getFrameRate
+    """
+    return self.frameRate
+  # ---------------------------------------------------------------------------
+  def getNextFrameTime(self):
+    """
+    returns the send time of the next frame slot:
+    implementation of LINK.IF.FrameClock.getNextFrameTime
+    """
+    if self.startTime == None:
+      return None
+    return self.startTime + self.frameNumber / self.frameRate
+  # ---------------------------------------------------------------------------
+  def tick(self, actualTime):
+    """
+    selects the frames of all slots up to actualTime,
+    returns the list of (tmFrameDu, ertUTC, sendTime):
+    implementation of LINK.IF.FrameClock.tick
+    """
+    if self.startTime == None:
+      self.start(actualTime)
+    frames = []
+    sendTime = self.getNextFrameTime()
+    if actualTime - sendTime > MAX_LATENESS_SEC:
+      # skip the missed slots, the schedule keeps its phase
+      nrSkippedFrames = int((actualTime - sendTime) * self.frameRate)
+      self.frameNumber += nrSkippedFrames
+      self.skippedFrameCounter += nrSkippedFrames
+      LOG_WARNING("frame clock too late: " + str(nrSkippedFrames) +
+                  " frame slots skipped", "LINK")
+      sendTime = self.getNextFrameTime()
+    while sendTime <= actualTime:
+      nextFrame = self.vcMultiplexer.getNextTMframe()
+      if nextFrame == None:
+        # nothing to send ---> idle frame
+        tmFrameDu = self.tmFrameGenerator.getIdleTMframe(
+          self.idleVirtualChannelId)
+        ertUTC = None
+        self.idleFrameCounter += 1
+      else:
+        tmFrameDu, ertUTC = nextFrame
+      frames.append((tmFrameDu, ertUTC, sendTime))
+      self.frameCounter += 1
+      self.frameNumber += 1
+      sendTime = self.getNextFrameTime()
+    return frames
+  # ---------------------------------------------------------------------------
+  def getQueueDepth(self):
+    """
+    returns the number of frames that wait for a frame slot:
+    implementation of LINK.IF.FrameClock.getQueueDepth
+    """
+    return self.vcMultiplexer.getQueueDepth()
+
+#############
+# functions #
+#############
+def getFrameRate(bitRate, transferFrameSize):
+  """returns the frames per second of a bit rate (without coding overhead)"""
+  return bitRate / (8.0 * transferFrameSize)
+# -----------------------------------------------------------------------------
+def init():
+  # initialise singleton(s), only for a constant rate downlink
+  frameRate = LINK.IF.s_configuration.tmFrameRate
+  if frameRate <= 0:
+    LINK.IF.s_frameClock = None
+    return
+  LINK.IF.s_frameClock = ConstantRateFrameClock(
+    frameRate,
+    LINK.IF.s_vcMultiplexer,
+    LINK.IF.s_tmFrameGenerator,
+    LINK.IF.s_configuration.tmIdleVirtualChannelId)
@@ -12,13 +12,29 @@
 # General Public License for more details.                                    *
 #******************************************************************************
 # Link Simulation - Telemetry Frame Generator                                 *
+# Generates TM transfer frames (ESA PSS) or AOS transfer frames with M_PDU    *
+# packing of the TM packets.                                                  *
 #******************************************************************************
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
-import CCSDS.DU, CCSDS.FRAME
+import CCSDS.DU, CCSDS.FRAME, CCSDS.PACKET
 import LINK.IF
 import PUS.PACKET
 import SCOS.ENV
 import SPACE.IF
+import UTIL.CRC, UTIL.DU
+
+#############
+# constants #
+#############
+# smallest idle packet: packet header + CRC
+IDLE_PACKET_MIN_SIZE = CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE + \
+                       CCSDS.DU.CRC_BYTE_SIZE
+# maximum number of recycled frames that are kept for reuse
+FRAME_POOL_SIZE = 64
+# master channel and virtual channel frame counter in the frame header
+FRAME_COUNTERS_BYTE_POS = 2
+# 24 bit virtual channel frame counter and signaling field in the AOS header
+AOS_FRAME_COUNTER_WORD_POSITIONS = [2, 4]
 
 ###########
 # classes #
@@ -50,6 +66,17 @@ class TMframeDefaults(object):
     self.secondaryHeaderVersionNr = 0
     self.virtualChannelFCountHigh = 0
 
+# =============================================================================
+class VirtualChannel(object):
+  """Frame counter and partially filled frame of a virtual channel"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, virtualChannelId):
+    """default constructor"""
+    self.virtualChannelId = virtualChannelId
+    self.frameCount = 0
+    self.pendingFrame = None
+    self.pendingBytePos = 0
+
 # =============================================================================
 class TMframeGeneratorImpl(LINK.IF.TMframeGenerator):
   """Generator for telemetry frames"""
@@ -57,8 +84,14 @@ class TMframeGeneratorImpl(LINK.IF.TMframeGenerator):
   def __init__(self):
     """default constructor"""
     self.masterChannelFrameCount = 0
-    self.virtualChannelFrameCount = 0
     self.frameDefaults = TMframeDefaults()
+    # preformatted frame headers and idle frames per virtual channel
+    # and recycled frames
+    self.frameTemplates = {}
+    self.idleFrameTemplates = {}
+    self.framePool = []
+    # frame counters and partially filled frames per virtual channel
+    self.virtualChannels = {}
     self.initCLCW()
   # ---------------------------------------------------------------------------
   def initCLCW(self, clcwDefaults=LINK.IF.CLCWdefaults()):
@@ -101,59 +134,427 @@ class TMframeGeneratorImpl(LINK.IF.TMframeGenerator):
     creates a Transfer TM frame with embedded TM packet
     implementation of LINK.IF.TMframeGenerator.getTMframe
     """
-    # create the idle packet
-    reservedFrameDataSize = CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_BYTE_SIZE + \
-                            len(tmDataPacket) + \
-                            CCSDS.FRAME.CLCW_BYTE_SIZE
-    enableSecondaryHeader = (self.frameDefaults.secondaryHeaderFlag == 1)
-    if enableSecondaryHeader:
-      reservedFrameDataSize += CCSDS.FRAME.TM_FRAME_SECONDARY_HEADER_BYTE_SIZE
-    if CCSDS.FRAME.CRC_CHECK:
-      reservedFrameDataSize += 2
-    remainingFrameDataSize = self.frameDefaults.transferFrameSize - \
-                             reservedFrameDataSize
-    if remainingFrameDataSize < 0:
+    dataFieldPos = self.getDataFieldPos()
+    dataFieldEndPos = self.getDataFieldEndPos()
+    packetSize = len(tmDataPacket)
+    if dataFieldPos + packetSize > dataFieldEndPos:
       # TM packet does not fit into the frame
-      # ---> an exception must be raisedas long as
-      #      TM packet segmentation is not implemeted
-      raise Error("TM packet with SPID " + str(spid) + " does not fit into transfer frame")
-    createIdlePacket = (remainingFrameDataSize != 0)
-    if createIdlePacket:
-      tmIdlePacket = \
-        SPACE.IF.s_tmPacketGenerator.getIdlePacket(remainingFrameDataSize)
-    # create the transfer frame
-    tmFrame = CCSDS.FRAME.TMframe(enableSecondaryHeader=enableSecondaryHeader)
-    tmFrame.versionNumber = self.frameDefaults.versionNumber
-    tmFrame.spacecraftId = self.frameDefaults.spacecraftId
-    tmFrame.virtualChannelId = self.frameDefaults.virtualChannelId
-    tmFrame.operationalControlField = self.frameDefaults.operationalControlField
+      # ---> packTMpacket must be used for packet segmentation
+      raise Error("TM packet with APID " +
+                  str(tmDataPacket.applicationProcessId) +
+                  " does not fit into transfer frame")
+    # create the transfer frame with its final size in a bytearray buffer,
+    # the frame contents are copied directly into this buffer
+    tmFrame = self.createTMframe(
+      self.getVirtualChannel(self.frameDefaults.virtualChannelId))
+    tmFrame.setBytes(dataFieldPos, packetSize, tmDataPacket.getMemoryView())
+    self.completeTMframe(tmFrame, dataFieldPos + packetSize)
+    self.finaliseTMframe(tmFrame)
+    return tmFrame
+  # ---------------------------------------------------------------------------
+  def packTMpacket(self, tmDataPacket, virtualChannelId=None):
+    """
+    packs a TM packet into the pending Transfer TM frame,
+    returns the list of Transfer TM frames that are completed
+    implementation of LINK.IF.TMframeGenerator.packTMpacket
+    """
+    tmFrames = self.fillTMframes(tmDataPacket, virtualChannelId)
+    for tmFrame in tmFrames:
+      self.finaliseTMframe(tmFrame)
+    return tmFrames
+  # ---------------------------------------------------------------------------
+  def isTMframePending(self, virtualChannelId=None):
+    """
+    returns True if a Transfer TM frame is partially filled with TM packets
+    implementation of LINK.IF.TMframeGenerator.isTMframePending
+    """
+    return (self.getVirtualChannel(virtualChannelId).pendingFrame != None)
+  # ---------------------------------------------------------------------------
+  def flushTMframe(self, virtualChannelId=None):
+    """
+    completes the pending Transfer TM frame with an idle packet,
+    returns the Transfer TM frame or None if no frame is pending
+    implementation of LINK.IF.TMframeGenerator.flushTMframe
+    """
+    tmFrame = self.fillIdleTMframe(virtualChannelId)
+    if tmFrame != None:
+      self.finaliseTMframe(tmFrame)
+    return tmFrame
+  # ---------------------------------------------------------------------------
+  def fillTMframes(self, tmDataPacket, virtualChannelId=None):
+    """
+    packs a TM packet into the pending Transfer TM frame,
+    returns the list of Transfer TM frames with a complete data field,
+    these frames must be passed to finaliseTMframe before they are sent
+    implementation of LINK.IF.TMframeGenerator.fillTMframes
+    """
+    tmFrames = []
+    self.packDataUnit(self.getVirtualChannel(virtualChannelId),
+                      tmDataPacket,
+                      tmFrames)
+    return tmFrames
+  # ---------------------------------------------------------------------------
+  def fillIdleTMframe(self, virtualChannelId=None):
+    """
+    completes the data field of the pending Transfer TM frame with an idle
+    packet, returns the Transfer TM frame or None if no frame is pending,
+    the frame must be passed to finaliseTMframe before it is sent
+    implementation of LINK.IF.TMframeGenerator.fillIdleTMframe
+    """
+    virtualChannel = self.getVirtualChannel(virtualChannelId)
+    if virtualChannel.pendingFrame == None:
+      return None
+    # an idle packet that does not fit into the remaining space
+    # is continued in the next frame, which stays pending
+    remainingFrameDataSize = self.getDataFieldEndPos() - \
+                             virtualChannel.pendingBytePos
+    idlePacketSize = max(remainingFrameDataSize, IDLE_PACKET_MIN_SIZE)
+    tmIdlePacket = SPACE.IF.s_tmPacketGenerator.getIdlePacket(idlePacketSize)
+    tmFrames = []
+    self.packDataUnit(virtualChannel, tmIdlePacket, tmFrames)
+    return tmFrames[0]
+  # ---------------------------------------------------------------------------
+  def getIdleTMframe(self, virtualChannelId=None):
+    """
+    creates an idle Transfer TM frame (OID) without packets,
+    a pending frame of the virtual channel is flushed instead
+    implementation of LINK.IF.TMframeGenerator.getIdleTMframe
+    """
+    virtualChannel = self.getVirtualChannel(virtualChannelId)
+    if virtualChannel.pendingFrame != None:
+      # the pending frame has already consumed its VC frame count
+      return self.flushTMframe(virtualChannel.virtualChannelId)
+    idleFrameTemplate, crcPatcher = \
+      self.getIdleFrameTemplate(virtualChannel.virtualChannelId)
+    tmFrame = self.createTMframe(virtualChannel, idleFrameTemplate)
+    self.finaliseTMframe(tmFrame, crcPatcher)
+    return tmFrame
+  # ---------------------------------------------------------------------------
+  def finaliseTMframe(self, tmFrame, crcPatcher=None):
+    """
+    sets the master channel frame counter, the CLCW and the CRC
+    when the Transfer TM frame is sent, the crcPatcher of an idle frame
+    template avoids the CRC calculation over the whole frame
+    implementation of LINK.IF.TMframeGenerator.finaliseTMframe
+    """
+    self.setMasterChannelFrameCount(tmFrame)
+    dataFieldEndPos = self.getDataFieldEndPos()
+    tmFrame.setBytes(dataFieldEndPos,
+                     CCSDS.FRAME.CLCW_BYTE_SIZE,
+                     self.clcw.getMemoryView())
+    if CCSDS.FRAME.CRC_CHECK:
+      crcPos = dataFieldEndPos + CCSDS.FRAME.CLCW_BYTE_SIZE
+      if crcPatcher != None:
+        # only the frame counters and the CLCW differ from the template
+        crc = crcPatcher.getCRC(
+          [tmFrame.getUnsigned(wordPos, 2)
+           for wordPos in self.getCounterWordPositions()] +
+          [tmFrame.getUnsigned(dataFieldEndPos, 2),
+           tmFrame.getUnsigned(dataFieldEndPos + 2, 2)])
+      else:
+        # the CRC is calculated on a memoryview, the frame is not copied
+        crc = UTIL.CRC.calculate(tmFrame.getMemoryView(0, crcPos))
+      tmFrame.setUnsigned(crcPos, 2, crc)
+  # ---------------------------------------------------------------------------
+  def setMasterChannelFrameCount(self, tmFrame):
+    """sets and increments the master channel frame counter"""
     tmFrame.masterChannelFrameCount = self.masterChannelFrameCount
     self.masterChannelFrameCount += 1
     self.masterChannelFrameCount %= 256
-    tmFrame.virtualChannelFCountLow = self.virtualChannelFrameCount
-    self.virtualChannelFrameCount += 1
-    self.virtualChannelFrameCount %= 256
-    tmFrame.secondaryHeaderFlag = self.frameDefaults.secondaryHeaderFlag
-    tmFrame.synchronisationFlag = self.frameDefaults.synchronisationFlag
-    tmFrame.packetOrderFlag = self.frameDefaults.packetOrderFlag
-    tmFrame.segmentLengthId = self.frameDefaults.segmentLengthId
-    tmFrame.firstHeaderPointer = self.frameDefaults.firstHeaderPointer
-    if enableSecondaryHeader:
-      tmFrame.secondaryHeaderVersionNr = self.frameDefaults.secondaryHeaderVersionNr
-      tmFrame.secondaryHeaderSize = self.frameDefaults.secondaryHeaderSize
-      tmFrame.virtualChannelFCountHigh = self.frameDefaults.virtualChannelFCountHigh
-    tmFrame.append(tmDataPacket.getBufferString())
-    if createIdlePacket:
-      tmFrame.append(tmIdlePacket.getBufferString())
-    tmFrame.append(self.clcw.getBufferString())
+  # ---------------------------------------------------------------------------
+  def setVirtualChannelFrameCount(self, tmFrame, virtualChannel):
+    """sets and increments the virtual channel frame counter"""
+    tmFrame.virtualChannelFCountLow = virtualChannel.frameCount
+    virtualChannel.frameCount += 1
+    virtualChannel.frameCount %= 256
+  # ---------------------------------------------------------------------------
+  def getCounterWordPositions(self):
+    """
+    returns the positions of the 16 bit words in the frame header that
+    contain the frame counters
+    """
+    return [FRAME_COUNTERS_BYTE_POS]
+  # ---------------------------------------------------------------------------
+  def getFirstHeaderPointer(self, tmFrame):
+    """returns the firstHeaderPointer of a frame"""
+    return tmFrame.firstHeaderPointer
+  # ---------------------------------------------------------------------------
+  def setFirstHeaderPointer(self, tmFrame, firstHeaderPointer):
+    """sets the firstHeaderPointer of a frame"""
+    tmFrame.firstHeaderPointer = firstHeaderPointer
+  # ---------------------------------------------------------------------------
+  def createFrameDataUnit(self, frameBuffer):
+    """creates the frame data unit on a bytearray buffer"""
+    enableSecondaryHeader = (self.frameDefaults.secondaryHeaderFlag == 1)
+    return CCSDS.FRAME.TMframe(frameBuffer, enableSecondaryHeader)
+  # ---------------------------------------------------------------------------
+  def getVirtualChannel(self, virtualChannelId=None):
+    """
+    returns the packing state of a virtual channel,
+    None addresses the virtual channel of the frame defaults
+    """
+    if virtualChannelId == None:
+      virtualChannelId = self.frameDefaults.virtualChannelId
+    virtualChannel = self.virtualChannels.get(virtualChannelId)
+    if virtualChannel == None:
+      virtualChannel = VirtualChannel(virtualChannelId)
+      self.virtualChannels[virtualChannelId] = virtualChannel
+    return virtualChannel
+  # ---------------------------------------------------------------------------
+  def packDataUnit(self, virtualChannel, dataUnit, tmFrames):
+    """
+    copies a packet into the pending frame, packets that do not fit are
+    continued in the next frames, completed frames are added to tmFrames
+    """
+    dataFieldPos = self.getDataFieldPos()
+    dataFieldEndPos = self.getDataFieldEndPos()
+    packetSize = len(dataUnit)
+    packetPos = 0
+    while packetPos < packetSize:
+      if virtualChannel.pendingFrame == None:
+        virtualChannel.pendingFrame = self.createTMframe(virtualChannel)
+        self.setFirstHeaderPointer(virtualChannel.pendingFrame,
+                                   CCSDS.FRAME.FHP_NO_PACKET_START)
+        virtualChannel.pendingBytePos = dataFieldPos
+      pendingFrame = virtualChannel.pendingFrame
+      pendingBytePos = virtualChannel.pendingBytePos
+      if packetPos == 0 and \
+         self.getFirstHeaderPointer(pendingFrame) == \
+         CCSDS.FRAME.FHP_NO_PACKET_START:
+        # first packet that starts in this frame
+        self.setFirstHeaderPointer(pendingFrame, pendingBytePos - dataFieldPos)
+      segmentSize = min(packetSize - packetPos,
+                        dataFieldEndPos - pendingBytePos)
+      pendingFrame.setBytes(pendingBytePos,
+                            segmentSize,
+                            dataUnit.getMemoryView(packetPos, segmentSize))
+      virtualChannel.pendingBytePos = pendingBytePos + segmentSize
+      packetPos += segmentSize
+      if virtualChannel.pendingBytePos == dataFieldEndPos:
+        # the frame data field is full
+        tmFrames.append(pendingFrame)
+        virtualChannel.pendingFrame = None
+        virtualChannel.pendingBytePos = 0
+  # ---------------------------------------------------------------------------
+  def getDataFieldPos(self):
+    """returns the byte position of the frame data field"""
+    dataFieldPos = CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_BYTE_SIZE
+    if self.frameDefaults.secondaryHeaderFlag == 1:
+      dataFieldPos += CCSDS.FRAME.TM_FRAME_SECONDARY_HEADER_BYTE_SIZE
+    return dataFieldPos
+  # ---------------------------------------------------------------------------
+  def getDataFieldEndPos(self):
+    """returns the byte position after the frame data field"""
+    dataFieldEndPos = self.frameDefaults.transferFrameSize - \
+                      CCSDS.FRAME.CLCW_BYTE_SIZE
     if CCSDS.FRAME.CRC_CHECK:
-      tmFrame.append("\0" * CCSDS.DU.CRC_BYTE_SIZE)
-      tmFrame.setChecksum()
+      dataFieldEndPos -= 2
+    return dataFieldEndPos
+  # ---------------------------------------------------------------------------
+  def getFrameTemplate(self, virtualChannelId):
+    """
+    returns the preformatted frame header of a virtual channel,
+    the template is created on first usage from the frame defaults
+    """
+    frameTemplate = self.frameTemplates.get(virtualChannelId)
+    if frameTemplate != None:
+      return frameTemplate
+    enableSecondaryHeader = (self.frameDefaults.secondaryHeaderFlag == 1)
+    frameBuffer = bytearray(self.getDataFieldPos())
+    tmFrame = CCSDS.FRAME.TMframe(frameBuffer, enableSecondaryHeader)
+    frameHeader = {
+      "versionNumber": self.frameDefaults.versionNumber,
+      "spacecraftId": self.frameDefaults.spacecraftId,
+      "virtualChannelId": virtualChannelId,
+      "operationalControlField": self.frameDefaults.operationalControlField,
+      "masterChannelFrameCount": 0,
+      "virtualChannelFCountLow": 0,
+      "secondaryHeaderFlag": self.frameDefaults.secondaryHeaderFlag,
+      "synchronisationFlag": self.frameDefaults.synchronisationFlag,
+      "packetOrderFlag": self.frameDefaults.packetOrderFlag,
+      "segmentLengthId": self.frameDefaults.segmentLengthId,
+      "firstHeaderPointer": self.frameDefaults.firstHeaderPointer}
+    if enableSecondaryHeader:
+      frameHeader["secondaryHeaderVersionNr"] = self.frameDefaults.secondaryHeaderVersionNr
+      frameHeader["secondaryHeaderSize"] = self.frameDefaults.secondaryHeaderSize
+      frameHeader["virtualChannelFCountHigh"] = self.frameDefaults.virtualChannelFCountHigh
+    tmFrame.setFields(frameHeader)
+    frameTemplate = tmFrame.buffer
+    self.frameTemplates[virtualChannelId] = frameTemplate
+    return frameTemplate
+  # ---------------------------------------------------------------------------
+  def getIdleFrameTemplate(self, virtualChannelId):
+    """
+    returns the preformatted idle frame of a virtual channel (without CRC)
+    and the CRC patcher for the frame counters and the CLCW
+    """
+    cacheEntry = self.idleFrameTemplates.get(virtualChannelId)
+    if cacheEntry != None:
+      return cacheEntry
+    dataFieldEndPos = self.getDataFieldEndPos()
+    frameBuffer = bytearray(dataFieldEndPos + CCSDS.FRAME.CLCW_BYTE_SIZE)
+    frameTemplate = self.getFrameTemplate(virtualChannelId)
+    frameBuffer[0:len(frameTemplate)] = frameTemplate
+    tmFrame = self.createFrameDataUnit(frameBuffer)
+    self.setFirstHeaderPointer(tmFrame, CCSDS.FRAME.FHP_IDLE_FRAME)
+    idleFrameTemplate = tmFrame.buffer
+    crcPatcher = UTIL.CRC.CRCpatcher(idleFrameTemplate,
+                                     self.getCounterWordPositions() +
+                                     [dataFieldEndPos, dataFieldEndPos + 2])
+    cacheEntry = (idleFrameTemplate, crcPatcher)
+    self.idleFrameTemplates[virtualChannelId] = cacheEntry
+    return cacheEntry
+  # ---------------------------------------------------------------------------
+  def resetFrameTemplates(self):
+    """
+    discards the frame templates and the recycled frames,
+    must be called when the frame defaults are changed
+    """
+    self.frameTemplates = {}
+    self.idleFrameTemplates = {}
+    self.framePool = []
+  # ---------------------------------------------------------------------------
+  def createTMframe(self, virtualChannel, frameTemplate=None):
+    """
+    creates a Transfer TM frame with initialised header
+    and increments the virtual channel frame counter,
+    a recycled frame buffer is reused if available,
+    frameTemplate is copied to the frame start (default: frame header)
+    """
+    if frameTemplate == None:
+      frameTemplate = self.getFrameTemplate(virtualChannel.virtualChannelId)
+    if len(self.framePool) > 0:
+      tmFrame = self.framePool.pop()
+    else:
+      frameBuffer = bytearray(self.frameDefaults.transferFrameSize)
+      tmFrame = self.createFrameDataUnit(frameBuffer)
+    # only the counter is patched in the copy of the header template,
+    # the other parts of the frame are overwritten by completeTMframe
+    # and finaliseTMframe
+    tmFrame.buffer[0:len(frameTemplate)] = frameTemplate
+    self.setVirtualChannelFrameCount(tmFrame, virtualChannel)
     return tmFrame
+  # ---------------------------------------------------------------------------
+  def recycleTMframe(self, tmFrame):
+    """
+    gives a Transfer TM frame back to the generator for reuse
+    implementation of LINK.IF.TMframeGenerator.recycleTMframe
+    """
+    if len(self.framePool) >= FRAME_POOL_SIZE or \
+       len(tmFrame) != self.frameDefaults.transferFrameSize or \
+       type(tmFrame.buffer) != bytearray:
+      # the frame is not reused and left to the garbage collector
+      return
+    self.framePool.append(tmFrame)
+  # ---------------------------------------------------------------------------
+  def completeTMframe(self, tmFrame, bytePos):
+    """fills the frame data field from bytePos with an idle packet"""
+    remainingFrameDataSize = self.getDataFieldEndPos() - bytePos
+    if remainingFrameDataSize != 0:
+      tmIdlePacket = \
+        SPACE.IF.s_tmPacketGenerator.getIdlePacket(remainingFrameDataSize)
+      tmFrame.setBytes(bytePos,
+                       remainingFrameDataSize,
+                       tmIdlePacket.getMemoryView())
+
+# =============================================================================
+class AOSframeGeneratorImpl(TMframeGeneratorImpl):
+  """Generator for AOS transfer frames with M_PDU packet zones"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, insertZoneSize=0):
+    """the insert zone between the primary header and the M_PDU is optional"""
+    TMframeGeneratorImpl.__init__(self)
+    # the AOS spacecraftId has only 8 bits
+    spacecraftId = self.frameDefaults.spacecraftId
+    if spacecraftId > CCSDS.FRAME.AOS_MAX_SPACECRAFT_ID:
+      raise Error("spacecraft ID " + str(spacecraftId) +
+                  " does not fit into the 8 bit AOS spacecraftId")
+    self.insertZoneSize = insertZoneSize
+    self.insertZone = bytearray(insertZoneSize)
+    # the firstHeaderPointer is located in the M_PDU header
+    mpduPos = CCSDS.FRAME.AOS_FRAME_PRIMARY_HEADER_BYTE_SIZE + insertZoneSize
+    self.getMPDUfirstHeaderPointer, self.setMPDUfirstHeaderPointer = \
+      UTIL.DU.compileField(
+        CCSDS.FRAME.MPDU_HEADER_ATTRIBUTES["firstHeaderPointer"], mpduPos)
+  # ---------------------------------------------------------------------------
+  def setInsertZone(self, insertZone):
+    """sets the contents of the insert zone for the next frames"""
+    if len(insertZone) != self.insertZoneSize:
+      raise Error("insert zone must have " + str(self.insertZoneSize) +
+                  " bytes")
+    self.insertZone = bytearray(insertZone)
+    self.resetFrameTemplates()
+  # ---------------------------------------------------------------------------
+  def setMasterChannelFrameCount(self, tmFrame):
+    """AOS frames have no master channel frame counter"""
+    pass
+  # ---------------------------------------------------------------------------
+  def setVirtualChannelFrameCount(self, tmFrame, virtualChannel):
+    """sets and increments the 24 bit virtual channel frame counter"""
+    tmFrame.virtualChannelFrameCount = virtualChannel.frameCount
+    virtualChannel.frameCount += 1
+    virtualChannel.frameCount %= CCSDS.FRAME.AOS_VC_FRAME_COUNT_MODULO
+  # ---------------------------------------------------------------------------
+  def getCounterWordPositions(self):
+    """
+    returns the positions of the 16 bit words in the frame header that
+    contain the frame counter
+    """
+    return AOS_FRAME_COUNTER_WORD_POSITIONS
+  # ---------------------------------------------------------------------------
+  def getFirstHeaderPointer(self, tmFrame):
+    """returns the firstHeaderPointer of the M_PDU"""
+    return self.getMPDUfirstHeaderPointer(tmFrame)
+  # ---------------------------------------------------------------------------
+  def setFirstHeaderPointer(self, tmFrame, firstHeaderPointer):
+    """sets the firstHeaderPointer of the M_PDU"""
+    self.setMPDUfirstHeaderPointer(tmFrame, firstHeaderPointer)
+  # ---------------------------------------------------------------------------
+  def createFrameDataUnit(self, frameBuffer):
+    """creates the frame data unit on a bytearray buffer"""
+    return CCSDS.FRAME.AOSframe(frameBuffer)
+  # ---------------------------------------------------------------------------
+  def getDataFieldPos(self):
+    """returns the byte position of the M_PDU packet zone"""
+    return CCSDS.FRAME.AOS_FRAME_PRIMARY_HEADER_BYTE_SIZE + \
+           self.insertZoneSize + CCSDS.FRAME.MPDU_HEADER_BYTE_SIZE
+  # ---------------------------------------------------------------------------
+  def getFrameTemplate(self, virtualChannelId):
+    """
+    returns the preformatted frame header, insert zone and M_PDU header
+    of a virtual channel, the template is created on first usage
+    """
+    frameTemplate = self.frameTemplates.get(virtualChannelId)
+    if frameTemplate != None:
+      return frameTemplate
+    frameBuffer = bytearray(self.getDataFieldPos())
+    aosFrame = CCSDS.FRAME.AOSframe(frameBuffer)
+    frameHeader = {
+      "versionNumber": CCSDS.FRAME.AOS_VERSION_NUMBER,
+      "spacecraftId": self.frameDefaults.spacecraftId,
+      "virtualChannelId": virtualChannelId,
+      "virtualChannelFrameCount": 0,
+      "replayFlag": 0,
+      "vcFrameCountUsageFlag": 0,
+      "spareField": 0,
+      "vcFrameCountCycle": 0}
+    aosFrame.setFields(frameHeader)
+    insertZonePos = CCSDS.FRAME.AOS_FRAME_PRIMARY_HEADER_BYTE_SIZE
+    frameBuffer[insertZonePos:insertZonePos + self.insertZoneSize] = \
+      self.insertZone
+    self.setFirstHeaderPointer(aosFrame, self.frameDefaults.firstHeaderPointer)
+    frameTemplate = aosFrame.buffer
+    self.frameTemplates[virtualChannelId] = frameTemplate
+    return frameTemplate
 
 #############
 # functions #
 #############
 def init():
   # initialise singleton(s)
-  LINK.IF.s_tmFrameGenerator = TMframeGeneratorImpl()
+  if LINK.IF.s_configuration != None and \
+     LINK.IF.s_configuration.tmFrameFormat == LINK.IF.TM_FRAME_FORMAT_AOS:
+    LINK.IF.s_tmFrameGenerator = AOSframeGeneratorImpl(
+      LINK.IF.s_configuration.aosInsertZoneSize)
+  else:
+    LINK.IF.s_tmFrameGenerator = TMframeGeneratorImpl()
@@ -12,8 +12,10 @@
 # General Public License for more details.                                    *
 #******************************************************************************
 # Link Simulation - Telemetry and Telecommand Channels                        *
+# The uplink and downlink delays are simulated with delay lines, a single     *
+# timer is armed for the earliest due time.                                   *
 #******************************************************************************
-import array
+import array, heapq, math
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import CCSDS.CLTU, CCSDS.FRAME, CCSDS.PACKET, CCSDS.SEGMENT, CCSDS.SEGMENThelpers
 import GRND.IF
@@ -24,13 +26,51 @@ import UTIL.SYS, UTIL.TASK, UTIL.TIME
 #############
 # constants #
 #############
-CHECK_CYCLIC_PERIOD_MS = 100
 UPLINK_DELAY_SEC = 2
 DOWNLINK_DELAY_SEC = 2
 
 ###########
 # classes #
 ###########
+# =============================================================================
+class DelayLine(object):
+  """items that are delayed until their due time, ordered in a heap"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    """initialise an empty delay line"""
+    self.heap = []
+    self.sequenceNumber = 0
+  # ---------------------------------------------------------------------------
+  def __len__(self):
+    """returns the number of delayed items"""
+    return len(self.heap)
+  # ---------------------------------------------------------------------------
+  def push(self, dueTime, item):
+    """delays an item until dueTime"""
+    # the sequence number keeps the order of items with the same dueTime
+    # and avoids that the items themselves are compared
+    heapq.heappush(self.heap, (dueTime, self.sequenceNumber, item))
+    self.sequenceNumber += 1
+  # ---------------------------------------------------------------------------
+  def getNextDueTime(self):
+    """returns the earliest dueTime or None if the delay line is empty"""
+    if len(self.heap) == 0:
+      return None
+    return self.heap[0][0]
+  # ---------------------------------------------------------------------------
+  def popExpired(self, actualTime):
+    """removes and returns the items with dueTime <= actualTime in order"""
+    heap = self.heap
+    items = []
+    while len(heap) > 0 and heap[0][0] <= actualTime:
+      items.append(heapq.heappop(heap)[2])
+    return items
+  # ---------------------------------------------------------------------------
+  def getEntries(self):
+    """returns the list of (dueTime, item) in order, e.g. for displays"""
+    return [(dueTime, item) for dueTime, sequenceNumber, item
+            in sorted(self.heap)]
+
 # =============================================================================
 class CCSDSgroundSpace(LINK.IF.SpaceLink, LINK.IF.PacketLink):
   """
@@ -41,23 +81,27 @@ class CCSDSgroundSpace(LINK.IF.SpaceLink, LINK.IF.PacketLink):
   def __init__(self):
     """Initialise attributes only"""
     self.segmentDus = []
-    self.uplinkQueue = {}
-    self.downlinkQueue = {}
-    self.checkCyclicCallback()
+    self.uplinkDelayLine = DelayLine()
+    self.downlinkDelayLine = DelayLine()
+    # a single timer is armed for the earliest due time, a timer that is
+    # superseded by an earlier one is ignored when it expires
+    self.timerDueTime = None
+    self.timerGeneration = 0
+    self.armTimer()
   # ---------------------------------------------------------------------------
   def getUplinkQueue(self):
     """
     returns the uplink queue:
     implementation of LINK.IF.SpaceLink.getUplinkQueue
     """
-    return self.uplinkQueue
+    return self.uplinkDelayLine.getEntries()
   # ---------------------------------------------------------------------------
   def getDownlinkQueue(self):
     """
     returns the downlink queue:
     implementation of LINK.IF.SpaceLink.getDownlinkQueue
     """
-    return self.downlinkQueue
+    return self.downlinkDelayLine.getEntries()
   # ---------------------------------------------------------------------------
   def pushTCcltu(self, cltu):
     """
@@ -75,62 +119,112 @@ class CCSDSgroundSpace(LINK.IF.SpaceLink, LINK.IF.PacketLink):
       return
     # put the TC frame into the uplink queue to simulate the uplink delay
     receptionTime = UTIL.TIME.getActualTime() + UPLINK_DELAY_SEC
-    self.uplinkQueue[receptionTime] = tcFrameDu
+    self.uplinkDelayLine.push(receptionTime, tcFrameDu)
     UTIL.TASK.s_processingTask.notifyGUItask("TC_FRAME")
+    self.armTimer()
   # ---------------------------------------------------------------------------
   def pushTMpacket(self, tmPacketDu, ertUTC):
     """
     consumes a telemetry packet:
     implementation of LINK.IF.PacketLink.pushTMpacket
     """
-    tmFrameDu = LINK.IF.s_tmFrameGenerator.getTMframe(tmPacketDu)
-    if tmFrameDu == None:
-      LOG_ERROR("cannot determine frame for packet", "LINK")
+    tmFrameLatencyMs = LINK.IF.s_configuration.tmFrameLatencyMs
+    if tmFrameLatencyMs <= 0:
+      # no packing: the TM packet is sent immediately,
+      # large TM packets are segmented over several TM frames
+      flushTime = None
+    else:
+      flushTime = UTIL.TIME.getActualTime() + tmFrameLatencyMs / 1000.0
+    LINK.IF.s_vcMultiplexer.pushTMpacket(tmPacketDu, ertUTC, flushTime)
+    if LINK.IF.s_frameClock == None:
+      self.downlinkTMframes()
+    self.armTimer()
+  # ---------------------------------------------------------------------------
+  def downlinkTMframes(self):
+    """puts the TM frames of the VC multiplexer into the downlink queue"""
+    while True:
+      nextFrame = LINK.IF.s_vcMultiplexer.getNextTMframe()
+      if nextFrame == None:
+        break
+      tmFrameDu, ertUTC = nextFrame
+      self.downlinkTMframe(tmFrameDu, ertUTC)
+  # ---------------------------------------------------------------------------
+  def downlinkTMframe(self, tmFrameDu, ertUTC, sendTime=None):
+    """puts a TM frame into the downlink queue"""
     # put the TM frame into the downlink queue to simulate the downlink delay
-    receptionTime = UTIL.TIME.getActualTime() + DOWNLINK_DELAY_SEC
-    self.downlinkQueue[receptionTime] = (tmFrameDu, ertUTC)
+    if sendTime == None:
+      sendTime = UTIL.TIME.getActualTime()
+    receptionTime = sendTime + DOWNLINK_DELAY_SEC
+    self.downlinkDelayLine.push(receptionTime, (tmFrameDu, ertUTC))
     UTIL.TASK.s_processingTask.notifyGUItask("TM_FRAME")
   # ---------------------------------------------------------------------------
-  def checkCyclicCallback(self):
+  def getNextDueTime(self):
+    """
+    returns the earliest time of the delay lines, the latency of the
+    pending TM frames and the next constant rate frame slot
+    """
+    dueTimes = [self.uplinkDelayLine.getNextDueTime(),
+                self.downlinkDelayLine.getNextDueTime(),
+                LINK.IF.s_vcMultiplexer.getNextFlushTime()]
+    if LINK.IF.s_frameClock != None:
+      nextFrameTime = LINK.IF.s_frameClock.getNextFrameTime()
+      if nextFrameTime == None:
+        # the frame clock is started with the first tick
+        nextFrameTime = UTIL.TIME.getActualTime()
+      dueTimes.append(nextFrameTime)
+    dueTimes = [dueTime for dueTime in dueTimes if dueTime != None]
+    if len(dueTimes) == 0:
+      return None
+    return min(dueTimes)
+  # ---------------------------------------------------------------------------
+  def armTimer(self):
+    """arms the timer for the earliest due time if it is not yet armed"""
+    nextDueTime = self.getNextDueTime()
+    if nextDueTime == None:
+      return
+    if self.timerDueTime != None and self.timerDueTime <= nextDueTime:
+      # the armed timer expires early enough
+      return
+    self.timerDueTime = nextDueTime
+    self.timerGeneration += 1
+    timerGeneration = self.timerGeneration
+    delayMs = (nextDueTime - UTIL.TIME.getActualTime()) * 1000.0
+    delayMs = max(int(math.ceil(delayMs)), 0)
+    UTIL.TASK.s_processingTask.createTimeHandler(
+      delayMs, lambda: self.timerCallback(timerGeneration))
+  # ---------------------------------------------------------------------------
+  def timerCallback(self, timerGeneration):
     """
     timer triggered: check if the uplink and downlink simulation indicates that
     the uplink / downlink of frames is completed
     """
+    if timerGeneration != self.timerGeneration:
+      # superseded by a timer for an earlier due time
+      return
+    self.timerDueTime = None
     actualTime = UTIL.TIME.getActualTime()
-    UTIL.TASK.s_processingTask.createTimeHandler(CHECK_CYCLIC_PERIOD_MS,
-                                                 self.checkCyclicCallback)
-    # check if uplink times in the uplink queue are expired
-    receptionTimes = self.uplinkQueue.keys()
-    receptionTimes.sort()
-    tcFramesDeleted = False
-    for receptionTime in receptionTimes:
-      if receptionTime <= actualTime:
-        # reception time has expired ---> process TC frame
-        tcFrameDu = self.uplinkQueue[receptionTime]
-        self.receiveTCframe(tcFrameDu)
-        # remove TC frame
-        del self.uplinkQueue[receptionTime]
-        tcFramesDeleted = True
-      else:
-        break
-    if tcFramesDeleted:
+    # check if the latency of pending TM frames is expired
+    LINK.IF.s_vcMultiplexer.flushExpiredFrames(actualTime)
+    if LINK.IF.s_frameClock == None:
+      self.downlinkTMframes()
+    else:
+      # constant rate downlink: the frame slots up to now are sent
+      for tmFrameDu, ertUTC, sendTime in \
+        LINK.IF.s_frameClock.tick(actualTime):
+        self.downlinkTMframe(tmFrameDu, ertUTC, sendTime)
+    # process the TC frames with expired uplink time
+    tcFrameDus = self.uplinkDelayLine.popExpired(actualTime)
+    for tcFrameDu in tcFrameDus:
+      self.receiveTCframe(tcFrameDu)
+    if len(tcFrameDus) > 0:
       UTIL.TASK.s_processingTask.notifyGUItask("TC_FRAME")
-    # check if downlink times in the downlink queue are expired
-    receptionTimes = self.downlinkQueue.keys()
-    receptionTimes.sort()
-    tmFramesDeleted = False
-    for receptionTime in receptionTimes:
-      if receptionTime <= actualTime:
-        # reception time has expired ---> process TM frame
-        tmFrameDu, ertUTC = self.downlinkQueue[receptionTime]
-        self.receiveTMframe(tmFrameDu, ertUTC)
-        # remove TM frame
-        del self.downlinkQueue[receptionTime]
-        tmFramesDeleted = True
-      else:
-        break
-    if tmFramesDeleted:
+    # process the TM frames with expired downlink time
+    tmFrames = self.downlinkDelayLine.popExpired(actualTime)
+    for tmFrameDu, ertUTC in tmFrames:
+      self.receiveTMframe(tmFrameDu, ertUTC)
+    if len(tmFrames) > 0:
       UTIL.TASK.s_processingTask.notifyGUItask("TM_FRAME")
+    self.armTimer()
   # ---------------------------------------------------------------------------
   def receiveTCframe(self, tcFrameDu):
     """TC frame received"""
@@ -208,6 +302,8 @@ class CCSDSgroundSpace(LINK.IF.SpaceLink, LINK.IF.PacketLink):
   def receiveTMframe(self, tmFrameDu, ertUTC):
     """TM frame received"""
     GRND.IF.s_tmMcsLink.pushTMframe(tmFrameDu, ertUTC)
+    # the ground link copies the frame ---> the frame buffer can be reused
+    LINK.IF.s_tmFrameGenerator.recycleTMframe(tmFrameDu)
 
 #############
 # functions #
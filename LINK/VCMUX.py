@@ -0,0 +1,315 @@
+#******************************************************************************
+# (C) 2017, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under the terms of the GNU Lesser General Public License as       *
+# published by the Free Software Foundation; either version 2.1 of the        *
+# License, or (at your option) any later version.                             *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser     *
+# General Public License for more details.                                    *
+#******************************************************************************
+# Link Simulation - Virtual Channel Multiplexer                               *
+# TM packets are routed by APID rules to virtual channels and packed into     *
+# frames of that virtual channel. The completed frames are queued per VC and  *
+# the next frame is selected by one of the scheduling policies:               *
+# - VC_POLICY_PRIORITY: lowest priority value first (bit mask of non-empty    *
+#   queues in priority order, the lowest set bit is selected)                 *
+# - VC_POLICY_WEIGHTED_ROUND_ROBIN: a VC sends up to weight frames before     *
+#   the next non-empty VC is served (ring of non-empty queues)                *
+# - VC_POLICY_RATE_SHARE: precomputed calendar with weight slots per VC,      *
+#   slots of empty VCs are given to the VCs in priority order                 *
+# All policies select the next frame in O(1), independent of the number of    *
+# virtual channels. The flush times of the pending frames are kept in a heap. *
+#******************************************************************************
+import collections, heapq
+from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import LINK.IF
+import SCOS.ENV
+
+#############
+# constants #
+#############
+VC_POLICIES = [LINK.IF.VC_POLICY_PRIORITY,
+               LINK.IF.VC_POLICY_WEIGHTED_ROUND_ROBIN,
+               LINK.IF.VC_POLICY_RATE_SHARE]
+
+###########
+# classes #
+###########
+# =============================================================================
+class VirtualChannelQueue(object):
+  """Frame queue and scheduling state of a virtual channel"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, virtualChannelId, priority, weight):
+    """default constructor"""
+    self.virtualChannelId = virtualChannelId
+    self.priority = priority
+    self.weight = weight
+    # completed frames: (tmFrameDu, ertUTC)
+    self.frames = collections.deque()
+    # bit in the mask of non-empty queues, defined by the priority order
+    self.rankBit = 0
+    # remaining frames in the actual round-robin turn
+    self.credit = 0
+    # flush time and ERT of the pending frame
+    self.flushTime = None
+    self.pendingErtUTC = None
+
+# =============================================================================
+class VCmultiplexerImpl(LINK.IF.VCmultiplexer):
+  """Implementation of the virtual channel multiplexer"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, tmFrameGenerator, defaultVirtualChannelId,
+               policy=LINK.IF.VC_POLICY_PRIORITY):
+    """
+    initialises the multiplexer with the default virtual channel,
+    TM packets without matching APID rule are sent on this VC
+    """
+    self.tmFrameGenerator = tmFrameGenerator
+    self.defaultVirtualChannelId = defaultVirtualChannelId
+    if policy not in VC_POLICIES:
+      raise Error("invalid VC scheduling policy: " + str(policy))
+    self.policy = policy
+    self.vcQueues = {}
+    # VC queues in priority order
+    self.rankedQueues = []
+    # bit mask of the non-empty VC queues, bit i = rankedQueues[i]
+    self.nonEmptyMask = 0
+    # ring of non-empty VC queues, only for the weighted round-robin
+    self.activeQueues = collections.deque()
+    # slots for the rate share
+    self.calendar = []
+    self.calendarPos = 0
+    # APID routing: (firstAPID, lastAPID, virtualChannelId)
+    self.apidRules = []
+    self.apidCache = {}
+    self.queueDepth = 0
+    # heap of (flushTime, virtualChannelId) of the pending frames, entries
+    # that no longer match the flushTime of their VC queue are skipped
+    self.flushHeap = []
+    self.addVirtualChannel(defaultVirtualChannelId)
+  # ---------------------------------------------------------------------------
+  def setPolicy(self, policy):
+    """
+    selects the VC scheduling policy:
+    implementation of LINK.IF.VCmultiplexer.setPolicy
+    """
+    if policy not in VC_POLICIES:
+      raise Error("invalid VC scheduling policy: " + str(policy))
+    self.policy = policy
+    self.updateSchedule()
+  # ---------------------------------------------------------------------------
+  def addVirtualChannel(self, virtualChannelId, priority=0, weight=1):
+    """
+    adds a virtual channel or changes its priority and weight:
+    implementation of LINK.IF.VCmultiplexer.addVirtualChannel
+    """
+    if weight < 1:
+      raise Error("invalid weight for virtual channel " +
+                  str(virtualChannelId))
+    vcQueue = self.vcQueues.get(virtualChannelId)
+    if vcQueue == None:
+      vcQueue = VirtualChannelQueue(virtualChannelId, priority, weight)
+      self.vcQueues[virtualChannelId] = vcQueue
+    else:
+      vcQueue.priority = priority
+      vcQueue.weight = weight
+    self.updateSchedule()
+  # ---------------------------------------------------------------------------
+  def updateSchedule(self):
+    """
+    re-calculates the priority order, the non-empty mask, the round-robin
+    ring and the rate share calendar after a configuration change
+    """
+    rankedQueues = self.vcQueues.values()
+    rankedQueues.sort(key=lambda vcQueue: (vcQueue.priority,
+                                           vcQueue.virtualChannelId))
+    self.rankedQueues = rankedQueues
+    self.nonEmptyMask = 0
+    self.activeQueues = collections.deque()
+    for rank, vcQueue in enumerate(rankedQueues):
+      vcQueue.rankBit = 1 << rank
+      if len(vcQueue.frames) > 0:
+        self.nonEmptyMask |= vcQueue.rankBit
+        if self.policy == LINK.IF.VC_POLICY_WEIGHTED_ROUND_ROBIN:
+          vcQueue.credit = vcQueue.weight
+          self.activeQueues.append(vcQueue)
+    # smooth weighted distribution of the calendar slots
+    totalWeight = sum([vcQueue.weight for vcQueue in rankedQueues])
+    currentWeights = [0] * len(rankedQueues)
+    self.calendar = []
+    for slot in xrange(totalWeight):
+      bestIndex = 0
+      for i, vcQueue in enumerate(rankedQueues):
+        currentWeights[i] += vcQueue.weight
+        if currentWeights[i] > currentWeights[bestIndex]:
+          bestIndex = i
+      currentWeights[bestIndex] -= totalWeight
+      self.calendar.append(rankedQueues[bestIndex])
+    self.calendarPos = 0
+  # ---------------------------------------------------------------------------
+  def addAPIDrule(self, firstAPID, lastAPID, virtualChannelId):
+    """
+    routes the TM packets of an APID range to a virtual channel,
+    the first matching rule is used:
+    implementation of LINK.IF.VCmultiplexer.addAPIDrule
+    """
+    if virtualChannelId not in self.vcQueues:
+      raise Error("APID rule for unknown virtual channel " +
+                  str(virtualChannelId))
+    self.apidRules.append((firstAPID, lastAPID, virtualChannelId))
+    self.apidCache = {}
+  # ---------------------------------------------------------------------------
+  def getVirtualChannelId(self, applicationProcessId):
+    """
+    returns the virtual channel of an APID:
+    implementation of LINK.IF.VCmultiplexer.getVirtualChannelId
+    """
+    virtualChannelId = self.apidCache.get(applicationProcessId)
+    if virtualChannelId != None:
+      return virtualChannelId
+    virtualChannelId = self.defaultVirtualChannelId
+    for firstAPID, lastAPID, ruleVirtualChannelId in self.apidRules:
+      if firstAPID <= applicationProcessId <= lastAPID:
+        virtualChannelId = ruleVirtualChannelId
+        break
+    self.apidCache[applicationProcessId] = virtualChannelId
+    return virtualChannelId
+  # ---------------------------------------------------------------------------
+  def pushTMpacket(self, tmPacketDu, ertUTC, flushTime):
+    """
+    packs a TM packet into the frames of its virtual channel:
+    implementation of LINK.IF.VCmultiplexer.pushTMpacket
+    """
+    virtualChannelId = \
+      self.getVirtualChannelId(tmPacketDu.applicationProcessId)
+    vcQueue = self.vcQueues[virtualChannelId]
+    # the first completed frame is the pending one (if there is one)
+    if vcQueue.flushTime != None:
+      frameErtUTC = vcQueue.pendingErtUTC
+    else:
+      frameErtUTC = ertUTC
+    tmFrameDus = self.tmFrameGenerator.fillTMframes(tmPacketDu,
+                                                    virtualChannelId)
+    for tmFrameDu in tmFrameDus:
+      self.queueTMframe(vcQueue, tmFrameDu, frameErtUTC)
+      frameErtUTC = ertUTC
+    if not self.tmFrameGenerator.isTMframePending(virtualChannelId):
+      vcQueue.flushTime = None
+      vcQueue.pendingErtUTC = None
+    elif flushTime == None:
+      # no packing latency ---> the pending frame is sent immediately
+      tmFrameDu = self.tmFrameGenerator.fillIdleTMframe(virtualChannelId)
+      self.queueTMframe(vcQueue, tmFrameDu, frameErtUTC)
+      vcQueue.flushTime = None
+      vcQueue.pendingErtUTC = None
+    elif len(tmFrameDus) > 0 or vcQueue.flushTime == None:
+      # a new pending frame is flushed when the latency is expired
+      vcQueue.flushTime = flushTime
+      vcQueue.pendingErtUTC = ertUTC
+      heapq.heappush(self.flushHeap, (flushTime, virtualChannelId))
+  # ---------------------------------------------------------------------------
+  def flushExpiredFrames(self, actualTime):
+    """
+    flushes the pending frames with an expired flushTime:
+    implementation of LINK.IF.VCmultiplexer.flushExpiredFrames
+    """
+    flushHeap = self.flushHeap
+    while len(flushHeap) > 0 and flushHeap[0][0] <= actualTime:
+      flushTime, virtualChannelId = heapq.heappop(flushHeap)
+      vcQueue = self.vcQueues[virtualChannelId]
+      if vcQueue.flushTime != flushTime:
+        # the frame was completed or has got a new flushTime
+        continue
+      tmFrameDu = self.tmFrameGenerator.fillIdleTMframe(virtualChannelId)
+      if tmFrameDu != None:
+        self.queueTMframe(vcQueue, tmFrameDu, vcQueue.pendingErtUTC)
+      # the rest of a segmented idle packet can remain in a pending frame,
+      # the latency of this frame starts with the next TM packet
+      vcQueue.flushTime = None
+      vcQueue.pendingErtUTC = None
+  # ---------------------------------------------------------------------------
+  def getNextFlushTime(self):
+    """
+    returns the earliest flushTime of the pending frames or None:
+    implementation of LINK.IF.VCmultiplexer.getNextFlushTime
+    """
+    flushHeap = self.flushHeap
+    while len(flushHeap) > 0:
+      flushTime, virtualChannelId = flushHeap[0]
+      if self.vcQueues[virtualChannelId].flushTime == flushTime:
+        return flushTime
+      # outdated entry
+      heapq.heappop(flushHeap)
+    return None
+  # ---------------------------------------------------------------------------
+  def queueTMframe(self, vcQueue, tmFrameDu, ertUTC):
+    """puts a frame into the queue of its virtual channel"""
+    if len(vcQueue.frames) == 0:
+      # the queue becomes non-empty
+      self.nonEmptyMask |= vcQueue.rankBit
+      if self.policy == LINK.IF.VC_POLICY_WEIGHTED_ROUND_ROBIN:
+        vcQueue.credit = vcQueue.weight
+        self.activeQueues.append(vcQueue)
+    vcQueue.frames.append((tmFrameDu, ertUTC))
+    self.queueDepth += 1
+  # ---------------------------------------------------------------------------
+  def getNextTMframe(self):
+    """
+    returns (tmFrameDu, ertUTC) of the next frame to be sent:
+    implementation of LINK.IF.VCmultiplexer.getNextTMframe
+    """
+    if self.nonEmptyMask == 0:
+      return None
+    if self.policy == LINK.IF.VC_POLICY_WEIGHTED_ROUND_ROBIN:
+      vcQueue = self.activeQueues[0]
+      vcQueue.credit -= 1
+    elif self.policy == LINK.IF.VC_POLICY_RATE_SHARE:
+      vcQueue = self.calendar[self.calendarPos]
+      self.calendarPos += 1
+      if self.calendarPos == len(self.calendar):
+        self.calendarPos = 0
+      if len(vcQueue.frames) == 0:
+        vcQueue = self.getPriorityQueue()
+    else:
+      vcQueue = self.getPriorityQueue()
+    tmFrameDu, ertUTC = vcQueue.frames.popleft()
+    self.queueDepth -= 1
+    if len(vcQueue.frames) == 0:
+      # the queue becomes empty
+      self.nonEmptyMask &= ~vcQueue.rankBit
+      if self.policy == LINK.IF.VC_POLICY_WEIGHTED_ROUND_ROBIN:
+        self.activeQueues.popleft()
+    elif self.policy == LINK.IF.VC_POLICY_WEIGHTED_ROUND_ROBIN and \
+         vcQueue.credit <= 0:
+      # the turn of this VC is over
+      vcQueue.credit = vcQueue.weight
+      self.activeQueues.rotate(-1)
+    # the frame gets the master channel counter and CLCW when it is sent
+    self.tmFrameGenerator.finaliseTMframe(tmFrameDu)
+    return (tmFrameDu, ertUTC)
+  # ---------------------------------------------------------------------------
+  def getPriorityQueue(self):
+    """returns the non-empty VC queue with the highest priority"""
+    lowestBit = self.nonEmptyMask & -self.nonEmptyMask
+    return self.rankedQueues[lowestBit.bit_length() - 1]
+  # ---------------------------------------------------------------------------
+  def getQueueDepth(self):
+    """
+    returns the number of frames in the virtual channel queues:
+    implementation of LINK.IF.VCmultiplexer.getQueueDepth
+    """
+    return self.queueDepth
+
+#############
+# functions #
+#############
+def init():
+  # initialise singleton(s)
+  LINK.IF.s_vcMultiplexer = VCmultiplexerImpl(
+    LINK.IF.s_tmFrameGenerator,
+    SCOS.ENV.s_environment.getVirtualChannelID(),
+    LINK.IF.s_configuration.tmVCpolicy)
@@ -13,7 +13,7 @@
 #******************************************************************************
 # PUS Services - Packet Module                                                *
 #******************************************************************************
-from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME
+from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME, compileBinaryUnit
 import CCSDS.PACKET, CCSDS.TIME
 
 #############
@@ -69,8 +69,11 @@ s_tmTTtimeFormat = DEFAULT_TM_TT_TIME_FORMAT
 # classes #
 ###########
 # =============================================================================
-class TMpacket(CCSDS.PACKET.TMpacket):
+class TMpacket(compileBinaryUnit(CCSDS.PACKET.TMpacket,
+    attributesSize1=CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE,
+    attributeMap2=TM_PACKET_DATAFIELD_HEADER_ATTRIBUTES)):
   """telemetry PUS packet (with datafield header)"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise datafield header"""
@@ -96,8 +99,11 @@ class TMpacket(CCSDS.PACKET.TMpacket):
     self.setTime(s_tmTTtimeByteOffset, s_tmTTtimeFormat, timeTag)
 
 # =============================================================================
-class TCpacket(CCSDS.PACKET.TCpacket):
+class TCpacket(compileBinaryUnit(CCSDS.PACKET.TCpacket,
+    attributesSize1=CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE,
+    attributeMap2=TC_PACKET_DATAFIELD_HEADER_ATTRIBUTES)):
   """telecommand PUS packet (with datafield header)"""
+  __slots__ = ()
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None):
     """default constructor: initialise datafield header"""
@@ -17,14 +17,14 @@
 import sys, os
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
 import GRND.IF, GRND.NCTRSDU
-import LINK.IF, LINK.TMGEN, LINK.TMTC
+import LINK.IF, LINK.RATE, LINK.TMGEN, LINK.TMTC, LINK.VCMUX
 import PUS.PACKET, PUS.SERVICES
 import SCOS.ENV
 import SIM.TMserver, SIM.TCserver, SIM.AdminServer, SIM.GRNDgui, SIM.LINKgui
 import SPACE.DEF, SPACE.IF, SPACE.OBC, SPACE.OBQ, SPACE.TMGEN, SPACE.TMRPLY
 import SPACEUI.SPACEgui, SPACEUI.OBQgui
 import UI.TKI
-import UTIL.SYS, UTIL.TCO, UTIL.TASK
+import UTIL.SYS, UTIL.TASK, UTIL.TCO, UTIL.TIME
 
 #############
 # constants #
@@ -56,10 +56,17 @@ SYS_CONFIGURATION = [
   ["TM_TT_TIME_BYTE_OFFSET", "<<shall be passed as environment variable>>"],
   ["TM_RECORD_FORMAT", "CRYOSAT"],
   ["TM_REPLAY_KEY", "SPID"],
+  ["TM_FRAME_LATENCY_MS", "500"],
+  ["TM_VC_POLICY", LINK.IF.VC_POLICY_PRIORITY],
+  ["TM_FRAME_RATE", "0"],
+  ["TM_IDLE_VC", ""],
+  ["TM_FRAME_FORMAT", LINK.IF.TM_FRAME_FORMAT_TM],
+  ["AOS_INSERT_ZONE_SIZE", "0"],
   ["OBT_MISSION_EPOCH_STR", UTIL.TCO.TAI_MISSION_EPOCH_STR],
   ["OBT_LEAP_SECONDS", str(UTIL.TCO.GPS_LEAP_SECONDS_2017)],
   ["ERT_MISSION_EPOCH_STR", UTIL.TCO.TAI_MISSION_EPOCH_STR],
   ["ERT_LEAP_SECONDS", str(UTIL.TCO.GPS_LEAP_SECONDS_2017)],
+  ["SIM_CLOCK", UTIL.TIME.CLOCK_REALTIME],
   ["SYS_COLOR_LOG", "1"],
   ["SYS_APP_MNEMO", "SIM"],
   ["SYS_APP_NAME", "Simulator"],
@@ -1040,6 +1047,7 @@ else:
   launchScriptName = sys.argv[1]
 # initialise the system configuration
 UTIL.SYS.s_configuration.setDefaults(SYS_CONFIGURATION)
+UTIL.TIME.setClock(UTIL.TIME.createClock(UTIL.SYS.s_configuration.SIM_CLOCK))
 UTIL.TCO.setOBTmissionEpochStr(UTIL.SYS.s_configuration.OBT_MISSION_EPOCH_STR)
 UTIL.TCO.setOBTleapSeconds(int(UTIL.SYS.s_configuration.OBT_LEAP_SECONDS))
 UTIL.TCO.setERTmissionEpochStr(UTIL.SYS.s_configuration.ERT_MISSION_EPOCH_STR)
@@ -1103,8 +1111,10 @@ SPACE.OBC.init(egseMode=False)
 SPACE.OBQ.init()
 SPACE.TMGEN.init()
 SPACE.TMRPLY.init()
-LINK.TMTC.init()
 LINK.TMGEN.init()
+LINK.VCMUX.init()
+LINK.RATE.init()
+LINK.TMTC.init()
 
 # create the NCTRS servers
 LOG("Open the NCTRS TM sender (server)")
@@ -15,6 +15,7 @@
 #******************************************************************************
 import Tkinter, tkSimpleDialog
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import CCSDS.FRAME
 import LINK.IF
 import UI.TKI
 import UTIL.TIME
@@ -175,10 +176,7 @@ class GUIview(UI.TKI.GUIwinView):
     self.uplinkQueueContents.list().insert(1, QUEUE_HEADER2)
     entryPos = 2
     uplinkQueue = LINK.IF.s_spaceLink.getUplinkQueue()
-    receptionTimes = uplinkQueue.keys()
-    receptionTimes.sort()
-    for receptionTime in receptionTimes:
-      tcFrameDu = uplinkQueue[receptionTime]
+    for receptionTime, tcFrameDu in uplinkQueue:
       rowText = QUEUE_ROW_FORMAT % (UTIL.TIME.getASDtimeStr(receptionTime),
                                     tcFrameDu.sequenceNumber)
       self.uplinkQueueContents.list().insert(entryPos, rowText)
@@ -192,16 +190,18 @@ class GUIview(UI.TKI.GUIwinView):
     self.downlinkQueueContents.list().insert(1, QUEUE_HEADER2)
     entryPos = 2
     downlinkQueue = LINK.IF.s_spaceLink.getDownlinkQueue()
-    receptionTimes = downlinkQueue.keys()
-    receptionTimes.sort()
-    for receptionTime in receptionTimes:
-      tmFrameDu, ertUTC = downlinkQueue[receptionTime]
+    for receptionTime, (tmFrameDu, ertUTC) in downlinkQueue:
       if ertUTC == None:
         displayTime = receptionTime
       else:
         displayTime = ertUTC
+      if isinstance(tmFrameDu, CCSDS.FRAME.AOSframe):
+        # no master channel counter, the low byte fits into the column
+        frameCount = tmFrameDu.virtualChannelFrameCount & 0xFF
+      else:
+        frameCount = tmFrameDu.masterChannelFrameCount
       rowText = QUEUE_ROW_FORMAT % (UTIL.TIME.getASDtimeStr(displayTime),
-                                    tmFrameDu.masterChannelFrameCount)
+                                    frameCount)
       self.downlinkQueueContents.list().insert(entryPos, rowText)
       entryPos += 1
   # ---------------------------------------------------------------------------
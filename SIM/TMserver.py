@@ -15,6 +15,7 @@
 #******************************************************************************
 import sys
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
+import CCSDS.FRAME
 import GRND.CRYOSATDU, GRND.IF, GRND.NCTRS, GRND.NCTRSDU
 import SPACE.OBC
 import UTIL.DU, UTIL.SYS, UTIL.TASK, UTIL.TCO, UTIL.TIME
@@ -81,25 +82,11 @@ class TMsender(GRND.NCTRS.TMsender, GRND.IF.TMmcsLink):
               recordFile.write("\ntmDu.earthReceptionTime = " + ertTimeStr)
               recordFile.write("\ntmDu.sequenceFlag = " + str(tmDu.sequenceFlag))
               recordFile.write("\ntmDu.qualityFlag = " + str(tmDu.qualityFlag))
-            recordFile.write(UTIL.DU.array2str(tmDu.getBufferHeader()))
+            UTIL.DU.writeHexDump(recordFile, tmDu.getBufferHeader())
             recordFile.write("\n" + GRND.IF.s_configuration.frameRecordFormat + " Frame Body:")
             if recordFormat == "NCTRS_ASCII_DETAILS":
-              recordFile.write("\ntmFrameDu.versionNumber = " + str(tmFrameDu.versionNumber))
-              recordFile.write("\ntmFrameDu.spacecraftId = " + str(tmFrameDu.spacecraftId))
-              recordFile.write("\ntmFrameDu.virtualChannelId = " + str(tmFrameDu.virtualChannelId))
-              recordFile.write("\ntmFrameDu.operationalControlField = " + str(tmFrameDu.operationalControlField))
-              recordFile.write("\ntmFrameDu.masterChannelFrameCount = " + str(tmFrameDu.masterChannelFrameCount))
-              recordFile.write("\ntmFrameDu.virtualChannelFCountLow = " + str(tmFrameDu.virtualChannelFCountLow))
-              recordFile.write("\ntmFrameDu.secondaryHeaderFlag = " + str(tmFrameDu.secondaryHeaderFlag))
-              recordFile.write("\ntmFrameDu.synchronisationFlag = " + str(tmFrameDu.synchronisationFlag))
-              recordFile.write("\ntmFrameDu.packetOrderFlag = " + str(tmFrameDu.packetOrderFlag))
-              recordFile.write("\ntmFrameDu.segmentLengthId = " + str(tmFrameDu.segmentLengthId))
-              recordFile.write("\ntmFrameDu.firstHeaderPointer = " + str(tmFrameDu.firstHeaderPointer))
-              if tmFrameDu.secondaryHeaderFlag:
-                recordFile.write("\ntmFrameDu.secondaryHeaderVersionNr = " + str(tmFrameDu.secondaryHeaderVersionNr))
-                recordFile.write("\ntmFrameDu.secondaryHeaderSize = " + str(tmFrameDu.secondaryHeaderSize))
-                recordFile.write("\ntmFrameDu.virtualChannelFCountHigh = " + str(tmFrameDu.virtualChannelFCountHigh))
-            recordFile.write(UTIL.DU.array2str(tmDu.getBufferBody()))
+              self.writeFrameDetails(recordFile, tmFrameDu)
+            UTIL.DU.writeHexDump(recordFile, tmDu.getBufferBody())
             recordFile.write("\n")
           recordFile.flush()
         elif recordFormat == "CRYOSAT" or \
@@ -129,25 +116,11 @@ class TMsender(GRND.NCTRS.TMsender, GRND.IF.TMmcsLink):
               recordFile.write("\ntmDu.downlinkTimeMicro = " + str(tmDu.downlinkTimeMicro))
               recordFile.write("\ntmDu.numberCorrSymbols = " + str(tmDu.numberCorrSymbols))
               recordFile.write("\ntmDu.rsErorFlag = " + str(tmDu.rsErorFlag))
-            recordFile.write(UTIL.DU.array2str(tmDu.getBufferHeader()))
+            UTIL.DU.writeHexDump(recordFile, tmDu.getBufferHeader())
             recordFile.write("\n" + GRND.IF.s_configuration.frameRecordFormat + " Frame Body:")
             if recordFormat == "CRYOSAT_ASCII_DETAILS":
-              recordFile.write("\ntmFrameDu.versionNumber = " + str(tmFrameDu.versionNumber))
-              recordFile.write("\ntmFrameDu.spacecraftId = " + str(tmFrameDu.spacecraftId))
-              recordFile.write("\ntmFrameDu.virtualChannelId = " + str(tmFrameDu.virtualChannelId))
-              recordFile.write("\ntmFrameDu.operationalControlField = " + str(tmFrameDu.operationalControlField))
-              recordFile.write("\ntmFrameDu.masterChannelFrameCount = " + str(tmFrameDu.masterChannelFrameCount))
-              recordFile.write("\ntmFrameDu.virtualChannelFCountLow = " + str(tmFrameDu.virtualChannelFCountLow))
-              recordFile.write("\ntmFrameDu.secondaryHeaderFlag = " + str(tmFrameDu.secondaryHeaderFlag))
-              recordFile.write("\ntmFrameDu.synchronisationFlag = " + str(tmFrameDu.synchronisationFlag))
-              recordFile.write("\ntmFrameDu.packetOrderFlag = " + str(tmFrameDu.packetOrderFlag))
-              recordFile.write("\ntmFrameDu.segmentLengthId = " + str(tmFrameDu.segmentLengthId))
-              recordFile.write("\ntmFrameDu.firstHeaderPointer = " + str(tmFrameDu.firstHeaderPointer))
-              if tmFrameDu.secondaryHeaderFlag:
-                recordFile.write("\ntmFrameDu.secondaryHeaderVersionNr = " + str(tmFrameDu.secondaryHeaderVersionNr))
-                recordFile.write("\ntmFrameDu.secondaryHeaderSize = " + str(tmFrameDu.secondaryHeaderSize))
-                recordFile.write("\ntmFrameDu.virtualChannelFCountHigh = " + str(tmFrameDu.virtualChannelFCountHigh))
-            recordFile.write(UTIL.DU.array2str(tmDu.getBufferBody()))
+              self.writeFrameDetails(recordFile, tmFrameDu)
+            UTIL.DU.writeHexDump(recordFile, tmDu.getBufferBody())
             recordFile.write("\n")
           recordFile.flush()
         else:
@@ -156,7 +129,31 @@ class TMsender(GRND.NCTRS.TMsender, GRND.IF.TMmcsLink):
         LOG_ERROR("cannot write to frame recording file", "GRND")
         LOG(str(ex), "GRND")
     if GRND.IF.s_configuration.nctrsTMconn:
-      self.sendFrame(tmFrameDu.getBufferString())
+      self.sendFrame(tmFrameDu.getMemoryView())
+  # ---------------------------------------------------------------------------
+  def writeFrameDetails(self, recordFile, tmFrameDu):
+    """writes the frame header fields of a TM frame or an AOS frame"""
+    recordFile.write("\ntmFrameDu.versionNumber = " + str(tmFrameDu.versionNumber))
+    recordFile.write("\ntmFrameDu.spacecraftId = " + str(tmFrameDu.spacecraftId))
+    recordFile.write("\ntmFrameDu.virtualChannelId = " + str(tmFrameDu.virtualChannelId))
+    if isinstance(tmFrameDu, CCSDS.FRAME.AOSframe):
+      recordFile.write("\ntmFrameDu.virtualChannelFrameCount = " + str(tmFrameDu.virtualChannelFrameCount))
+      recordFile.write("\ntmFrameDu.replayFlag = " + str(tmFrameDu.replayFlag))
+      recordFile.write("\ntmFrameDu.vcFrameCountUsageFlag = " + str(tmFrameDu.vcFrameCountUsageFlag))
+      recordFile.write("\ntmFrameDu.vcFrameCountCycle = " + str(tmFrameDu.vcFrameCountCycle))
+      return
+    recordFile.write("\ntmFrameDu.operationalControlField = " + str(tmFrameDu.operationalControlField))
+    recordFile.write("\ntmFrameDu.masterChannelFrameCount = " + str(tmFrameDu.masterChannelFrameCount))
+    recordFile.write("\ntmFrameDu.virtualChannelFCountLow = " + str(tmFrameDu.virtualChannelFCountLow))
+    recordFile.write("\ntmFrameDu.secondaryHeaderFlag = " + str(tmFrameDu.secondaryHeaderFlag))
+    recordFile.write("\ntmFrameDu.synchronisationFlag = " + str(tmFrameDu.synchronisationFlag))
+    recordFile.write("\ntmFrameDu.packetOrderFlag = " + str(tmFrameDu.packetOrderFlag))
+    recordFile.write("\ntmFrameDu.segmentLengthId = " + str(tmFrameDu.segmentLengthId))
+    recordFile.write("\ntmFrameDu.firstHeaderPointer = " + str(tmFrameDu.firstHeaderPointer))
+    if tmFrameDu.secondaryHeaderFlag:
+      recordFile.write("\ntmFrameDu.secondaryHeaderVersionNr = " + str(tmFrameDu.secondaryHeaderVersionNr))
+      recordFile.write("\ntmFrameDu.secondaryHeaderSize = " + str(tmFrameDu.secondaryHeaderSize))
+      recordFile.write("\ntmFrameDu.virtualChannelFCountHigh = " + str(tmFrameDu.virtualChannelFCountHigh))
   # ---------------------------------------------------------------------------
   def recordFrames(self, recordFileName):
     """
@@ -677,7 +677,7 @@ class TMpacketGenerator(object):
   def getIdlePacket(self, packetSize):
     """
     creates an idle packet for filling space in a parent container
-    (e.g. a CCSDS TM frame)
+    (e.g. a CCSDS TM frame), the packet is reused in the next call
     """
     pass
   # ---------------------------------------------------------------------------
@@ -18,7 +18,13 @@ import CCSDS.DU, CCSDS.PACKET, CCSDS.TIME
 import PUS.PACKET, PUS.SERVICES
 import SCOS.ENV
 import SPACE.IF
-import UTIL.SYS, UTIL.TCO, UTIL.TIME
+import UTIL.CRC, UTIL.SYS, UTIL.TCO, UTIL.TIME
+
+#############
+# constants #
+#############
+# segmentation flags and sequence counter in the packet header
+SEQUENCE_CONTROL_BYTE_POS = 2
 
 ###########
 # classes #
@@ -41,6 +47,8 @@ class TMpacketGeneratorImpl(SPACE.IF.TMpacketGenerator):
   def __init__(self):
     """default constructor"""
     self.packetCache = {}
+    # preformatted idle packets and their CRC patchers per packet size
+    self.idlePacketCache = {}
     self.sequenceCounters = {}
     self.packetDefaults = TMpacketDefaults()
     self.hasTmTT = (UTIL.SYS.s_configuration.TM_TT_TIME_BYTE_OFFSET > 0)
@@ -53,10 +61,21 @@ class TMpacketGeneratorImpl(SPACE.IF.TMpacketGenerator):
     """
     # the idle packet is a TM packet without a secondary header (CCSDS)
     # but with a CRC (if an application expects a CRC)
-    if packetSize < (CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE + CCSDS.DU.CRC_BYTE_SIZE):
-      raise Error("no sufficient space for idle packet")
+    # the idle packet is created once per packet size and reused,
+    # only the sequence counter and the CRC are patched
+    cacheEntry = self.idlePacketCache.get(packetSize)
+    if cacheEntry == None:
+      if packetSize < (CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE + CCSDS.DU.CRC_BYTE_SIZE):
+        raise Error("no sufficient space for idle packet")
+      idlePacket = self.getTMpacketHelper(packetSize,
+                                          self.packetDefaults.idlePacketAPID)
+      crcPatcher = UTIL.CRC.CRCpatcher(
+        idlePacket.getBufferSlice(0, packetSize - CCSDS.DU.CRC_BYTE_SIZE),
+        [SEQUENCE_CONTROL_BYTE_POS])
+      cacheEntry = (idlePacket, crcPatcher)
+      self.idlePacketCache[packetSize] = cacheEntry
+    idlePacket, crcPatcher = cacheEntry
     applicationProcessId = self.packetDefaults.idlePacketAPID
-    idlePacket = self.getTMpacketHelper(packetSize, applicationProcessId)
     # re-calculate the sequence counter (maintained per APID)
     if applicationProcessId in self.sequenceCounters:
       sequenceCounter = (self.sequenceCounters[applicationProcessId] + 1) % 16384
@@ -64,8 +83,12 @@ class TMpacketGeneratorImpl(SPACE.IF.TMpacketGenerator):
       sequenceCounter = 0
     idlePacket.sequenceControlCount = sequenceCounter
     self.sequenceCounters[applicationProcessId] = sequenceCounter
-    # re-calculate the CRC
-    idlePacket.setChecksum()
+    # patch the CRC, the data field of the idle packet is not read again
+    crc = crcPatcher.getCRC(
+      [idlePacket.getUnsigned(SEQUENCE_CONTROL_BYTE_POS, 2)])
+    idlePacket.setUnsigned(packetSize - CCSDS.DU.CRC_BYTE_SIZE,
+                           CCSDS.DU.CRC_BYTE_SIZE,
+                           crc)
     return idlePacket
   # ---------------------------------------------------------------------------
   def getTMpacket(self,
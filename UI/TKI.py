@@ -22,9 +22,9 @@
 #                window and for each view a separate notebook tab.            *
 #                Note: The usage of Tkk is completely encapsulated here.      *
 #******************************************************************************
-import Tkinter, tkFileDialog, tkMessageBox, tkSimpleDialog, os, sys
+import Tkinter, tkFileDialog, tkMessageBox, tkSimpleDialog, heapq, os, sys
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
-import UTIL.SYS, UTIL.TASK
+import UTIL.SYS, UTIL.TASK, UTIL.TIME
 try:
   import ttk
   GUITYPE = "ttk"
@@ -70,6 +70,11 @@ class GUItask(UTIL.TASK.Task):
   def __init__(self):
     """initialise attributes"""
     UTIL.TASK.Task.__init__(self, isParent=True, isProcessing=False)
+    # timers of the discrete event clock: heap of
+    # (expireTime, sequenceNumber, handler) in deadline order
+    self.discreteTimers = []
+    self.discreteTimerSequence = 0
+    self.discreteTimerPolling = False
   # ---------------------------------------------------------------------------
   def run(self):
     """processes the event loop, overloaded from UTIL.TASK.Task.run"""
@@ -104,7 +109,41 @@ class GUItask(UTIL.TASK.Task):
     register a time handler - only works on single threaded UNIX,
     overloaded from UTIL.TASK.Task.createTimeHandler
     """
-    s_gui.after(ms, handler)
+    clock = UTIL.TIME.s_clock
+    if isinstance(clock, UTIL.TIME.DiscreteEventClock):
+      # the Tkinter mainloop does not wait via the clock: the timers are
+      # queued in deadline order and executed by a single polling timer
+      expireTime = clock.getTime() + (ms / 1000.0)
+      heapq.heappush(self.discreteTimers,
+                     (expireTime, self.discreteTimerSequence, handler))
+      self.discreteTimerSequence += 1
+      self.armDiscreteTimers()
+      return
+    # the Tkinter timers run in wall clock time
+    realMs = int(clock.getRealTimeout(ms / 1000.0) * 1000)
+    s_gui.after(realMs, handler)
+  # ---------------------------------------------------------------------------
+  def armDiscreteTimers(self):
+    """
+    registers the polling of the discrete event timers, the GUI polling
+    delay avoids that Tkinter busy-loops on after(0)
+    """
+    if self.discreteTimerPolling or len(self.discreteTimers) == 0:
+      return
+    self.discreteTimerPolling = True
+    s_gui.after(int(UTIL.TASK.POLL_CYCLE * 1000), self.pollDiscreteTimers)
+  # ---------------------------------------------------------------------------
+  def pollDiscreteTimers(self):
+    """
+    advances the discrete event clock to the earliest timer and executes it
+    """
+    self.discreteTimerPolling = False
+    expireTime, sequenceNumber, handler = \
+      heapq.heappop(self.discreteTimers)
+    clock = UTIL.TIME.s_clock
+    clock.advance(expireTime - clock.getTime())
+    handler()
+    self.armDiscreteTimers()
 
 # =============================================================================
 class GUIview(Tkinter.Frame, AppGrid, UTIL.TASK.View):
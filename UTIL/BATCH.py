@@ -0,0 +1,193 @@
+#******************************************************************************
+# (C) 2017, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under the terms of the GNU Lesser General Public License as       *
+# published by the Free Software Foundation; either version 2.1 of the        *
+# License, or (at your option) any later version.                             *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser     *
+# General Public License for more details.                                    *
+#******************************************************************************
+# Utilities - Batch Processing of Data Units                                  *
+# Decodes the attributes of many equally structured data units at once.       *
+# The data units are rows of an N x dataUnitSize uint8 NumPy array, the       *
+# attributes are returned as NumPy column arrays (one value per data unit).   *
+# NumPy is only needed when the batch functionality is used.                  *
+#******************************************************************************
+try:
+  import numpy
+except ImportError:
+  numpy = None
+from UTIL.DU import BITS, BYTES, UNSIGNED, STRING, TIME
+
+#############
+# constants #
+#############
+# NumPy formats for byte aligned words, index = number of bytes
+WORD_FORMATS = [None, ">u1", ">u2", None, ">u4", None, None, None, ">u8"]
+
+###########
+# classes #
+###########
+# =============================================================================
+class BatchDecoder(object):
+  """decodes attribute map entries of many data units in one pass"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, attributeMap1, attributesSize1=0, attributeMap2=None):
+    """
+    derives a NumPy structured dtype and the bit field unpack rules
+    from the attribute maps, attributeMap2 starts after attributesSize1
+    """
+    checkNumpy()
+    # structured dtype fields: name -> (format, offset)
+    self.dtypeFields = {}
+    # unpack rules: attribute name -> (ruleType, dtypeFieldName, parameters)
+    self.rules = {}
+    self.headerSize = 0
+    if attributeMap1 != None:
+      for name, fieldSpec in attributeMap1.iteritems():
+        self.addField(name, fieldSpec, 0)
+    if attributeMap2 != None:
+      for name, fieldSpec in attributeMap2.iteritems():
+        # attributeMap1 has precedence
+        if name in self.rules:
+          continue
+        self.addField(name, fieldSpec, attributesSize1)
+    names = self.dtypeFields.keys()
+    names.sort()
+    self.dtype = numpy.dtype({
+      "names": names,
+      "formats": [self.dtypeFields[name][0] for name in names],
+      "offsets": [self.dtypeFields[name][1] for name in names],
+      "itemsize": self.headerSize})
+  # ---------------------------------------------------------------------------
+  def addDtypeField(self, bytePos, byteLength):
+    """adds a word or byte field to the dtype and returns its name"""
+    fieldName = "_%d_%d" % (bytePos, byteLength)
+    if fieldName not in self.dtypeFields:
+      wordFormat = None
+      if byteLength < len(WORD_FORMATS):
+        wordFormat = WORD_FORMATS[byteLength]
+      if wordFormat == None:
+        wordFormat = ("u1", byteLength)
+      self.dtypeFields[fieldName] = (wordFormat, bytePos)
+    self.headerSize = max(self.headerSize, bytePos + byteLength)
+    return fieldName
+  # ---------------------------------------------------------------------------
+  def addField(self, name, fieldSpec, byteOffset):
+    """derives the dtype field and the unpack rule of an attribute"""
+    fieldOffset, fieldLength, fieldType = fieldSpec
+    if fieldType == BITS:
+      bitPos = fieldOffset + (byteOffset << 3)
+      firstBytePos = bitPos >> 3
+      lastBitPos = bitPos + fieldLength - 1
+      byteLength = (lastBitPos >> 3) - firstBytePos + 1
+      shift = 7 - (lastBitPos & 7)
+      mask = (1 << fieldLength) - 1
+      fieldName = self.addDtypeField(firstBytePos, byteLength)
+      self.rules[name] = (BITS, fieldName, (shift, mask))
+      return
+    bytePos = fieldOffset + byteOffset
+    if fieldType == TIME:
+      # raw time fields, the time format defines the size
+      byteLength = self.getTimeByteSize(fieldLength)
+      fieldName = "_%d_%d_bytes" % (bytePos, byteLength)
+      self.dtypeFields[fieldName] = (("u1", byteLength), bytePos)
+      self.headerSize = max(self.headerSize, bytePos + byteLength)
+    elif fieldType == UNSIGNED:
+      fieldName = self.addDtypeField(bytePos, fieldLength)
+    else:
+      # BYTES and STRING are provided as N x fieldLength byte arrays
+      fieldName = "_%d_%d_bytes" % (bytePos, fieldLength)
+      self.dtypeFields[fieldName] = (("u1", fieldLength), bytePos)
+      self.headerSize = max(self.headerSize, bytePos + fieldLength)
+    self.rules[name] = (fieldType, fieldName, None)
+  # ---------------------------------------------------------------------------
+  def getTimeByteSize(self, timeFormat):
+    """returns the byte size of a time field"""
+    # must be implemented in derived class
+    raise AttributeError("time access not supported")
+  # ---------------------------------------------------------------------------
+  def getRecords(self, dataUnits, byteOffset=0):
+    """
+    returns the structured records of the data units,
+    byteOffset can be a number or an array with an offset per data unit
+    """
+    dataUnits = numpy.asarray(dataUnits, dtype=numpy.uint8)
+    if dataUnits.ndim != 2:
+      raise ValueError("dataUnits must be a N x dataUnitSize array")
+    nrDataUnits, dataUnitSize = dataUnits.shape
+    if numpy.isscalar(byteOffset):
+      if byteOffset + self.headerSize > dataUnitSize:
+        raise IndexError("byteOffset/headerSize out of data unit")
+      headers = dataUnits[:, byteOffset:byteOffset + self.headerSize]
+    else:
+      byteOffsets = numpy.asarray(byteOffset, dtype=numpy.intp)
+      if len(byteOffsets) != nrDataUnits:
+        raise ValueError("one byteOffset per data unit required")
+      if nrDataUnits > 0 and \
+         byteOffsets.max() + self.headerSize > dataUnitSize:
+        raise IndexError("byteOffset/headerSize out of data unit")
+      # gather the headers from the individual positions
+      columns = byteOffsets[:, None] + numpy.arange(self.headerSize)
+      rows = numpy.arange(nrDataUnits)[:, None]
+      headers = dataUnits[rows, columns]
+    headers = numpy.ascontiguousarray(headers)
+    return headers.view(self.dtype).reshape(nrDataUnits)
+  # ---------------------------------------------------------------------------
+  def decode(self, dataUnits, names=None, byteOffset=0):
+    """
+    decodes the attributes of the data units,
+    returns a dictionary with a column array per attribute name
+    """
+    records = self.getRecords(dataUnits, byteOffset)
+    if names == None:
+      names = self.rules.keys()
+    columns = {}
+    for name in names:
+      fieldType, fieldName, parameters = self.rules[name]
+      field = records[fieldName]
+      if fieldType == BITS:
+        shift, mask = parameters
+        if field.ndim == 2:
+          field = combineBytes(field)
+        columns[name] = (field >> shift) & mask
+      elif fieldType == UNSIGNED and field.ndim == 2:
+        columns[name] = combineBytes(field)
+      elif fieldType == STRING:
+        columns[name] = field.copy().view("S%d" % field.shape[1])[:, 0]
+      else:
+        # native byte order for numbers, copies for byte arrays
+        columns[name] = field.astype(field.dtype.newbyteorder("="))
+    return columns
+
+#############
+# functions #
+#############
+# -----------------------------------------------------------------------------
+def checkNumpy():
+  """raises an ImportError if NumPy is not available"""
+  if numpy == None:
+    raise ImportError("NumPy is required for batch processing")
+# -----------------------------------------------------------------------------
+def combineBytes(byteColumns):
+  """combines N x byteLength big-endian bytes to unsigned values"""
+  values = numpy.zeros(len(byteColumns), dtype=numpy.uint64)
+  eight = numpy.uint64(8)
+  for i in xrange(byteColumns.shape[1]):
+    values = (values << eight) | byteColumns[:, i]
+  return values
+# -----------------------------------------------------------------------------
+def createDataUnitArray(binaryString, dataUnitSize):
+  """
+  returns an N x dataUnitSize uint8 array from a binary string
+  (e.g. a recording of equally sized frames), no data are copied
+  """
+  checkNumpy()
+  dataUnits = numpy.frombuffer(binaryString, dtype=numpy.uint8)
+  if len(dataUnits) % dataUnitSize != 0:
+    raise ValueError("binaryString size is not a multiple of dataUnitSize")
+  return dataUnits.reshape(-1, dataUnitSize)
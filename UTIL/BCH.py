@@ -17,7 +17,11 @@
 # Bose-Chaudhuri-Hocquenghem (BCH) code.                                      *
 # The implementation of the BCH encoding is performed with a constant         *
 # galois field to ensure good performance.                                    *
+# encodeCodeBlock() processes the 7 netto bytes of a code block in one call,  *
+# encodeBatch() the code blocks of a NumPy array in one pass.                 *
+# correctCodeBlock() corrects single bit errors with a syndrome table.        *
 #******************************************************************************
+import UTIL.BATCH
 
 #############
 # constants #
@@ -51,6 +55,17 @@ CODE_BLOCK_SIZE = 8
 # 127 | 0x1C | 0x59 | 0x59 | ... | 0x45
 #
 s_shiftRegisterStateTransitions = []
+# the same table as 128 x 256 uint8 NumPy array, created on demand
+s_shiftRegisterStateArray = None
+# results of the code block correction
+CODE_BLOCK_OK = 0
+CODE_BLOCK_CORRECTED = 1
+CODE_BLOCK_UNCORRECTABLE = 2
+# syndrome table for the single bit error correction
+# the index [0]...[127] is the 7 bit syndrome (received XOR expected code),
+# the values are (bytePos, bitMask) of the erroneous bit in the code block
+# or None for syndromes that indicate more than one bit error
+s_syndromeTable = []
 
 #############
 # functions #
@@ -76,6 +91,25 @@ def generateShiftRegisterValues():
       transitionField.append(sreg)
     s_shiftRegisterStateTransitions.append(transitionField)
 # -----------------------------------------------------------------------------
+def generateSyndromeTable():
+  """generates the syndromes of all single bit errors in a code block"""
+  global s_syndromeTable
+  s_syndromeTable = [None] * 128
+  zeroBlock = [0] * (CODE_BLOCK_SIZE - 1)
+  zeroCode = encodeCodeBlock(zeroBlock)
+  # errors in the netto bytes
+  for bytePos in range(0, CODE_BLOCK_SIZE - 1):
+    for bit in range(0, 8):
+      bitMask = 0x80 >> bit
+      errorBlock = list(zeroBlock)
+      errorBlock[bytePos] = bitMask
+      syndrome = (encodeCodeBlock(errorBlock) ^ zeroCode) >> 1
+      s_syndromeTable[syndrome] = (bytePos, bitMask)
+  # errors in the 7 parity bits, the filler bit is ignored
+  for bit in range(0, 7):
+    bitMask = 0x80 >> bit
+    s_syndromeTable[bitMask >> 1] = (CODE_BLOCK_SIZE - 1, bitMask)
+# -----------------------------------------------------------------------------
 def encodeStart():
   """starts the BCH encoding with the initial shift register state"""
   return 0
@@ -90,9 +124,63 @@ def encodeStop(sreg):
   sreg ^= 0xFF           # invert the shift register state
   sreg <<= 1             # make it the 7 most sign. bits
   return (sreg & 0xFE)   # filter the 7 most sign bits
+# -----------------------------------------------------------------------------
+def encodeCodeBlock(byteArray, bytePos=0):
+  """
+  returns the BCH code of the 7 netto bytes at bytePos,
+  equivalent to encodeStart(), 7 x encodeStep() and encodeStop()
+  """
+  global s_shiftRegisterStateTransitions
+  transitions = s_shiftRegisterStateTransitions
+  sreg = transitions[0][byteArray[bytePos]]
+  sreg = transitions[sreg][byteArray[bytePos + 1]]
+  sreg = transitions[sreg][byteArray[bytePos + 2]]
+  sreg = transitions[sreg][byteArray[bytePos + 3]]
+  sreg = transitions[sreg][byteArray[bytePos + 4]]
+  sreg = transitions[sreg][byteArray[bytePos + 5]]
+  sreg = transitions[sreg][byteArray[bytePos + 6]]
+  return ((sreg ^ 0xFF) << 1) & 0xFE
+# -----------------------------------------------------------------------------
+def correctCodeBlock(byteArray, bytePos=0):
+  """
+  checks the code block (7 netto bytes + check byte) at bytePos and
+  corrects a single bit error in place, returns CODE_BLOCK_OK,
+  CODE_BLOCK_CORRECTED or CODE_BLOCK_UNCORRECTABLE
+  """
+  global s_syndromeTable
+  code = encodeCodeBlock(byteArray, bytePos)
+  syndrome = (code ^ byteArray[bytePos + CODE_BLOCK_SIZE - 1]) >> 1
+  if syndrome == 0:
+    return CODE_BLOCK_OK
+  errorPos = s_syndromeTable[syndrome]
+  if errorPos == None:
+    return CODE_BLOCK_UNCORRECTABLE
+  errorBytePos, bitMask = errorPos
+  byteArray[bytePos + errorBytePos] ^= bitMask
+  return CODE_BLOCK_CORRECTED
+# -----------------------------------------------------------------------------
+def encodeBatch(codeBlocks):
+  """
+  returns the BCH codes of a ... x 7 uint8 NumPy array of netto bytes,
+  the result has the shape of the array without the last dimension
+  """
+  global s_shiftRegisterStateArray
+  UTIL.BATCH.checkNumpy()
+  numpy = UTIL.BATCH.numpy
+  if s_shiftRegisterStateArray is None:
+    s_shiftRegisterStateArray = numpy.array(s_shiftRegisterStateTransitions,
+                                            dtype=numpy.uint8)
+  codeBlocks = numpy.asarray(codeBlocks, dtype=numpy.uint8)
+  if codeBlocks.shape[-1] != CODE_BLOCK_SIZE - 1:
+    raise ValueError("the last dimension must contain 7 netto bytes")
+  sreg = numpy.zeros(codeBlocks.shape[:-1], dtype=numpy.uint8)
+  for i in xrange(CODE_BLOCK_SIZE - 1):
+    sreg = s_shiftRegisterStateArray[sreg, codeBlocks[..., i]]
+  return ((sreg ^ 0xFF) << 1) & 0xFE
 
 ###########################
 # Initialisation sequence #
 ###########################
 # initialise the galois field
 generateShiftRegisterValues()
+generateSyndromeTable()
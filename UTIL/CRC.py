@@ -14,13 +14,192 @@
 # Utilities - CRC Checksum Calculation                                        *
 #                                                                             *
 # CCSDS packets and Transfer Frames may contain a trailing CRC checksum.      *
+# CRC-16 with generator polynom X^16 + X^12 + X^5 + X^0, preset 0xFFFF.       *
+# The bitwise reference implementation is calculateBitwise(), calculate()     *
+# uses the fastest available engine, all engines give identical results:     *
+# - binascii.crc_hqx (C implementation of the same CRC)                       *
+# - table driven with 256 entries (calculateTable)                            *
+# - slicing-by-8 with 8 x 256 entries (calculateSlicing8)                     *
+# update() supports the incremental calculation, e.g. during the assembly of  *
+# a frame: update(update(CRC_PRESET, part1), part2) == calculate(part1+part2) *
+# calculateBatch() and checkBatch() process N x L uint8 NumPy arrays of equal *
+# sized data units column-wise with NumPy lookup tables.                      *
+# CRCpatcher recalculates the CRC of constant data with changing 16 bit words *
+# (e.g. sequence counters) via lookup tables without a pass over the data,    *
+# this uses the linearity of the CRC: crc(a ^ b) = crc(a) ^ crc0(b).          *
 #******************************************************************************
+import array, binascii
+import UTIL.BATCH
+
+#############
+# constants #
+#############
+CRC_PRESET = 0xFFFF
+CRC_POLYNOM = 0x1021
+# types that binascii.crc_hqx accepts without conversion
+BUFFER_TYPES = (str, bytearray, type(array.array("B")), buffer, memoryview)
+# engines for calculate() and update()
+BACKEND_BINASCII = "binascii"
+BACKEND_SLICING8 = "slicing8"
+# check data for the engine selection
+CRC_CHECK_DATA = array.array("B", "123456789")
+
+###########
+# classes #
+###########
+# =============================================================================
+class CRCengine(object):
+  """incremental CRC calculation, e.g. while a frame is assembled"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    """initialise the shift register with the preset"""
+    self.state = CRC_PRESET
+  # ---------------------------------------------------------------------------
+  def reset(self):
+    """restarts the calculation"""
+    self.state = CRC_PRESET
+  # ---------------------------------------------------------------------------
+  def update(self, byteArray):
+    """adds the bytes to the CRC calculation"""
+    self.state = update(self.state, byteArray)
+  # ---------------------------------------------------------------------------
+  def getCRC(self):
+    """returns the CRC of all bytes since the last reset"""
+    return self.state
+
+# =============================================================================
+class CRCpatcher(object):
+  """CRC of constant data with variable 16 bit words"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, byteArray, wordPositions):
+    """
+    calculates the CRC of byteArray and the lookup tables for changes
+    of the big-endian words at wordPositions
+    """
+    self.crc = calculate(byteArray)
+    self.words = []
+    self.tables = []
+    for wordPos in wordPositions:
+      wordBytes = bytearray(byteArray[wordPos:wordPos + 2])
+      self.words.append((wordBytes[0] << 8) | wordBytes[1])
+      # contribution of each bit of the word without preset: the CRC
+      # register is shifted through the bytes that follow the word
+      trailingZeros = "\0" * (len(byteArray) - wordPos - 2)
+      bitCRCs = [update(0, chr(bit >> 8) + chr(bit & 0xFF) + trailingZeros)
+                 for bit in [1 << i for i in xrange(16)]]
+      self.tables.append((createPatchTable(bitCRCs[8:]),
+                          createPatchTable(bitCRCs[:8])))
+  # ---------------------------------------------------------------------------
+  def getCRC(self, words):
+    """returns the CRC of the data with words at wordPositions"""
+    crc = self.crc
+    for i, word in enumerate(words):
+      change = word ^ self.words[i]
+      highTable, lowTable = self.tables[i]
+      crc ^= highTable[change >> 8] ^ lowTable[change & 0xFF]
+    return crc
 
 #############
 # functions #
 #############
+def createPatchTable(bitCRCs):
+  """combines the CRC contributions of 8 bits to a table for all bytes"""
+  table = [0] * 256
+  for byte in xrange(1, 256):
+    lowestBit = byte & -byte
+    table[byte] = table[byte ^ lowestBit] ^ bitCRCs[lowestBit.bit_length() - 1]
+  return table
+# -----------------------------------------------------------------------------
+def createTables():
+  """creates the 256 entry table and the slicing-by-8 tables"""
+  table = []
+  for byte in xrange(256):
+    shiftReg = byte << 8
+    for bitNo in xrange(8):
+      if shiftReg & 0x8000:
+        shiftReg = ((shiftReg << 1) ^ CRC_POLYNOM) & 0xFFFF
+      else:
+        shiftReg = (shiftReg << 1) & 0xFFFF
+    table.append(shiftReg)
+  # slicingTables[k][byte]: CRC of byte followed by k zero bytes
+  slicingTables = [table]
+  for k in xrange(1, 8):
+    previousTable = slicingTables[k - 1]
+    slicingTables.append([((crc << 8) & 0xFFFF) ^ table[crc >> 8]
+                          for crc in previousTable])
+  return table, slicingTables
+
+CRC_TABLE, CRC_SLICING_TABLES = createTables()
+# the slicing tables as 8 x 256 uint16 NumPy array, created on demand
+s_slicingTablesArray = None
+
+# -----------------------------------------------------------------------------
 def calculate(byteArray):
   """calculates the CRC from the byte array"""
+  return update(CRC_PRESET, byteArray)
+# -----------------------------------------------------------------------------
+def update(state, byteArray):
+  """
+  continues the CRC calculation of state with the byte array,
+  returns the new state, which is the CRC of all bytes so far
+  """
+  if CRC_BACKEND == BACKEND_BINASCII:
+    return updateBinascii(state, byteArray)
+  return updateSlicing8(state, byteArray)
+# -----------------------------------------------------------------------------
+def updateBinascii(state, byteArray):
+  """continues the CRC calculation with binascii.crc_hqx"""
+  if type(byteArray) not in BUFFER_TYPES:
+    byteArray = bytearray(byteArray)
+  return binascii.crc_hqx(byteArray, state)
+# -----------------------------------------------------------------------------
+def updateTable(state, byteArray):
+  """continues the CRC calculation with the 256 entry table"""
+  if type(byteArray) != bytearray:
+    byteArray = bytearray(byteArray)
+  table = CRC_TABLE
+  for byte in byteArray:
+    state = ((state << 8) & 0xFFFF) ^ table[(state >> 8) ^ byte]
+  return state
+# -----------------------------------------------------------------------------
+def updateSlicing8(state, byteArray):
+  """continues the CRC calculation with the slicing-by-8 tables"""
+  if type(byteArray) != bytearray:
+    byteArray = bytearray(byteArray)
+  t0, t1, t2, t3, t4, t5, t6, t7 = CRC_SLICING_TABLES
+  arraySize = len(byteArray)
+  blockEnd = arraySize & ~7
+  i = 0
+  while i < blockEnd:
+    # the shift register affects the first 2 bytes of the block
+    state = t7[byteArray[i] ^ (state >> 8)] ^ \
+            t6[byteArray[i + 1] ^ (state & 0xFF)] ^ \
+            t5[byteArray[i + 2]] ^ \
+            t4[byteArray[i + 3]] ^ \
+            t3[byteArray[i + 4]] ^ \
+            t2[byteArray[i + 5]] ^ \
+            t1[byteArray[i + 6]] ^ \
+            t0[byteArray[i + 7]]
+    i += 8
+  while i < arraySize:
+    state = ((state << 8) & 0xFFFF) ^ t0[(state >> 8) ^ byteArray[i]]
+    i += 1
+  return state
+# -----------------------------------------------------------------------------
+def calculateTable(byteArray):
+  """calculates the CRC with the 256 entry table"""
+  return updateTable(CRC_PRESET, byteArray)
+# -----------------------------------------------------------------------------
+def calculateSlicing8(byteArray):
+  """calculates the CRC with the slicing-by-8 tables"""
+  return updateSlicing8(CRC_PRESET, byteArray)
+# -----------------------------------------------------------------------------
+def calculateBinascii(byteArray):
+  """calculates the CRC with binascii.crc_hqx"""
+  return updateBinascii(CRC_PRESET, byteArray)
+# -----------------------------------------------------------------------------
+def calculateBitwise(byteArray):
+  """calculates the CRC from the byte array (bitwise reference)"""
   # 32 bit shift register for CRC generation
   # D0  - D15  :CRC shift register
   # D16        : MSB after shift
@@ -57,3 +236,58 @@ def calculate(byteArray):
       bitNo -= 1
     i += 1
   return (shiftReg & 0x0000FFFF)
+
+# -----------------------------------------------------------------------------
+def calculateBatch(dataUnits):
+  """
+  calculates the CRCs of the rows of an N x L uint8 NumPy array,
+  returns a uint16 array with N CRCs
+  """
+  global s_slicingTablesArray
+  UTIL.BATCH.checkNumpy()
+  numpy = UTIL.BATCH.numpy
+  if s_slicingTablesArray is None:
+    s_slicingTablesArray = numpy.array(CRC_SLICING_TABLES, dtype=numpy.uint16)
+  dataUnits = numpy.asarray(dataUnits, dtype=numpy.uint8)
+  if dataUnits.ndim != 2:
+    raise ValueError("dataUnits must be a N x L array")
+  tables = s_slicingTablesArray
+  t0 = tables[0]
+  nrDataUnits, dataUnitSize = dataUnits.shape
+  state = numpy.empty(nrDataUnits, dtype=numpy.uint16)
+  state.fill(CRC_PRESET)
+  blockEnd = dataUnitSize & ~7
+  j = 0
+  while j < blockEnd:
+    # slicing-by-8: the shift register affects the first 2 bytes of the block
+    newState = tables[7][dataUnits[:, j] ^ (state >> 8)]
+    newState ^= tables[6][dataUnits[:, j + 1] ^ (state & 0xFF)]
+    for k in xrange(2, 8):
+      newState ^= tables[7 - k][dataUnits[:, j + k]]
+    state = newState
+    j += 8
+  while j < dataUnitSize:
+    state = (state << 8) ^ t0[(state >> 8) ^ dataUnits[:, j]]
+    j += 1
+  return state
+# -----------------------------------------------------------------------------
+def checkBatch(dataUnits):
+  """
+  checks the trailing CRCs of the rows of an N x L uint8 NumPy array,
+  returns a boolean array with N validity flags
+  """
+  UTIL.BATCH.checkNumpy()
+  numpy = UTIL.BATCH.numpy
+  dataUnits = numpy.asarray(dataUnits, dtype=numpy.uint8)
+  if dataUnits.ndim != 2 or dataUnits.shape[1] < 2:
+    raise ValueError("dataUnits must be a N x L array with L >= 2")
+  crcs = calculateBatch(dataUnits[:, :-2])
+  expectedCrcs = (dataUnits[:, -2].astype(numpy.uint16) << 8) | \
+                 dataUnits[:, -1]
+  return crcs == expectedCrcs
+# -----------------------------------------------------------------------------
+# engine selection: binascii.crc_hqx is used if it matches the reference
+if calculateBinascii(CRC_CHECK_DATA) == calculateBitwise(CRC_CHECK_DATA):
+  CRC_BACKEND = BACKEND_BINASCII
+else:
+  CRC_BACKEND = BACKEND_SLICING8
@@ -15,8 +15,11 @@
 # The data representation in the binary buffer is network byte order / big-   *
 # endian (highest buffer index = lowest significant byte). This allows direct *
 # sending of the buffer over the network.                                     * 
+# The buffer is either an array.array("B") or a bytearray. Data units with a  *
+# bytearray buffer can be views on a part of another data unit's buffer and   *
+# provide memoryviews for zero-copy sending/writing of the buffer.            *
 #******************************************************************************
-import array
+import array, binascii, struct
 
 #############
 # constants #
@@ -39,25 +42,97 @@ BIT_FILTER = [
   [None, None, None, None, None, None, 0xFD, 0xFC],
   [None, None, None, None, None, None, None, 0xFE]]
 ARRAY_TYPE = type(array.array("B"))
+BYTEARRAY_TYPE = bytearray
+# big-endian struct formats for compiled field accessors,
+# index = number of bytes that are covered by the field
+FIELD_STRUCTS = [None,
+                 struct.Struct(">B"),
+                 struct.Struct(">H"),
+                 None,
+                 struct.Struct(">L"),
+                 None,
+                 None,
+                 None,
+                 struct.Struct(">Q")]
+# struct format characters for the chunks of a field plan segment
+CHUNK_FORMATS = [(8, "Q"), (4, "L"), (2, "H"), (1, "B")]
+INTEGER_TYPES = (int, long)
+# tables for the hex dump: hex representation of a byte, row offsets
+# and the translation of non printable characters to "."
+HEX_DUMP_BYTES = ["%02X " % byte for byte in xrange(256)]
+HEX_DUMP_OFFSETS = ["\n%04X " % (row << 4) for row in xrange(4096)]
+HEX_DUMP_PRINTABLE = "".join([(32 <= byte < 127) and chr(byte) or "."
+                              for byte in xrange(256)])
+
+####################
+# global variables #
+####################
+# field plans: (id(attributeMap1), attributesSize1, id(attributeMap2)) -> plan
+s_fieldPlans = {}
 
 ###########
 # classes #
 ###########
+# =============================================================================
+class BufferView(object):
+  """part of a bytearray buffer, a data unit created from it shares the data"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, buffer, bufferOffset=0, byteLength=None):
+    """initialise the view on buffer[bufferOffset:bufferOffset+byteLength]"""
+    if type(buffer) != BYTEARRAY_TYPE:
+      raise TypeError("buffer view requires a bytearray")
+    if byteLength == None:
+      byteLength = len(buffer) - bufferOffset
+    if bufferOffset < 0 or byteLength < 0 or \
+       bufferOffset + byteLength > len(buffer):
+      raise IndexError("bufferOffset/byteLength out of buffer")
+    self.buffer = buffer
+    self.bufferOffset = bufferOffset
+    self.byteLength = byteLength
+
 # =============================================================================
 class BinaryUnit(object):
   """immutable binary data unit"""
+  # the bookkeeping attributes are stored in slots, derived classes shall
+  # define __slots__ = () to avoid a per-instance __dict__ pointer, in any
+  # case a __dict__ is only allocated when other attributes are set
+  __slots__ = ("buffer",
+               "bufferOffset",
+               "bufferCapacity",
+               "usedBufferSize",
+               "attributesSize1",
+               "attributeMap1",
+               "attributeMap2")
   # ---------------------------------------------------------------------------
   def __init__(self, binaryString=None, attributesSize1=0, attributeMap1=None, attributesSize2=0, attributeMap2=None):
-    """initialise the date structure with binaryString and attribute maps"""
+    """
+    initialise the date structure with binaryString and attribute maps,
+    an array.array("B") or a bytearray is used as buffer without copying,
+    a BufferView creates a data unit that is a view on another buffer
+    """
     emptyData = (binaryString == None)
     if emptyData:
       binaryString = "\0" * (attributesSize1 + attributesSize2)
     # special notation  to allow oberloading of __getattr__ and __setattr__
-    if type(binaryString) == ARRAY_TYPE:
+    bufferOffset = 0
+    bufferCapacity = None
+    binaryStringType = type(binaryString)
+    if binaryStringType == ARRAY_TYPE or binaryStringType == BYTEARRAY_TYPE:
       object.__setattr__(self, "buffer", binaryString)
+      usedBufferSize = len(binaryString)
+    elif binaryStringType == BufferView:
+      object.__setattr__(self, "buffer", binaryString.buffer)
+      bufferOffset = binaryString.bufferOffset
+      bufferCapacity = binaryString.byteLength
+      usedBufferSize = bufferCapacity
     else:
-      object.__setattr__(self, "buffer", array.array("B", binaryString))
-    object.__setattr__(self, "usedBufferSize", len(self.buffer))
+      object.__setattr__(self, "buffer", binary2array(binaryString))
+      usedBufferSize = len(self.buffer)
+    # bufferOffset: start of the data unit in the buffer
+    # bufferCapacity: size limit of a data unit view, None otherwise
+    object.__setattr__(self, "bufferOffset", bufferOffset)
+    object.__setattr__(self, "bufferCapacity", bufferCapacity)
+    object.__setattr__(self, "usedBufferSize", usedBufferSize)
     object.__setattr__(self, "attributesSize1", attributesSize1)
     object.__setattr__(self, "attributeMap1", attributeMap1)
     object.__setattr__(self, "attributeMap2", attributeMap2)
@@ -70,7 +145,7 @@ class BinaryUnit(object):
   # ---------------------------------------------------------------------------
   def getBufferString(self):
     """returns the used elements of the buffer as binary string"""
-    return self.buffer[0:self.usedBufferSize].tostring()
+    return self.getBufferSlice(0, self.usedBufferSize)
   # ---------------------------------------------------------------------------
   def getBufferHeader(self):
     """returns the header part of the buffer as binary string"""
@@ -80,7 +155,7 @@ class BinaryUnit(object):
     if self.attributesSize1 > self.usedBufferSize:
       # error
       return ""
-    return self.buffer[0:self.attributesSize1].tostring()
+    return self.getBufferSlice(0, self.attributesSize1)
   # ---------------------------------------------------------------------------
   def getBufferBody(self):
     """returns the body part of the buffer as binary string"""
@@ -90,7 +165,54 @@ class BinaryUnit(object):
     if self.attributesSize1 > self.usedBufferSize:
       # error
       return ""
-    return self.buffer[self.attributesSize1:self.usedBufferSize].tostring()
+    return self.getBufferSlice(self.attributesSize1, self.usedBufferSize)
+  # ---------------------------------------------------------------------------
+  def getBufferSlice(self, startPos, endPos):
+    """returns buffer elements (relative to the data unit) as binary string"""
+    startPos += self.bufferOffset
+    endPos += self.bufferOffset
+    if type(self.buffer) == ARRAY_TYPE:
+      return self.buffer[startPos:endPos].tostring()
+    return memoryview(self.buffer)[startPos:endPos].tobytes()
+  # ---------------------------------------------------------------------------
+  def useByteArray(self):
+    """
+    switches to a bytearray buffer (one copy of the data),
+    the buffer is no longer shared with other array.array users
+    """
+    if type(self.buffer) == BYTEARRAY_TYPE:
+      return
+    object.__setattr__(self, "buffer", bytearray(self.buffer))
+  # ---------------------------------------------------------------------------
+  def getMemoryView(self, bytePos=0, byteLength=None):
+    """
+    returns a memoryview on the used buffer elements without copying,
+    e.g. for socket.send or file.write, array.array buffers do not support
+    memoryviews and provide a read-only buffer object instead
+    """
+    if byteLength == None:
+      byteLength = self.usedBufferSize - bytePos
+    if bytePos < 0 or byteLength < 0 or \
+       bytePos + byteLength > self.usedBufferSize:
+      raise IndexError("bytePos/byteLength out of buffer")
+    startPos = self.bufferOffset + bytePos
+    if type(self.buffer) == ARRAY_TYPE:
+      return buffer(self.buffer, startPos, byteLength)
+    return memoryview(self.buffer)[startPos:startPos + byteLength]
+  # ---------------------------------------------------------------------------
+  def getBufferView(self, bytePos=0, byteLength=None):
+    """
+    returns a BufferView on the used buffer elements, a data unit that is
+    created from it (e.g. a packet in a frame) shares the buffer,
+    switches to a bytearray buffer
+    """
+    if byteLength == None:
+      byteLength = self.usedBufferSize - bytePos
+    if bytePos < 0 or byteLength < 0 or \
+       bytePos + byteLength > self.usedBufferSize:
+      raise IndexError("bytePos/byteLength out of buffer")
+    self.useByteArray()
+    return BufferView(self.buffer, self.bufferOffset + bytePos, byteLength)
   # ---------------------------------------------------------------------------
   def __lt__(self, other):
     """compares if self < other"""
@@ -130,7 +252,10 @@ class BinaryUnit(object):
   # ---------------------------------------------------------------------------
   def __str__(self):
     """returns a read-able representation"""
-    retStr = array2str(self.buffer, self.usedBufferSize)
+    if self.bufferOffset == 0 and type(self.buffer) == ARRAY_TYPE:
+      retStr = array2str(self.buffer, self.usedBufferSize)
+    else:
+      retStr = array2str(self.getBytes(0, self.usedBufferSize))
     if self.attributeMap1 != None:
       for name, fieldSpec in self.attributeMap1.iteritems():
         retStr += "\n" + name + " = "
@@ -172,23 +297,41 @@ class BinaryUnit(object):
   # ---------------------------------------------------------------------------
   def setLen(self, byteSize):
     """change the size of the field"""
+    if self.bufferCapacity != None:
+      # data unit view: the shared buffer cannot be resized
+      if byteSize > self.bufferCapacity:
+        raise IndexError("byteSize exceeds the capacity of the view")
+      object.__setattr__(self, "usedBufferSize", byteSize)
+      return
     bufferSize = len(self.buffer)
     if byteSize > bufferSize:
       # buffer must be enlarged
       enlargeSize = byteSize - bufferSize
-      self.buffer.extend(array.array("B", "\0" * enlargeSize))
+      if type(self.buffer) == ARRAY_TYPE:
+        self.buffer.extend(array.array("B", "\0" * enlargeSize))
+      else:
+        self.buffer.extend("\0" * enlargeSize)
     object.__setattr__(self, "usedBufferSize", byteSize)
   # ---------------------------------------------------------------------------
   def append(self, binaryString, attributeMap2=None):
     """appends a binary string to the field"""
-    if self.usedBufferSize > len(self.buffer):
-      # unused data must be removed
-      object.__setattr__(self, "buffer", self.buffer[:self.usedBufferSize])
-    if type(binaryString) == ARRAY_TYPE:
-      self.buffer.extend(binaryString)
+    if self.bufferCapacity != None:
+      # data unit view: copy into the shared buffer
+      bytePos = self.usedBufferSize
+      byteLength = len(binaryString)
+      self.setLen(bytePos + byteLength)
+      startPos = self.bufferOffset + bytePos
+      self.buffer[startPos:startPos + byteLength] = binaryString
     else:
-      self.buffer.extend(array.array("B", binaryString))
-    object.__setattr__(self, "usedBufferSize", len(self.buffer))
+      if self.usedBufferSize > len(self.buffer):
+        # unused data must be removed
+        object.__setattr__(self, "buffer", self.buffer[:self.usedBufferSize])
+      if type(self.buffer) == BYTEARRAY_TYPE or \
+         type(binaryString) == ARRAY_TYPE:
+        self.buffer.extend(binaryString)
+      else:
+        self.buffer.extend(binary2array(binaryString))
+      object.__setattr__(self, "usedBufferSize", len(self.buffer))
     if attributeMap2 != None:
       object.__setattr__(self, "attributeMap2", attributeMap2)
   # ---------------------------------------------------------------------------
@@ -206,8 +349,11 @@ class BinaryUnit(object):
     lastBytePos = lastBitPos >> 3
     if lastBytePos >= self.usedBufferSize:
       raise IndexError("bitPos/bitLength out of buffer")
+    # data unit views start at bufferOffset
+    bufferOffset = self.bufferOffset
+    lastBytePos += bufferOffset
     # accumulate the number starting with the first byte
-    bytePos = bitPos >> 3
+    bytePos = (bitPos >> 3) + bufferOffset
     byte = self.buffer[bytePos]
     # first byte: filter the highest bits that do not belong to the value
     firstBitInBytePos = bitPos & 7
@@ -245,8 +391,11 @@ class BinaryUnit(object):
     lastBytePos = lastBitPos >> 3
     if lastBytePos >= self.usedBufferSize:
       raise IndexError("bitPos/bitLength out of buffer")
+    # data unit views start at bufferOffset
+    bufferOffset = self.bufferOffset
+    lastBytePos += bufferOffset
     # set zero-bits in the buffer where the value aligns
-    firstBytePos = bitPos >> 3
+    firstBytePos = (bitPos >> 3) + bufferOffset
     firstBitInBytePos = bitPos & 7
     lastBitInBytePos = lastBitPos & 7
     if firstBytePos == lastBytePos:
@@ -278,12 +427,30 @@ class BinaryUnit(object):
       raise IndexError("invalid byteLength")
     if bytePos + byteLength > self.usedBufferSize:
       raise IndexError("bytePos/byteLength out of buffer")
+    bytePos += self.bufferOffset
     return self.buffer[bytePos:bytePos+byteLength]
   # ---------------------------------------------------------------------------
   def setBytes(self, bytePos, byteLength, byteArray):
     """set bytes"""
-    if type(byteArray) != ARRAY_TYPE:
-      byteArray = array.array("B", byteArray)
+    byteArray = self.checkBytes(bytePos, byteLength, byteArray)
+    bytePos += self.bufferOffset
+    if len(byteArray) == byteLength:
+      # copy with a single slice assignment
+      self.buffer[bytePos:bytePos + byteLength] = byteArray
+      return
+    i = 0
+    while i < byteLength:
+      self.buffer[bytePos + i] = byteArray[i]
+      i += 1
+  # ---------------------------------------------------------------------------
+  def checkBytes(self, bytePos, byteLength, byteArray):
+    """consistency checks for setBytes, returns the converted byteArray"""
+    if type(self.buffer) == BYTEARRAY_TYPE:
+      # bytearray buffers accept all binary strings via slice assignment
+      if type(byteArray) == list:
+        byteArray = bytearray(byteArray)
+    elif type(byteArray) != ARRAY_TYPE:
+      byteArray = binary2array(byteArray)
     # consistency checks
     if bytePos < 0:
       raise IndexError("invalid bytePos")
@@ -293,10 +460,7 @@ class BinaryUnit(object):
       raise ValueError("byteArraySize out of range")
     if bytePos + byteLength > self.usedBufferSize:
       raise IndexError("bytePos/byteLength out of buffer")
-    i = 0
-    while i < byteLength:
-      self.buffer[bytePos + i] = byteArray[i]
-      i += 1
+    return byteArray
   # ---------------------------------------------------------------------------
   def getUnsigned(self, bytePos, byteLength):
     """extracts a numerical unsigned value byte aligned"""
@@ -308,6 +472,9 @@ class BinaryUnit(object):
     lastBytePos = bytePos + byteLength - 1
     if lastBytePos >= self.usedBufferSize:
       raise IndexError("bytePos/byteLength out of buffer")
+    # data unit views start at bufferOffset
+    bytePos += self.bufferOffset
+    lastBytePos += self.bufferOffset
     # accumulate the number starting with the first byte
     value = 0
     while bytePos <= lastBytePos:
@@ -331,7 +498,7 @@ class BinaryUnit(object):
       raise IndexError("bytePos/byteLength out of buffer")
     # decompose the value and add it to the buffer
     # starting at bytePos, which is at the last byte
-    firstBytePos = bytePos
+    firstBytePos = bytePos + self.bufferOffset
     bytePos = firstBytePos + byteLength - 1
     while bytePos >= firstBytePos:
       byte = value & 0xFF
@@ -341,7 +508,10 @@ class BinaryUnit(object):
   # ---------------------------------------------------------------------------
   def getString(self, bytePos, byteLength):
     """extracts a string"""
-    return self.getBytes(bytePos, byteLength).tostring()
+    byteArray = self.getBytes(bytePos, byteLength)
+    if type(byteArray) == ARRAY_TYPE:
+      return byteArray.tostring()
+    return str(byteArray)
   # ---------------------------------------------------------------------------
   def setString(self, bytePos, byteLength, byteArray):
     """set a string"""
@@ -357,6 +527,35 @@ class BinaryUnit(object):
     # must be implemented in derived class
     raise AttributeError("time access not supported")
   # ---------------------------------------------------------------------------
+  def checkTime(self, bytePos, timeFormat, value):
+    """consistency checks for setTime"""
+    # must be implemented in derived class
+    raise AttributeError("time access not supported")
+  # ---------------------------------------------------------------------------
+  def getFieldPlan(self):
+    """returns the merged field plan for the attribute maps"""
+    return getFieldPlan(self.attributeMap1,
+                        self.attributesSize1,
+                        self.attributeMap2)
+  # ---------------------------------------------------------------------------
+  def getFields(self, names=None):
+    """
+    reads the attributes in names (default: all attributes) in one pass,
+    returns a dictionary name -> value
+    """
+    return self.getFieldPlan().getFields(self, names)
+  # ---------------------------------------------------------------------------
+  def setFields(self, fieldValues):
+    """
+    writes the attributes of the fieldValues dictionary in one pass,
+    all values are validated before the buffer is modified
+    """
+    self.getFieldPlan().setFields(self, fieldValues)
+  # ---------------------------------------------------------------------------
+  def decode(self):
+    """returns all attributes as dictionary name -> value"""
+    return self.getFieldPlan().getFields(self)
+  # ---------------------------------------------------------------------------
   def __getattr__(self, name):
     """read access to the data unit attributes"""
     # try first access to fields from attribute map 1
@@ -443,54 +642,538 @@ class BinaryUnit(object):
     # attribute not in first and second attribute map
     raise AttributeError("attribute not found")
 
+# =============================================================================
+class FieldPlan(object):
+  """
+  merged read/write plan for the attribute maps of a data unit:
+  BITS and UNSIGNED attributes with adjacent or overlapping bytes are
+  grouped to segments, a segment is read and written with one struct call
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self, attributeMap1, attributesSize1=0, attributeMap2=None):
+    """derives the segments from the attribute maps"""
+    self.attributeMap1 = attributeMap1
+    self.attributesSize1 = attributesSize1
+    self.attributeMap2 = attributeMap2
+    # all attribute names, attributeMap1 has precedence
+    self.names = []
+    # integer attributes: name -> (bytePos, endPos, shift, maxValue)
+    intFields = {}
+    # BYTES, STRING and TIME attributes: name -> (bytePos, length, type)
+    self.genericFields = {}
+    # BITS attributes do not accept negative values
+    self.bitsNames = set()
+    for attributeMap, byteOffset in [(attributeMap1, 0),
+                                     (attributeMap2, attributesSize1)]:
+      if attributeMap == None:
+        continue
+      for name, fieldSpec in attributeMap.iteritems():
+        if name in self.names:
+          continue
+        self.names.append(name)
+        fieldOffset, fieldLength, fieldType = fieldSpec
+        if fieldType == BITS:
+          bitPos = fieldOffset + (byteOffset << 3)
+          endBitPos = bitPos + fieldLength
+          intFields[name] = (bitPos >> 3,
+                             (endBitPos + 7) >> 3,
+                             (8 - (endBitPos & 7)) & 7,
+                             (1 << fieldLength) - 1)
+          self.bitsNames.add(name)
+        elif fieldType == UNSIGNED:
+          bytePos = fieldOffset + byteOffset
+          intFields[name] = (bytePos,
+                             bytePos + fieldLength,
+                             0,
+                             (1 << (fieldLength << 3)) - 1)
+        else:
+          self.genericFields[name] = \
+            (fieldOffset + byteOffset, fieldLength, fieldType)
+    # merge the byte ranges to segments
+    ranges = [(field[0], field[1]) for field in intFields.itervalues()]
+    ranges.sort()
+    segmentRanges = []
+    for bytePos, endPos in ranges:
+      if len(segmentRanges) > 0 and bytePos <= segmentRanges[-1][1]:
+        lastBytePos, lastEndPos = segmentRanges[-1]
+        segmentRanges[-1] = (lastBytePos, max(lastEndPos, endPos))
+      else:
+        segmentRanges.append((bytePos, endPos))
+    # segments: (bytePos, endPos, segmentStruct, chunkBitSizes)
+    self.segments = []
+    for bytePos, endPos in segmentRanges:
+      byteLength = endPos - bytePos
+      structFormat = ">"
+      chunkBitSizes = []
+      for chunkSize, chunkFormat in CHUNK_FORMATS:
+        while byteLength >= chunkSize:
+          structFormat += chunkFormat
+          chunkBitSizes.append(chunkSize << 3)
+          byteLength -= chunkSize
+      self.segments.append((bytePos,
+                            endPos,
+                            struct.Struct(structFormat),
+                            chunkBitSizes))
+    # integer attributes: name -> (segmentIndex, shift, maxValue, fieldMask)
+    self.intFields = {}
+    # end positions of the integer attributes: name -> endPos
+    self.intFieldEnds = {}
+    for name, field in intFields.iteritems():
+      bytePos, endPos, shift, maxValue = field
+      self.intFieldEnds[name] = endPos
+      for segmentIndex, segment in enumerate(self.segments):
+        if segment[0] <= bytePos and endPos <= segment[1]:
+          shift += (segment[1] - endPos) << 3
+          self.intFields[name] = \
+            (segmentIndex, shift, maxValue, maxValue << shift)
+          break
+    self.nameSet = set(self.names)
+  # ---------------------------------------------------------------------------
+  def readSegment(self, binaryUnit, segmentIndex):
+    """reads a segment as unsigned value"""
+    bytePos, endPos, segmentStruct, chunkBitSizes = \
+      self.segments[segmentIndex]
+    if endPos > binaryUnit.usedBufferSize:
+      raise IndexError("bytePos/byteLength out of buffer")
+    chunks = segmentStruct.unpack_from(binaryUnit.buffer,
+                                       binaryUnit.bufferOffset + bytePos)
+    if len(chunks) == 1:
+      return int(chunks[0])
+    value = 0
+    for i, chunk in enumerate(chunks):
+      value = (value << chunkBitSizes[i]) | chunk
+    # int() returns an int instead of a long if possible
+    return int(value)
+  # ---------------------------------------------------------------------------
+  def writeSegment(self, binaryUnit, segmentIndex, value):
+    """writes a segment from an unsigned value"""
+    bytePos, endPos, segmentStruct, chunkBitSizes = \
+      self.segments[segmentIndex]
+    if len(chunkBitSizes) == 1:
+      chunks = [value]
+    else:
+      chunks = []
+      for chunkBitSize in reversed(chunkBitSizes):
+        chunks.append(value & ((1 << chunkBitSize) - 1))
+        value >>= chunkBitSize
+      chunks.reverse()
+    segmentStruct.pack_into(binaryUnit.buffer,
+                            binaryUnit.bufferOffset + bytePos,
+                            *chunks)
+  # ---------------------------------------------------------------------------
+  def getFields(self, binaryUnit, names=None):
+    """reads the attributes, returns a dictionary name -> value"""
+    if names == None:
+      names = self.names
+    fieldValues = {}
+    segmentValues = {}
+    for name in names:
+      intField = self.intFields.get(name)
+      if intField == None:
+        # BYTES, STRING and TIME attributes
+        fieldValues[name] = getattr(binaryUnit, name)
+        continue
+      segmentIndex, shift, maxValue, fieldMask = intField
+      if segmentIndex in segmentValues:
+        segmentValue = segmentValues[segmentIndex]
+      else:
+        segmentValue = self.readSegment(binaryUnit, segmentIndex)
+        segmentValues[segmentIndex] = segmentValue
+      fieldValues[name] = (segmentValue >> shift) & maxValue
+    return fieldValues
+  # ---------------------------------------------------------------------------
+  def setFields(self, binaryUnit, fieldValues):
+    """writes the attributes of the fieldValues dictionary"""
+    # 1st pass: validation and conversion of all values,
+    # the integer values are merged into a clear mask and a set mask per
+    # segment, the buffer is not modified before all values are accepted
+    intFields = self.intFields
+    usedBufferSize = binaryUnit.usedBufferSize
+    nrSegments = len(self.segments)
+    clearMasks = [0] * nrSegments
+    setMasks = [0] * nrSegments
+    # integer attributes of segments that exceed the buffer: (name, value)
+    intItems = []
+    # BYTES, STRING and TIME attributes: (bytePos, length, type, value)
+    genericItems = []
+    for name, value in fieldValues.iteritems():
+      intField = intFields.get(name)
+      if intField == None:
+        genericField = self.genericFields.get(name)
+        if genericField == None:
+          raise AttributeError("attribute not found")
+        bytePos, fieldLength, fieldType = genericField
+        if fieldType == TIME:
+          binaryUnit.checkTime(bytePos, fieldLength, value)
+        else:
+          value = binaryUnit.checkBytes(bytePos, fieldLength, value)
+        genericItems.append((bytePos, fieldLength, fieldType, value))
+        continue
+      if type(value) not in INTEGER_TYPES:
+        try:
+          value = long(value)
+        except:
+          raise ValueError("value is not an integer/long")
+      segmentIndex, shift, maxValue, fieldMask = intField
+      if value < 0:
+        if name in self.bitsNames:
+          raise ValueError("value out of range")
+        # UNSIGNED attributes: two's complement like setUnsigned
+        value &= maxValue
+      elif value > maxValue:
+        raise ValueError("value out of range")
+      if self.segments[segmentIndex][1] > usedBufferSize:
+        # segment exceeds the buffer ---> the attribute itself must fit
+        if self.intFieldEnds[name] > usedBufferSize:
+          raise IndexError("bytePos/byteLength out of buffer")
+        intItems.append((name, value))
+        continue
+      clearMasks[segmentIndex] |= fieldMask
+      setMasks[segmentIndex] |= value << shift
+    # 2nd pass: writing of the validated values
+    for segmentIndex in xrange(nrSegments):
+      clearMask = clearMasks[segmentIndex]
+      if clearMask == 0:
+        continue
+      segmentValue = self.readSegment(binaryUnit, segmentIndex)
+      segmentValue = (segmentValue & ~clearMask) | setMasks[segmentIndex]
+      self.writeSegment(binaryUnit, segmentIndex, segmentValue)
+    for name, value in intItems:
+      setattr(binaryUnit, name, value)
+    for bytePos, fieldLength, fieldType, value in genericItems:
+      if fieldType == TIME:
+        binaryUnit.setTime(bytePos, fieldLength, value)
+      else:
+        binaryUnit.setBytes(bytePos, fieldLength, value)
+
 #############
 # functions #
 #############
+def getFieldPlan(attributeMap1, attributesSize1=0, attributeMap2=None):
+  """returns the (cached) field plan for the attribute maps"""
+  key = (id(attributeMap1), attributesSize1, id(attributeMap2))
+  fieldPlan = s_fieldPlans.get(key)
+  if fieldPlan == None or \
+     fieldPlan.attributeMap1 is not attributeMap1 or \
+     fieldPlan.attributeMap2 is not attributeMap2:
+    fieldPlan = FieldPlan(attributeMap1, attributesSize1, attributeMap2)
+    s_fieldPlans[key] = fieldPlan
+  return fieldPlan
+
+def compileBitsField(bitPos, bitLength):
+  """returns getter and setter functions for a BITS field"""
+  firstBytePos = bitPos >> 3
+  lastBitPos = bitPos + bitLength - 1
+  lastBytePos = lastBitPos >> 3
+  byteLength = lastBytePos - firstBytePos + 1
+  endPos = lastBytePos + 1
+  shift = 7 - (lastBitPos & 7)
+  maxValue = (1 << bitLength) - 1
+  clearMask = ((1 << (byteLength << 3)) - 1) ^ (maxValue << shift)
+  # the setters delegate out of range values, non-integer values and
+  # buffer overruns to the generic implementation, which raises the errors
+  if byteLength == 1:
+    # direct access to the byte
+    def getter(self):
+      if endPos > self.usedBufferSize:
+        raise IndexError("bitPos/bitLength out of buffer")
+      byte = self.buffer[self.bufferOffset + firstBytePos]
+      return (byte >> shift) & maxValue
+    def setter(self, value):
+      if endPos > self.usedBufferSize or not (0 <= value <= maxValue):
+        self.setBits(bitPos, bitLength, value)
+        return
+      try:
+        value <<= shift
+      except TypeError:
+        self.setBits(bitPos, bitLength, value)
+        return
+      buffer = self.buffer
+      pos = self.bufferOffset + firstBytePos
+      buffer[pos] = (buffer[pos] & clearMask) | value
+    return getter, setter
+  if byteLength == 2:
+    # direct access to the 2 bytes
+    def getter(self):
+      if endPos > self.usedBufferSize:
+        raise IndexError("bitPos/bitLength out of buffer")
+      buffer = self.buffer
+      pos = self.bufferOffset + firstBytePos
+      word = (buffer[pos] << 8) | buffer[pos + 1]
+      return (word >> shift) & maxValue
+    def setter(self, value):
+      if endPos > self.usedBufferSize or not (0 <= value <= maxValue):
+        self.setBits(bitPos, bitLength, value)
+        return
+      try:
+        value <<= shift
+      except TypeError:
+        self.setBits(bitPos, bitLength, value)
+        return
+      buffer = self.buffer
+      pos = self.bufferOffset + firstBytePos
+      word = (buffer[pos] << 8) | buffer[pos + 1]
+      word = (word & clearMask) | value
+      buffer[pos] = word >> 8
+      buffer[pos + 1] = word & 0xFF
+    return getter, setter
+  fieldStruct = None
+  if byteLength < len(FIELD_STRUCTS):
+    fieldStruct = FIELD_STRUCTS[byteLength]
+  if fieldStruct == None:
+    # no struct format for this field size ---> generic access
+    def getter(self):
+      return self.getBits(bitPos, bitLength)
+    def setter(self, value):
+      self.setBits(bitPos, bitLength, value)
+    return getter, setter
+  # access via struct format
+  unpackFrom = fieldStruct.unpack_from
+  packInto = fieldStruct.pack_into
+  def getter(self):
+    if endPos > self.usedBufferSize:
+      raise IndexError("bitPos/bitLength out of buffer")
+    pos = self.bufferOffset + firstBytePos
+    return (unpackFrom(self.buffer, pos)[0] >> shift) & maxValue
+  def setter(self, value):
+    if endPos > self.usedBufferSize or not (0 <= value <= maxValue):
+      self.setBits(bitPos, bitLength, value)
+      return
+    try:
+      value <<= shift
+    except TypeError:
+      self.setBits(bitPos, bitLength, value)
+      return
+    buffer = self.buffer
+    pos = self.bufferOffset + firstBytePos
+    word = unpackFrom(buffer, pos)[0] & clearMask
+    packInto(buffer, pos, word | value)
+  return getter, setter
+
+def compileUnsignedField(bytePos, byteLength):
+  """returns getter and setter functions for an UNSIGNED field"""
+  endPos = bytePos + byteLength
+  maxValue = (1 << (byteLength << 3)) - 1
+  # the setters delegate out of range values and buffer overruns
+  # to the generic implementation, which raises the errors
+  if byteLength == 1:
+    # direct access to the byte
+    def getter(self):
+      if endPos > self.usedBufferSize:
+        raise IndexError("bytePos/byteLength out of buffer")
+      return self.buffer[self.bufferOffset + bytePos]
+    def setter(self, value):
+      if endPos > self.usedBufferSize or not (0 <= value <= maxValue):
+        self.setUnsigned(bytePos, byteLength, value)
+        return
+      self.buffer[self.bufferOffset + bytePos] = value
+    return getter, setter
+  if byteLength == 2:
+    # direct access to the 2 bytes
+    def getter(self):
+      if endPos > self.usedBufferSize:
+        raise IndexError("bytePos/byteLength out of buffer")
+      buffer = self.buffer
+      pos = self.bufferOffset + bytePos
+      return (buffer[pos] << 8) | buffer[pos + 1]
+    def setter(self, value):
+      if endPos > self.usedBufferSize or not (0 <= value <= maxValue):
+        self.setUnsigned(bytePos, byteLength, value)
+        return
+      buffer = self.buffer
+      pos = self.bufferOffset + bytePos
+      buffer[pos] = value >> 8
+      buffer[pos + 1] = value & 0xFF
+    return getter, setter
+  fieldStruct = None
+  if byteLength < len(FIELD_STRUCTS):
+    fieldStruct = FIELD_STRUCTS[byteLength]
+  if fieldStruct == None:
+    # no struct format for this field size ---> generic access
+    def getter(self):
+      return self.getUnsigned(bytePos, byteLength)
+    def setter(self, value):
+      self.setUnsigned(bytePos, byteLength, value)
+    return getter, setter
+  # access via struct format
+  unpackFrom = fieldStruct.unpack_from
+  packInto = fieldStruct.pack_into
+  def getter(self):
+    if endPos > self.usedBufferSize:
+      raise IndexError("bytePos/byteLength out of buffer")
+    return unpackFrom(self.buffer, self.bufferOffset + bytePos)[0]
+  def setter(self, value):
+    if endPos > self.usedBufferSize or not (0 <= value <= maxValue):
+      self.setUnsigned(bytePos, byteLength, value)
+      return
+    packInto(self.buffer, self.bufferOffset + bytePos, value)
+  return getter, setter
+
+def compileField(fieldSpec, byteOffset=0):
+  """
+  returns getter and setter functions for an attribute map entry,
+  byteOffset is added to the fieldOffset (e.g. for attributeMap2)
+  """
+  fieldOffset, fieldLength, fieldType = fieldSpec
+  if fieldType == BITS:
+    return compileBitsField(fieldOffset + (byteOffset << 3), fieldLength)
+  bytePos = fieldOffset + byteOffset
+  if fieldType == UNSIGNED:
+    return compileUnsignedField(bytePos, fieldLength)
+  if fieldType == BYTES:
+    def getter(self):
+      return self.getBytes(bytePos, fieldLength)
+    def setter(self, value):
+      self.setBytes(bytePos, fieldLength, value)
+  elif fieldType == STRING:
+    def getter(self):
+      return self.getString(bytePos, fieldLength)
+    def setter(self, value):
+      self.setString(bytePos, fieldLength, value)
+  else:
+    timeFormat = fieldLength
+    def getter(self):
+      return self.getTime(bytePos, timeFormat)
+    def setter(self, value):
+      self.setTime(bytePos, timeFormat, value)
+  return getter, setter
+
+def compileOptionalField(name, attributeMap2, getter, setter):
+  """
+  wraps the getter and setter of an attributeMap2 entry, the generic
+  attribute access is used when the instance has another attributeMap2
+  """
+  def optionalGetter(self):
+    if self.attributeMap2 is not attributeMap2:
+      return BinaryUnit.__getattr__(self, name)
+    return getter(self)
+  def optionalSetter(self, value):
+    if self.attributeMap2 is not attributeMap2:
+      BinaryUnit.__setattr__(self, name, value)
+      return
+    setter(self, value)
+  return optionalGetter, optionalSetter
+
+def compileBinaryUnit(baseClass,
+                      attributeMap1=None,
+                      attributesSize1=0,
+                      attributeMap2=None,
+                      optionalAttributeMap2=False):
+  """
+  generates a subclass of baseClass with properties for the attributes in
+  attributeMap1 and attributeMap2 (located after attributesSize1 bytes),
+  the properties use precomputed struct formats, shifts and masks and
+  avoid the generic __getattr__ / __setattr__ lookup,
+  the attribute maps of the instances must match the compiled ones,
+  except an optionalAttributeMap2 (e.g. a TM frame secondary header) that
+  is only used when it is the attributeMap2 of the instance,
+  attributes that are not compiled can be read but not written
+  """
+  getters = dict(getattr(baseClass, "compiledGetters", {}))
+  setters = dict(getattr(baseClass, "compiledSetters", {}))
+  namespace = {}
+  if attributeMap1 != None:
+    for name, fieldSpec in attributeMap1.iteritems():
+      getter, setter = compileField(fieldSpec)
+      getters[name] = getter
+      setters[name] = setter
+      namespace[name] = property(getter, setter)
+  if attributeMap2 != None:
+    for name, fieldSpec in attributeMap2.iteritems():
+      # attributeMap1 has precedence
+      if name in setters:
+        continue
+      getter, setter = compileField(fieldSpec, attributesSize1)
+      if optionalAttributeMap2:
+        getter, setter = \
+          compileOptionalField(name, attributeMap2, getter, setter)
+      getters[name] = getter
+      setters[name] = setter
+      namespace[name] = property(getter, setter)
+  # the properties are data descriptors: object.__setattr__ invokes them
+  # without the generic BinaryUnit.__setattr__ in between
+  namespace["__setattr__"] = object.__setattr__
+  namespace["__slots__"] = ()
+  namespace["__module__"] = baseClass.__module__
+  namespace["compiledGetters"] = getters
+  namespace["compiledSetters"] = setters
+  return type("Compiled" + baseClass.__name__, (baseClass,), namespace)
+
+def binary2array(binaryString):
+  """
+  converts a binary string, a list of byte values, a bytearray,
+  a buffer or a memoryview into an array.array("B")
+  """
+  binaryStringType = type(binaryString)
+  if binaryStringType == memoryview:
+    binaryString = binaryString.tobytes()
+  elif binaryStringType == buffer:
+    binaryString = str(binaryString)
+  return array.array("B", binaryString)
+
 def array2str(binaryString, maxLen=65536):
   """converts a binaryString into a readable data dump"""
-  if type(binaryString) != ARRAY_TYPE:
-    binaryString = array.array("B", binaryString)
+  return "".join(hexDumpRows(binaryString, maxLen))
+
+def writeHexDump(stream, binaryString, maxLen=65536):
+  """writes the readable data dump of array2str to a file/stream"""
+  for row in hexDumpRows(binaryString, maxLen):
+    stream.write(row)
+
+def hexDumpRows(binaryString, maxLen=65536):
+  """
+  generator for the rows of the readable data dump,
+  each row contains the line break, the offset, 16 hex bytes and the
+  printable characters, the last row is filled up to the full width
+  """
+  binaryStringType = type(binaryString)
+  if binaryStringType != str:
+    if binaryStringType != ARRAY_TYPE:
+      binaryString = binary2array(binaryString)
+    binaryString = binaryString.tostring()
   binaryStringSize = len(binaryString)
   if binaryStringSize == 0:
     # special output format if binaryString is empty
-    return "EMPTY"
-  retStr = ""
-  retStr2 = ""
-  i = 0
-  for byte in binaryString:
-    if i >= binaryStringSize:
-      break
-    if i >= maxLen:
-      break
-    if i >= 65536:
-      # stop here to display only the first 64K bytes
-      break
-    if i % 16 == 0:
-      # next 16 bytes are started
-      retStr += retStr2
-      retStr += ("\n%04X " % i)
-      retStr2 = ""
-    retStr += ("%02X " % byte)
-    if byte >= 32 and byte < 127:
-      # printable character
-      retStr2 += chr(byte)
-    else:
-      # special character
-      retStr2 += "."
-    i += 1
-  fillerSize = 15 - ((i - 1) % 16)
-  filler = "   " * fillerSize
-  retStr += filler + retStr2
-  return retStr
+    yield "EMPTY"
+    return
+  # display only the first 64K bytes
+  dumpSize = min(binaryStringSize, maxLen, 65536)
+  if dumpSize <= 0:
+    return
+  hexBytes = map(HEX_DUMP_BYTES.__getitem__, bytearray(binaryString[:dumpSize]))
+  printable = binaryString[:dumpSize].translate(HEX_DUMP_PRINTABLE)
+  lastRowPos = (dumpSize - 1) & ~15
+  for rowPos in xrange(0, lastRowPos, 16):
+    yield HEX_DUMP_OFFSETS[rowPos >> 4] + \
+          "".join(hexBytes[rowPos:rowPos + 16]) + \
+          printable[rowPos:rowPos + 16]
+  filler = "   " * (16 - (dumpSize - lastRowPos))
+  yield HEX_DUMP_OFFSETS[lastRowPos >> 4] + \
+        "".join(hexBytes[lastRowPos:]) + \
+        filler + \
+        printable[lastRowPos:]
 
 def str2array(hexString, withoutSpaces=False):
   """converts a hex string into a binaryString"""
   # e.g. "00 01 FF FE 64 12" converts to array('B', [0, 1, 255, 254, 100, 18])
   # withoutSpaces=True: "0001FFFE6412" instead of "00 01 FF FE 64 12"
   if withoutSpaces:
-    hexTuples = [hexString[i:i+2] for i in xrange(0, len(hexString), 2)]
+    hexDigits = hexString
+    allTwoDigits = (len(hexString) & 1) == 0
   else:
     hexTuples = hexString.split()
+    hexDigits = "".join(hexTuples)
+    # the total number of digits is not sufficient, e.g. "012 3"
+    allTwoDigits = len(hexTuples) == 0 or set(map(len, hexTuples)) == set([2])
+  if allTwoDigits:
+    # all hex tuples have 2 digits ---> conversion via binascii
+    try:
+      return array.array("B", binascii.unhexlify(hexDigits))
+    except TypeError:
+      # invalid digits ---> error handling of the generic conversion
+      pass
+  if withoutSpaces:
+    hexTuples = [hexString[i:i+2] for i in xrange(0, len(hexString), 2)]
   return array.array('B', map((lambda x: int(x, 16)), hexTuples))
 
 def unsigned2signed(value, byteSize):
@@ -35,6 +35,8 @@
 #              - socket events (e.g. TCP/IP readers) that are installed via   *
 #                createFileHandler and deleteFileHandler                      *
 #              - timer events that are installed via createTimeHandler        *
+#                (the timers use the clock of UTIL.TIME, which can run in     *
+#                real time, scaled or as discrete event clock)                *
 #              - Event objects that can be created in any parallel thread     *
 #                and be pushed to the task via pushEvent                      *
 #              - console events that are attached to the task via             *
@@ -54,7 +56,7 @@
 #              provide a transparent integration of a GUI library             *
 #              (e.g. Tkinter). In this case the GUI occupies the ParentTask.  *
 #******************************************************************************
-import os, signal, select, socket, struct, sys, threading, time
+import os, signal, socket, struct, sys, threading
 if sys.platform == "win32":
   import msvcrt
   PLATFORM = "win32"
@@ -65,7 +67,7 @@ else:
   else:
     PLATFORM = "Linux_new"
 from UTIL.SYS import Error, LOG, LOG_INFO, LOG_WARNING, LOG_ERROR
-import UTIL.SYS
+import UTIL.SYS, UTIL.TIME
 
 #############
 # constants #
@@ -141,6 +143,8 @@ class Task(threading.Thread):
       # --- prepare readers ---
       readers = self.readDictionary.keys()
       # --- prepare timers ---
+      # the clock might be replaced at runtime (e.g. by a discrete event clock)
+      clock = UTIL.TIME.s_clock
       # clone the timers because they might be modified by handlers
       timers = list(self.timerEvents)
       # calculate the timeout for the earliest timer
@@ -149,7 +153,7 @@ class Task(threading.Thread):
         timeout = POLL_CYCLE
       else:
         # timer registered ---> take the relative time of the 1st timer event
-        timeAbsoluteSec = time.time()
+        timeAbsoluteSec = clock.getTime()
         nextTimeoutAbsoluteSec = timers[0][0]
         nextTimeoutRelativeSec = nextTimeoutAbsoluteSec - timeAbsoluteSec
         # don't use negative timeouts and timeouts > POLL_CYCLE
@@ -158,11 +162,11 @@ class Task(threading.Thread):
       # --- wait for an event or timeout ---
       # use sleep or select depending on the number of readers
       if len(readers) == 0:
-        time.sleep(timeout)
+        clock.sleep(timeout)
         status = [[], [], []]
       else:
         try:
-          status = select.select(readers, [], [], timeout)
+          status = clock.select(readers, timeout)
         except Exception, ex:
           LOG_ERROR("Select terminated unexcepted: " + str(ex))
           sys.exit(-1)
@@ -178,7 +182,7 @@ class Task(threading.Thread):
         else:
           LOG_WARNING("Reader no more in the read dictionary")
       # --- process timers ---
-      timeAbsoluteSec = time.time()
+      timeAbsoluteSec = clock.getTime()
       i = 0
       while i < len(timers):
         nextTimeoutAbsoluteSec = timers[i][0]
@@ -266,7 +270,7 @@ class Task(threading.Thread):
       return
     # normal implementation: create new timer event and order it into
     # existing ordered timer events
-    timeAbsoluteSec = time.time()
+    timeAbsoluteSec = UTIL.TIME.s_clock.getTime()
     timeoutAbsoluteSec = timeAbsoluteSec + (ms / 1000.0)
     timerEvent = (timeoutAbsoluteSec, handler)
     i = 0
@@ -13,8 +13,15 @@
 #******************************************************************************
 # Utilities - Time Correlation to the mission epoch for                       *
 #             Onboard Time (OBT) and Earth Reception Time (ERT)               *
+#                                                                             *
+# A TimeCorrelation models the mission epoch time as a linear function of     *
+# UTC: epochTime = (1 + drift) * utcTime + intercept, where the intercept     *
+# contains the mission epoch, an offset, the drift reference time and the     *
+# leap seconds that apply at utcTime (leap seconds table).                    *
+# The coefficients are precomputed and replaced as a whole on updates.        *
 #******************************************************************************
-import UTIL.TIME
+import bisect
+import UTIL.BATCH, UTIL.TIME
 
 #############
 # constants #
@@ -29,22 +36,158 @@ GPS_LEAP_SECONDS_2009 = 15
 GPS_LEAP_SECONDS_2012 = 16
 GPS_LEAP_SECONDS_2015 = 17
 GPS_LEAP_SECONDS_2017 = 18
+# leap seconds table for GPS time: (UTC start time string, leap seconds)
+GPS_LEAP_SECONDS_TABLE_STR = [
+  ["1980.006.00.00.00.000", GPS_LEAP_SECONDS_1980],
+  ["1981.182.00.00.00.000", 1],
+  ["1982.182.00.00.00.000", 2],
+  ["1983.182.00.00.00.000", 3],
+  ["1985.182.00.00.00.000", 4],
+  ["1988.001.00.00.00.000", 5],
+  ["1990.001.00.00.00.000", 6],
+  ["1991.001.00.00.00.000", 7],
+  ["1992.183.00.00.00.000", 8],
+  ["1993.182.00.00.00.000", 9],
+  ["1994.182.00.00.00.000", 10],
+  ["1996.001.00.00.00.000", 11],
+  ["1997.182.00.00.00.000", 12],
+  ["1999.001.00.00.00.000", 13],
+  ["2006.001.00.00.00.000", 14],
+  ["2009.001.00.00.00.000", GPS_LEAP_SECONDS_2009],
+  ["2012.183.00.00.00.000", GPS_LEAP_SECONDS_2012],
+  ["2015.182.00.00.00.000", GPS_LEAP_SECONDS_2015],
+  ["2017.001.00.00.00.000", GPS_LEAP_SECONDS_2017]]
+
+###########
+# classes #
+###########
+# =============================================================================
+class TimeCorrelation(object):
+  """correlation between UTC and a mission epoch time"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, missionEpochStr=UNIX_MISSION_EPOCH_STR, leapSeconds=0):
+    """initialise the correlation without offset and drift"""
+    self.missionEpochStr = missionEpochStr
+    self.missionEpoch = UTIL.TIME.getTimeFromASDstr(missionEpochStr)
+    # [(utcStartTime, leapSeconds), ...] sorted by utcStartTime
+    self.leapSecondsTable = [(None, leapSeconds)]
+    self.offset = 0.0
+    self.drift = 0.0
+    self.driftReferenceTime = 0.0
+    self.model = None
+    self.updateModel()
+  # ---------------------------------------------------------------------------
+  def updateModel(self):
+    """
+    precomputes the coefficients, the model tuple is replaced as a whole:
+    (rate, intercepts, utcStartTimes, epochStartTimes)
+    """
+    rate = 1.0 + self.drift
+    intercepts = []
+    utcStartTimes = []
+    epochStartTimes = []
+    for utcStartTime, leapSeconds in self.leapSecondsTable:
+      missionEpochWithLeapSeconds = self.missionEpoch - leapSeconds
+      if self.drift == 0.0 and self.offset == 0.0:
+        # exactly the same results as the plain epoch subtraction
+        intercept = -missionEpochWithLeapSeconds
+      else:
+        intercept = self.offset - missionEpochWithLeapSeconds - \
+                    (self.drift * self.driftReferenceTime)
+      intercepts.append(intercept)
+      if utcStartTime == None:
+        utcStartTimes.append(float("-inf"))
+        epochStartTimes.append(float("-inf"))
+      else:
+        utcStartTimes.append(utcStartTime)
+        epochStartTimes.append(utcStartTime * rate + intercept)
+    self.model = (rate, intercepts, utcStartTimes, epochStartTimes)
+  # ---------------------------------------------------------------------------
+  def setMissionEpochStr(self, missionEpochStr):
+    """sets the mission epoch"""
+    self.missionEpochStr = missionEpochStr
+    self.missionEpoch = UTIL.TIME.getTimeFromASDstr(missionEpochStr)
+    self.updateModel()
+  # ---------------------------------------------------------------------------
+  def setLeapSeconds(self, leapSeconds):
+    """sets constant leap seconds"""
+    self.leapSecondsTable = [(None, leapSeconds)]
+    self.updateModel()
+  # ---------------------------------------------------------------------------
+  def setLeapSecondsTableStr(self, leapSecondsTableStr):
+    """
+    sets leap seconds that change over time:
+    [[utcStartTimeStr, leapSeconds], ...] in ascending order,
+    the first leap seconds apply also before the first start time
+    """
+    leapSecondsTable = []
+    for utcStartTimeStr, leapSeconds in leapSecondsTableStr:
+      if len(leapSecondsTable) == 0:
+        leapSecondsTable.append((None, leapSeconds))
+      else:
+        utcStartTime = UTIL.TIME.getTimeFromASDstr(utcStartTimeStr)
+        leapSecondsTable.append((utcStartTime, leapSeconds))
+    self.leapSecondsTable = leapSecondsTable
+    self.updateModel()
+  # ---------------------------------------------------------------------------
+  def setDrift(self, offset, drift, driftReferenceTime):
+    """
+    sets the offset (seconds) and the linear drift (seconds per second)
+    of the mission epoch time, the drift is zero at driftReferenceTime
+    """
+    self.offset = offset
+    self.drift = drift
+    self.driftReferenceTime = driftReferenceTime
+    self.updateModel()
+  # ---------------------------------------------------------------------------
+  def getCoefficients(self, pyUTCtime):
+    """returns (rate, intercept) that apply at pyUTCtime"""
+    rate, intercepts, utcStartTimes, epochStartTimes = self.model
+    index = bisect.bisect_right(utcStartTimes, pyUTCtime) - 1
+    return (rate, intercepts[index])
+  # ---------------------------------------------------------------------------
+  def toEpoch(self, pyUTCtime):
+    """correlate the local time to the mission epoch time"""
+    rate, intercepts, utcStartTimes, epochStartTimes = self.model
+    if len(intercepts) == 1:
+      return pyUTCtime * rate + intercepts[0]
+    index = bisect.bisect_right(utcStartTimes, pyUTCtime) - 1
+    return pyUTCtime * rate + intercepts[index]
+  # ---------------------------------------------------------------------------
+  def fromEpoch(self, pyEpochTime):
+    """correlate the mission epoch time to the local time"""
+    rate, intercepts, utcStartTimes, epochStartTimes = self.model
+    if len(intercepts) == 1:
+      return (pyEpochTime - intercepts[0]) / rate
+    index = bisect.bisect_right(epochStartTimes, pyEpochTime) - 1
+    return (pyEpochTime - intercepts[index]) / rate
+  # ---------------------------------------------------------------------------
+  def toEpochArray(self, pyUTCtimes):
+    """correlates a NumPy array of local times to mission epoch times"""
+    UTIL.BATCH.checkNumpy()
+    numpy = UTIL.BATCH.numpy
+    rate, intercepts, utcStartTimes, epochStartTimes = self.model
+    pyUTCtimes = numpy.asarray(pyUTCtimes, dtype=numpy.float64)
+    indices = numpy.searchsorted(utcStartTimes, pyUTCtimes, side="right") - 1
+    return pyUTCtimes * rate + numpy.array(intercepts)[indices]
+  # ---------------------------------------------------------------------------
+  def fromEpochArray(self, pyEpochTimes):
+    """correlates a NumPy array of mission epoch times to local times"""
+    UTIL.BATCH.checkNumpy()
+    numpy = UTIL.BATCH.numpy
+    rate, intercepts, utcStartTimes, epochStartTimes = self.model
+    pyEpochTimes = numpy.asarray(pyEpochTimes, dtype=numpy.float64)
+    indices = numpy.searchsorted(epochStartTimes, pyEpochTimes, side="right") - 1
+    return (pyEpochTimes - numpy.array(intercepts)[indices]) / rate
 
 ####################
 # global variables #
 ####################
-# shall be initialised via setOBTmissionEpochStr()
-s_obtMissionEpochStr = ""
-s_obtMissionEpoch = 0
-s_obtMissionEpochWithLeapSeconds = 0
-# shall be initialised via setOBTleapSeconds()
-s_obtLeapSeconds = 0
-# shall be initialised via setERTmissionEpochStr()
-s_ertMissionEpochStr = ""
-s_ertMissionEpoch = 0
-s_ertMissionEpochWithLeapSeconds = 0
-# shall be initialised via setERTleapSeconds()
-s_ertLeapSeconds = 0
+# correlation objects behind the module functions, shall be initialised
+# via setOBTmissionEpochStr(), setOBTleapSeconds(), setERTmissionEpochStr()
+# and setERTleapSeconds()
+s_obtCorrelation = TimeCorrelation()
+s_ertCorrelation = TimeCorrelation()
 
 #############
 # functions #
@@ -52,46 +195,40 @@ s_ertLeapSeconds = 0
 # -----------------------------------------------------------------------------
 def setOBTmissionEpochStr(missionEpochStr):
   """sets the OBT mission epoch string"""
-  global s_optMissionEpochStr, s_obtMissionEpoch
-  global s_obtLeapSeconds, s_obtMissionEpochWithLeapSeconds
-  s_obtMissionEpochStr = missionEpochStr
-  s_obtMissionEpoch = UTIL.TIME.getTimeFromASDstr(s_obtMissionEpochStr)
-  s_obtMissionEpochWithLeapSeconds = s_obtMissionEpoch - s_obtLeapSeconds
+  s_obtCorrelation.setMissionEpochStr(missionEpochStr)
 # -----------------------------------------------------------------------------
 def setOBTleapSeconds(leapSeconds):
   """sets the OBT leap seconds"""
-  global s_obtMissionEpoch
-  global s_obtLeapSeconds, s_obtMissionEpochWithLeapSeconds
-  s_obtLeapSeconds = leapSeconds
-  s_obtMissionEpochWithLeapSeconds = s_obtMissionEpoch - s_obtLeapSeconds
+  s_obtCorrelation.setLeapSeconds(leapSeconds)
 # -----------------------------------------------------------------------------
 def correlateFromOBTmissionEpoch(pyEpochTime):
   """correlate the OBT mission epoch time to the local time"""
-  return pyEpochTime + s_obtMissionEpochWithLeapSeconds
+  return s_obtCorrelation.fromEpoch(pyEpochTime)
 # -----------------------------------------------------------------------------
 def correlateToOBTmissionEpoch(pyUTCtime):
   """correlate the local time to OBT mission epoch time"""
-  return pyUTCtime - s_obtMissionEpochWithLeapSeconds
+  return s_obtCorrelation.toEpoch(pyUTCtime)
 # -----------------------------------------------------------------------------
 def setERTmissionEpochStr(missionEpochStr):
   """sets the ERT mission epoch string"""
-  global s_ertMissionEpochStr, s_ertMissionEpoch
-  global s_ertLeapSeconds, s_ertMissionEpochWithLeapSeconds
-  s_ertMissionEpochStr = missionEpochStr
-  s_ertMissionEpoch = UTIL.TIME.getTimeFromASDstr(s_ertMissionEpochStr)
-  s_ertMissionEpochWithLeapSeconds = s_ertMissionEpoch - s_ertLeapSeconds
+  s_ertCorrelation.setMissionEpochStr(missionEpochStr)
 # -----------------------------------------------------------------------------
 def setERTleapSeconds(leapSeconds):
   """sets the ERT leap seconds"""
-  global s_ertMissionEpoch
-  global s_ertLeapSeconds, s_ertMissionEpochWithLeapSeconds
-  s_ertLeapSeconds = leapSeconds
-  s_ertMissionEpochWithLeapSeconds = s_ertMissionEpoch - s_ertLeapSeconds
+  s_ertCorrelation.setLeapSeconds(leapSeconds)
 # -----------------------------------------------------------------------------
 def correlateFromERTmissionEpoch(pyEpochTime):
   """correlate the ERT mission epoch time to the local time"""
-  return pyEpochTime + s_ertMissionEpochWithLeapSeconds
+  return s_ertCorrelation.fromEpoch(pyEpochTime)
 # -----------------------------------------------------------------------------
 def correlateToERTmissionEpoch(pyUTCtime):
   """correlate the local time to ERT mission epoch time"""
-  return pyUTCtime - s_ertMissionEpochWithLeapSeconds
+  return s_ertCorrelation.toEpoch(pyUTCtime)
+# -----------------------------------------------------------------------------
+def getOBTcorrelation():
+  """returns the correlation object of the OBT"""
+  return s_obtCorrelation
+# -----------------------------------------------------------------------------
+def getERTcorrelation():
+  """returns the correlation object of the ERT"""
+  return s_ertCorrelation
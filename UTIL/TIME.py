@@ -12,13 +12,130 @@
 # General Public License for more details.                                    *
 #******************************************************************************
 # Utilities - Basic Time Conversions                                          *
+# The ASD time string conversion memoizes the date/time part of the last      *
+# second and parses the fixed layout without time.strptime.                   *
+#                                                                             *
+# The actual time is provided by a pluggable clock:                           *
+# - RealTimeClock: wall clock time (default)                                  *
+# - ScaledClock: the time runs with a constant factor faster than real time   *
+# - DiscreteEventClock: the time only advances when the task loop waits for   *
+#   the next timer, the waiting is skipped ("as fast as possible")            *
+# The clock is used by UTIL.TASK for the timers and the waiting.              *
 #******************************************************************************
-import time
+import select, threading, time
 
 #############
 # constants #
 #############
 SECONDS_OF_DAY = (24 * 60 * 60)
+# days from 0001.001 (day 1 of the proleptic gregorian calendar) to 1970.001
+EPOCH_DAYS = 719163
+# clock modes for createClock()
+CLOCK_REALTIME = "REALTIME"
+CLOCK_SCALED = "SCALED"
+CLOCK_DISCRETE = "DISCRETE"
+# precomputed fraction parts of the ASD time strings: ".MMM" and "MMM"
+ASD_MILLIS_STRS = tuple([".%03d" % i for i in xrange(1000)])
+ASD_DIGITS3_STRS = tuple(["%03d" % i for i in xrange(1000)])
+
+###########
+# classes #
+###########
+# =============================================================================
+class RealTimeClock(object):
+  """clock that provides the wall clock time"""
+  # ---------------------------------------------------------------------------
+  def getTime(self):
+    """returns the actual time"""
+    return time.time()
+  # ---------------------------------------------------------------------------
+  def getRealTimeout(self, timeout):
+    """converts a timeout of the clock into wall clock seconds"""
+    return timeout
+  # ---------------------------------------------------------------------------
+  def sleep(self, timeout):
+    """waits for timeout seconds of the clock"""
+    time.sleep(self.getRealTimeout(timeout))
+  # ---------------------------------------------------------------------------
+  def select(self, readers, timeout):
+    """waits for readers for maximum timeout seconds of the clock"""
+    return select.select(readers, [], [], self.getRealTimeout(timeout))
+
+# =============================================================================
+class ScaledClock(RealTimeClock):
+  """clock that runs scaleFactor times faster than the wall clock"""
+  # ---------------------------------------------------------------------------
+  def __init__(self, scaleFactor, startTime=None):
+    """the clock starts at startTime (default: actual wall clock time)"""
+    self.scaleFactor = float(scaleFactor)
+    self.realStartTime = time.time()
+    if startTime == None:
+      startTime = self.realStartTime
+    self.startTime = startTime
+  # ---------------------------------------------------------------------------
+  def getTime(self):
+    """returns the actual time"""
+    return self.startTime + \
+           (time.time() - self.realStartTime) * self.scaleFactor
+  # ---------------------------------------------------------------------------
+  def getRealTimeout(self, timeout):
+    """converts a timeout of the clock into wall clock seconds"""
+    return timeout / self.scaleFactor
+
+# =============================================================================
+class DiscreteEventClock(RealTimeClock):
+  """
+  clock that only advances when it is waited for,
+  the waiting itself takes no wall clock time
+  """
+  # ---------------------------------------------------------------------------
+  def __init__(self, startTime=None):
+    """the clock starts at startTime (default: actual wall clock time)"""
+    if startTime == None:
+      startTime = time.time()
+    self.currentTime = startTime
+    self.lock = threading.Lock()
+  # ---------------------------------------------------------------------------
+  def getTime(self):
+    """returns the actual time"""
+    return self.currentTime
+  # ---------------------------------------------------------------------------
+  def getRealTimeout(self, timeout):
+    """converts a timeout of the clock into wall clock seconds"""
+    return 0.0
+  # ---------------------------------------------------------------------------
+  def advance(self, timeout):
+    """advances the clock by timeout seconds"""
+    self.lock.acquire()
+    try:
+      self.currentTime += max(0.0, timeout)
+    finally:
+      self.lock.release()
+  # ---------------------------------------------------------------------------
+  def sleep(self, timeout):
+    """advances the clock by timeout seconds without waiting"""
+    self.advance(timeout)
+  # ---------------------------------------------------------------------------
+  def select(self, readers, timeout):
+    """
+    polls the readers, the clock only advances when no reader has data
+    """
+    status = select.select(readers, [], [], 0.0)
+    if len(status[0]) == 0:
+      self.advance(timeout)
+    return status
+
+####################
+# global variables #
+####################
+# memoized ASD time string parts: (day, "YYYY.DDD."),
+# (seconds, "YYYY.DDD.hh.mm.ss") and ("YYYY.DDD.hh.mm.ss", seconds),
+# the tuples are replaced as a whole for thread safety
+s_asdDayCache = (None, "")
+s_asdSecondsCache = (None, "")
+s_asdParseCache = (None, 0)
+# clock for getActualTime() and the UTIL.TASK timers
+s_clock = RealTimeClock()
 
 #############
 # functions #
@@ -26,49 +143,124 @@ SECONDS_OF_DAY = (24 * 60 * 60)
 # -----------------------------------------------------------------------------
 def getActualTime():
   """returns the actual time"""
-  pyTime = time.time()
+  pyTime = s_clock.getTime()
   return pyTime
 # -----------------------------------------------------------------------------
+def getClock():
+  """returns the clock of getActualTime()"""
+  return s_clock
+# -----------------------------------------------------------------------------
+def setClock(clock):
+  """replaces the clock of getActualTime() and of the task timers"""
+  global s_clock
+  s_clock = clock
+# -----------------------------------------------------------------------------
+def createClock(clockStr):
+  """
+  creates a clock from a configuration string:
+  "REALTIME", "SCALED <scaleFactor>" or "DISCRETE"
+  """
+  clockPieces = clockStr.split()
+  if len(clockPieces) == 0:
+    raise ValueError("empty clock configuration")
+  clockMode = clockPieces[0].upper()
+  if clockMode == CLOCK_REALTIME and len(clockPieces) == 1:
+    return RealTimeClock()
+  if clockMode == CLOCK_SCALED and len(clockPieces) == 2:
+    return ScaledClock(float(clockPieces[1]))
+  if clockMode == CLOCK_DISCRETE and len(clockPieces) == 1:
+    return DiscreteEventClock()
+  raise ValueError("invalid clock configuration: " + clockStr)
+# -----------------------------------------------------------------------------
+def getASDdayStr(day):
+  """returns the YYYY.DDD. prefix of a day since the epoch (memoized)"""
+  global s_asdDayCache
+  cachedDay, dayStr = s_asdDayCache
+  if day != cachedDay:
+    dayStr = time.strftime("%Y.%j.", time.gmtime(day * SECONDS_OF_DAY))
+    s_asdDayCache = (day, dayStr)
+  return dayStr
+# -----------------------------------------------------------------------------
+def getASDsecondsStr(secs):
+  """returns the YYYY.DDD.hh.mm.ss part of integer seconds (memoized)"""
+  global s_asdSecondsCache
+  day, secOfDay = divmod(secs, SECONDS_OF_DAY)
+  hours, secOfHour = divmod(secOfDay, 3600)
+  minutes, seconds = divmod(secOfHour, 60)
+  tmStr = "%s%02d.%02d.%02d" % (getASDdayStr(day), hours, minutes, seconds)
+  s_asdSecondsCache = (secs, tmStr)
+  return tmStr
+# -----------------------------------------------------------------------------
 def getASDtimeStr(pyTime, withMicros=False):
   """returns the ASD format YYYY.DDD.hh.mm.ss.MMM or YYYY.DDD.hh.mm.ss.MMMMMM"""
-  # calculate the seconds part
+  # calculate the seconds part, memoized for the last second
   secs = int(pyTime)
-  tm = time.gmtime(secs)
-  tmStr = time.strftime("%Y.%j.%H.%M.%S", tm)
+  cachedSecs, tmStr = s_asdSecondsCache
+  if secs != cachedSecs:
+    tmStr = getASDsecondsStr(secs)
   if withMicros:
     mics = min(int(round((pyTime - secs) * 1000000)), 999999)
-    return tmStr + (".%06d" % mics)
+    mils, mics = divmod(mics, 1000)
+    return tmStr + ASD_MILLIS_STRS[mils] + ASD_DIGITS3_STRS[mics]
   # with milliseconds only
   mils = min(int(round((pyTime - secs) * 1000)), 999)
-  return tmStr + (".%03d" % mils)
+  return tmStr + ASD_MILLIS_STRS[mils]
+# -----------------------------------------------------------------------------
+def parseASDfield(fieldStr, maxDigits, minValue, maxValue):
+  """returns the value of a numerical ASD field or None if invalid"""
+  if len(fieldStr) == 0 or len(fieldStr) > maxDigits or \
+     not fieldStr.isdigit():
+    return None
+  value = int(fieldStr)
+  if value < minValue or value > maxValue:
+    return None
+  return value
+# -----------------------------------------------------------------------------
+def getSecondsFromASDstr(secondsStr):
+  """
+  returns the integer seconds of YYYY.DDD.hh.mm.ss or None if invalid,
+  the fields are checked like time.strptime with "%Y.%j.%H.%M.%S"
+  """
+  global s_asdParseCache
+  timePieces = secondsStr.split(".")
+  if len(timePieces) != 5:
+    return None
+  yearStr, dayStr, hoursStr, minutesStr, secsStr = timePieces
+  if len(yearStr) != 4 or not yearStr.isdigit():
+    return None
+  year = int(yearStr)
+  dayOfYear = parseASDfield(dayStr, 3, 1, 366)
+  hours = parseASDfield(hoursStr, 2, 0, 23)
+  minutes = parseASDfield(minutesStr, 2, 0, 59)
+  secs = parseASDfield(secsStr, 2, 0, 61)
+  if dayOfYear == None or hours == None or minutes == None or secs == None:
+    return None
+  # days since the epoch of the proleptic gregorian calendar
+  prevYear = year - 1
+  days = (prevYear * 365) + (prevYear / 4) - (prevYear / 100) + \
+         (prevYear / 400) - EPOCH_DAYS + dayOfYear
+  seconds = (days * SECONDS_OF_DAY) + (hours * 3600) + (minutes * 60) + secs
+  s_asdParseCache = (secondsStr, seconds)
+  return seconds
 # -----------------------------------------------------------------------------
 def getTimeFromASDstr(tmStr):
   """
   returns the absolute time from ASD format strings
   YYYY.DDD.hh.mm.ss.MMM or YYYY.DDD.hh.mm.ss.MMMMMM
   """
-  timePieces = tmStr.split(".")
-  if len(timePieces) != 6:
-    # invalid format
-    return 0.0
-  secondsStr = timePieces[0] + "." + timePieces[1] + "." + \
-               timePieces[2] + "." + timePieces[3] + "." + \
-               timePieces[4]
-  microMilliStr = timePieces[5]
+  secondsStr, sep, microMilliStr = tmStr.rpartition(".")
+  # the seconds part is memoized for the last second
+  cachedSecondsStr, seconds = s_asdParseCache
+  if secondsStr != cachedSecondsStr:
+    seconds = getSecondsFromASDstr(secondsStr)
+    if seconds == None:
+      # invalid format
+      return 0.0
   if len(microMilliStr) == 3:
     # milliseconds
-    seconds = float(microMilliStr) / 1000
-  elif len(microMilliStr) == 6:
+    return float(microMilliStr) / 1000 + seconds
+  if len(microMilliStr) == 6:
     # microseconds
-    seconds = float(microMilliStr) / 1000000
-  else:
-    # invalid format
-    return 0.0
-  try:
-    # force the tm_isdst to 0
-    tm = time.strptime(secondsStr, "%Y.%j.%H.%M.%S")[:-1] + (0,)
-    seconds += int(time.mktime(tm)) - time.timezone
-    return seconds
-  except:
-    # invalid format
-    return 0.0
+    return float(microMilliStr) / 1000000 + seconds
+  # invalid format
+  return 0.0
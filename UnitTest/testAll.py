@@ -15,7 +15,7 @@
 # Unit Tests                                                                  *
 #******************************************************************************
 import testDU, testNCTRSDU, testBCH, testCLTU, testCRC, testFRAME, testSEGMENT
-import testPACKET, testSPACE, testTIME
+import testPACKET, testSPACE, testTIME, testLINK
 
 #############
 # functions #
@@ -32,16 +32,42 @@ def testAll():
   """aggregation of unit tests"""
   if not testOne(testDU.test_DUoperations):
     return False
+  if not testOne(testDU.test_DUhexDump):
+    return False
+  if not testOne(testDU.test_DUcompiledAttributes):
+    return False
+  if not testOne(testDU.test_DUviews):
+    return False
+  if not testOne(testDU.test_DUfieldPlans):
+    return False
+  if not testOne(testDU.test_DUtimeOperations):
+    return False
   if not testOne(testNCTRSDU.test_NCTRS_DUoperations):
     return False
   if not testOne(testBCH.test_BCHoperations):
     return False
   if not testOne(testCLTU.test_CLTUoperations):
     return False
+  if not testOne(testCLTU.test_CLTUsynchroniser):
+    return False
+  if not testOne(testCLTU.test_CLTUcorrection):
+    return False
+  if not testOne(testCLTU.test_CLTUbatch):
+    return False
   if not testOne(testCRC.test_CRCoperation):
     return False
+  if not testOne(testCRC.test_CRCengines):
+    return False
+  if not testOne(testCRC.test_CRCpatcher):
+    return False
+  if not testOne(testCRC.test_CRCbatch):
+    return False
   if not testOne(testFRAME.test_FRAME_DUoperations):
     return False
+  if not testOne(testFRAME.test_FRAME_batchDecoding):
+    return False
+  if not testOne(testFRAME.test_FRAME_aosDUoperations):
+    return False
   if not testOne(testSEGMENT.test_SEGMENT_DUoperations):
     return False
   if not testOne(testPACKET.test_PACKET_DUoperations):
@@ -52,6 +78,32 @@ def testAll():
     return False
   if not testOne(testTIME.test_TIMEoperations):
     return False
+  if not testOne(testTIME.test_TIMEcodec):
+    return False
+  if not testOne(testTIME.test_TIMEarrays):
+    return False
+  if not testOne(testTIME.test_TIMEcorrelation):
+    return False
+  if not testOne(testTIME.test_TIMEclocks):
+    return False
+  if not testOne(testLINK.test_LINK_framePacking):
+    return False
+  if not testOne(testLINK.test_LINK_packetSegmentation):
+    return False
+  if not testOne(testLINK.test_LINK_frameRecycling):
+    return False
+  if not testOne(testLINK.test_LINK_vcMultiplexing):
+    return False
+  if not testOne(testLINK.test_LINK_frameDemultiplexing):
+    return False
+  if not testOne(testLINK.test_LINK_idleGeneration):
+    return False
+  if not testOne(testLINK.test_LINK_constantRate):
+    return False
+  if not testOne(testLINK.test_LINK_aosFrames):
+    return False
+  if not testOne(testLINK.test_LINK_delayLines):
+    return False
   return True
 
 ########
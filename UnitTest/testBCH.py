@@ -45,6 +45,36 @@ def test_BCHoperations():
   if code != testData.BCH_BLOCK_02[7]:
     print "BCH code wrong:", ("%02X" % code), "- should be", ("%02X" % testData.BCH_BLOCK_02[7])
     return False
+  code = UTIL.BCH.encodeCodeBlock(testData.BCH_BLOCK_01)
+  if code != testData.BCH_BLOCK_01[7]:
+    print "BCH code block 1 wrong:", ("%02X" % code), "- should be", ("%02X" % testData.BCH_BLOCK_01[7])
+    return False
+  code = UTIL.BCH.encodeCodeBlock([0] + testData.BCH_BLOCK_02, 1)
+  if code != testData.BCH_BLOCK_02[7]:
+    print "BCH code block 2 wrong:", ("%02X" % code), "- should be", ("%02X" % testData.BCH_BLOCK_02[7])
+    return False
+  # single bit errors are corrected at every bit position
+  for bytePos in range(0, UTIL.BCH.CODE_BLOCK_SIZE):
+    for bit in range(0, 8):
+      codeBlock = list(testData.BCH_BLOCK_01)
+      codeBlock[bytePos] ^= (0x80 >> bit)
+      result = UTIL.BCH.correctCodeBlock(codeBlock)
+      if bytePos == UTIL.BCH.CODE_BLOCK_SIZE - 1 and bit == 7:
+        # the filler bit is ignored
+        expectedResult = UTIL.BCH.CODE_BLOCK_OK
+      else:
+        expectedResult = UTIL.BCH.CODE_BLOCK_CORRECTED
+        if codeBlock != testData.BCH_BLOCK_01:
+          print "BCH correction wrong at byte", bytePos, "bit", bit
+          return False
+      if result != expectedResult:
+        print "BCH correction result wrong at byte", bytePos, "bit", bit
+        return False
+  codeBlock = list(testData.BCH_BLOCK_01)
+  codeBlock[0] ^= 0x81
+  if UTIL.BCH.correctCodeBlock(codeBlock) != UTIL.BCH.CODE_BLOCK_UNCORRECTABLE:
+    print "BCH double bit error not detected"
+    return False
   return True
 
 ########
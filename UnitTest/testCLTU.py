@@ -15,7 +15,7 @@
 # CCSDS Stack - Unit Tests                                                    *
 #******************************************************************************
 import array
-import CCSDS.CLTU, testData
+import CCSDS.CLTU, UTIL.BATCH, testData
 
 #############
 # functions #
@@ -57,6 +57,104 @@ def test_CLTUoperations():
     print "CLTU 2 encoding and decoding not symmetrical"
     return False
   return True
+# -----------------------------------------------------------------------------
+def test_CLTUsynchroniser():
+  """function to test the CLTU extraction from a byte stream"""
+  cltu1 = array.array("B", testData.CLTU_01)
+  cltu2 = array.array("B", testData.CLTU_02)
+  corruptedCltu = array.array("B", testData.CLTU_01)
+  corruptedCltu[20] ^= 0x01
+  # leading garbage, a start sequence with a corrupted code block,
+  # the CLTUs and a truncated start sequence at the end
+  stream = array.array("B", [0x00, 0xEB, 0x12, 0xEB]) + cltu1 + \
+           array.array("B", [0x55, 0xEB]) + corruptedCltu + cltu2 + \
+           array.array("B", [0xEB])
+  streamString = stream.tostring()
+  expectedFrames = [CCSDS.CLTU.decodeCltu(cltu1),
+                    CCSDS.CLTU.decodeCltu(cltu2)]
+  for chunkSize in [1, 3, 8, 13, len(streamString)]:
+    chunks = [streamString[i:i + chunkSize]
+              for i in range(0, len(streamString), chunkSize)]
+    synchroniser = CCSDS.CLTU.CltuSynchroniser()
+    frames = []
+    for chunk in chunks:
+      frames += synchroniser.pushData(chunk)
+    if frames != expectedFrames:
+      print "CLTU synchroniser failed for chunk size", chunkSize
+      return False
+    if synchroniser.cltuCounter != 2 or synchroniser.errorCounter != 1:
+      print "CLTU synchroniser counters wrong:", synchroniser.cltuCounter, synchroniser.errorCounter
+      return False
+    if len(synchroniser.buffer) > CCSDS.CLTU.CLTU_START_SEQUENCE_SIZE:
+      print "CLTU synchroniser keeps too many bytes:", len(synchroniser.buffer)
+      return False
+  frames = list(CCSDS.CLTU.extractCltuFrames([stream[:100], stream[100:]]))
+  if frames != expectedFrames:
+    print "CLTU frame extraction from chunks failed"
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def test_CLTUcorrection():
+  """function to test the single bit error correction"""
+  cltu = array.array("B", testData.CLTU_01)
+  expectedFrame = CCSDS.CLTU.decodeCltu(cltu)
+  # one bit error in 3 code blocks (netto byte, netto byte, check byte)
+  cltu[2] ^= 0x80
+  cltu[13] ^= 0x04
+  cltu[25] ^= 0x02
+  if CCSDS.CLTU.decodeCltu(cltu) != None:
+    print "corrupted CLTU not detected"
+    return False
+  frame, nrCorrected, nrUncorrectable = CCSDS.CLTU.decodeCltuCorrected(cltu)
+  if frame != expectedFrame or nrCorrected != 3 or nrUncorrectable != 0:
+    print "CLTU correction failed:", nrCorrected, nrUncorrectable
+    return False
+  if CCSDS.CLTU.decodeCltu(cltu, correctErrors=True) != expectedFrame:
+    print "CLTU decoding with correction failed"
+    return False
+  # the passed CLTU is not modified
+  if cltu[2] == testData.CLTU_01[2]:
+    print "CLTU correction modified the passed CLTU"
+    return False
+  # 2 bit errors in one code block are not correctable
+  cltu[3] ^= 0x01
+  frame, nrCorrected, nrUncorrectable = CCSDS.CLTU.decodeCltuCorrected(cltu)
+  if frame != None or nrCorrected != 2 or nrUncorrectable != 1:
+    print "uncorrectable CLTU not detected:", nrCorrected, nrUncorrectable
+    return False
+  # correction in the CLTU synchroniser
+  cltu[3] ^= 0x01
+  synchroniser = CCSDS.CLTU.CltuSynchroniser(correctErrors=True)
+  frames = synchroniser.pushData(cltu)
+  if frames != [expectedFrame] or synchroniser.correctedCounter != 3:
+    print "CLTU synchroniser correction failed"
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def test_CLTUbatch():
+  """function to test the batch CLTU encoding and decoding"""
+  if UTIL.BATCH.numpy == None:
+    print "NumPy not available, batch CLTU not tested"
+    return True
+  frames = UTIL.BATCH.numpy.array([testData.TC_FRAME_01] * 4,
+                                  dtype=UTIL.BATCH.numpy.uint8)
+  cltus = CCSDS.CLTU.encodeCltuBatch(frames)
+  for cltu in cltus:
+    if list(cltu) != testData.CLTU_01:
+      print "batch CLTU does not match the expected one"
+      return False
+  # corrupt a netto byte of the 2nd and the trailer of the 4th CLTU
+  cltus[1, 5] ^= 0x10
+  cltus[3, -1] ^= 0x01
+  frames2, valid = CCSDS.CLTU.decodeCltuBatch(cltus)
+  if list(valid) != [True, False, True, False]:
+    print "batch CLTU decoding validity wrong:", valid
+    return False
+  frameSize = len(testData.TC_FRAME_01)
+  if (frames2[0, :frameSize] != frames[0]).any():
+    print "batch CLTU encoding and decoding not symmetrical"
+    return False
+  return True
 
 ########
 # main #
@@ -65,3 +163,12 @@ if __name__ == "__main__":
   print "***** test_CLTUoperations() start"
   retVal = test_CLTUoperations()
   print "***** test_CLTUoperations() done:", retVal
+  print "***** test_CLTUsynchroniser() start"
+  retVal = test_CLTUsynchroniser()
+  print "***** test_CLTUsynchroniser() done:", retVal
+  print "***** test_CLTUcorrection() start"
+  retVal = test_CLTUcorrection()
+  print "***** test_CLTUcorrection() done:", retVal
+  print "***** test_CLTUbatch() start"
+  retVal = test_CLTUbatch()
+  print "***** test_CLTUbatch() done:", retVal
@@ -14,7 +14,7 @@
 #******************************************************************************
 # Unit Tests                                                                  *
 #******************************************************************************
-import UTIL.CRC, testData
+import UTIL.BATCH, UTIL.CRC, testData
 
 #############
 # functions #
@@ -40,6 +40,69 @@ def test_CRCoperation():
     return False
   print "CRC =", ("%04X" % crc), " ---> OK"
   return True
+# -----------------------------------------------------------------------------
+def test_CRCengines():
+  """function to test that all CRC engines give identical results"""
+  for data in [testData.TC_PACKET_01, testData.TC_FRAME_01, testData.TM_FRAME_01]:
+    expectedCrc = UTIL.CRC.calculateBitwise(data)
+    for engine in [UTIL.CRC.calculate,
+                   UTIL.CRC.calculateTable,
+                   UTIL.CRC.calculateSlicing8,
+                   UTIL.CRC.calculateBinascii]:
+      crc = engine(data)
+      if crc != expectedCrc:
+        print engine.__name__, ("%04X" % crc), "does not match the bitwise CRC: ", ("%04X" % expectedCrc)
+        return False
+    # incremental calculation in 3 parts
+    crcEngine = UTIL.CRC.CRCengine()
+    partSize = len(data) / 3
+    crcEngine.update(data[:partSize])
+    crcEngine.update(data[partSize:2*partSize])
+    crcEngine.update(data[2*partSize:])
+    if crcEngine.getCRC() != expectedCrc:
+      print "incremental CRC", ("%04X" % crcEngine.getCRC()), "does not match the bitwise CRC: ", ("%04X" % expectedCrc)
+      return False
+  print "CRC engine =", UTIL.CRC.CRC_BACKEND
+  return True
+# -----------------------------------------------------------------------------
+def test_CRCpatcher():
+  """function to test the CRC patching of changed words"""
+  data = bytearray(testData.TC_FRAME_01[:-2])
+  wordPositions = [0, 2, len(data) - 2]
+  crcPatcher = UTIL.CRC.CRCpatcher(data, wordPositions)
+  for words in [(0x0000, 0x0000, 0x0000),
+                (0xFFFF, 0x1234, 0x8001),
+                (0x5A5A, 0x0000, 0xFFFF)]:
+    for wordPos, word in zip(wordPositions, words):
+      data[wordPos] = word >> 8
+      data[wordPos + 1] = word & 0xFF
+    expectedCrc = UTIL.CRC.calculateBitwise(list(data))
+    crc = crcPatcher.getCRC(words)
+    if crc != expectedCrc:
+      print "patched CRC", ("%04X" % crc), "does not match the bitwise CRC: ", ("%04X" % expectedCrc)
+      return False
+  return True
+# -----------------------------------------------------------------------------
+def test_CRCbatch():
+  """function to test the batch CRC verification"""
+  if UTIL.BATCH.numpy == None:
+    print "NumPy not available, batch CRC not tested"
+    return True
+  # 8 copies of the frame, every odd frame is corrupted
+  frames = UTIL.BATCH.numpy.array([testData.TC_FRAME_01] * 8,
+                                  dtype=UTIL.BATCH.numpy.uint8)
+  frames[1::2, 3] ^= 0x01
+  crcs = UTIL.CRC.calculateBatch(frames[:, :-2])
+  for i in range(len(frames)):
+    expectedCrc = UTIL.CRC.calculateBitwise(list(frames[i, :-2]))
+    if crcs[i] != expectedCrc:
+      print "batch CRC", ("%04X" % crcs[i]), "does not match the bitwise CRC: ", ("%04X" % expectedCrc)
+      return False
+  valid = UTIL.CRC.checkBatch(frames)
+  if list(valid) != [True, False] * 4:
+    print "batch CRC check wrong:", valid
+    return False
+  return True
 
 ########
 # main #
@@ -48,3 +111,12 @@ if __name__ == "__main__":
   print "***** test_CRCoperation() start"
   retVal = test_CRCoperation()
   print "***** test_CRCoperation() done:", retVal
+  print "***** test_CRCengines() start"
+  retVal = test_CRCengines()
+  print "***** test_CRCengines() done:", retVal
+  print "***** test_CRCpatcher() start"
+  retVal = test_CRCpatcher()
+  print "***** test_CRCpatcher() done:", retVal
+  print "***** test_CRCbatch() start"
+  retVal = test_CRCbatch()
+  print "***** test_CRCbatch() done:", retVal
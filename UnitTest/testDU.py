@@ -14,8 +14,9 @@
 #******************************************************************************
 # Unit Tests                                                                  *
 #******************************************************************************
-import array
-import CCSDS.DU, CCSDS.TIME
+import array, StringIO
+import CCSDS.DU, CCSDS.FRAME, CCSDS.PACKET, CCSDS.TIME
+import GRND.NCTRSDU
 import UTIL.DU, UTIL.TCO, UTIL.TIME
 import testData
 
@@ -88,6 +89,244 @@ def test_DUtimeOperations():
     return False
   return True
 # -----------------------------------------------------------------------------
+def test_DUcompiledAttributes():
+  """function to test the compiled attribute accessors"""
+  compiledFrame = CCSDS.FRAME.TMframe(testData.TM_FRAME_01)
+  genericFrame = CCSDS.DU.DataUnit(testData.TM_FRAME_01,
+                                   CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_BYTE_SIZE,
+                                   CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_ATTRIBUTES)
+  for name in CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_ATTRIBUTES:
+    compiledValue = getattr(compiledFrame, name)
+    genericValue = getattr(genericFrame, name)
+    if compiledValue != genericValue:
+      print "compiled", name, "wrong:", compiledValue, "- should be", genericValue
+      return False
+  compiledPacket = CCSDS.PACKET.TMpacket("\0" * 16)
+  genericPacket = CCSDS.DU.DataUnit("\0" * 16,
+                                    CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE,
+                                    CCSDS.PACKET.PRIMARY_HEADER_ATTRIBUTES)
+  for value in [0, 1, 0x2A5, 0x3FF, 0x7FF]:
+    compiledPacket.applicationProcessId = value
+    genericPacket.applicationProcessId = value
+    compiledPacket.sequenceControlCount = value
+    genericPacket.sequenceControlCount = value
+    compiledPacket.packetLength = value
+    genericPacket.packetLength = value
+    if compiledPacket.getBufferString() != genericPacket.getBufferString():
+      print "compiled and generic setters differ:"
+      print "compiledPacket =", compiledPacket
+      print "genericPacket =", genericPacket
+      return False
+  try:
+    compiledPacket.applicationProcessId = 0x800
+    print "compiled setter accepted a value out of range"
+    return False
+  except ValueError:
+    pass
+  compiledPacket.setLen(4)
+  try:
+    compiledPacket.packetLength
+    print "compiled getter accepted an access out of buffer"
+    return False
+  except IndexError:
+    pass
+  # attributes that are not compiled cannot be written
+  try:
+    compiledPacket.serviceType = 1
+    print "compiled data unit accepted an unknown attribute"
+    return False
+  except AttributeError:
+    pass
+  # the compiled secondary header is only used if the frame has one
+  compiledFrame = CCSDS.FRAME.TMframe(testData.TM_FRAME_01, True)
+  genericFrame = CCSDS.DU.DataUnit(testData.TM_FRAME_01,
+                                   CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_BYTE_SIZE,
+                                   CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_ATTRIBUTES,
+                                   CCSDS.FRAME.TM_FRAME_SECONDARY_HEADER_BYTE_SIZE,
+                                   CCSDS.FRAME.TM_FRAME_SECONDARY_HEADER_ATTRIBUTES)
+  compiledFrame.virtualChannelFCountHigh = 0x123456
+  genericFrame.virtualChannelFCountHigh = 0x123456
+  for name in CCSDS.FRAME.TM_FRAME_SECONDARY_HEADER_ATTRIBUTES:
+    compiledValue = getattr(compiledFrame, name)
+    genericValue = getattr(genericFrame, name)
+    if compiledValue != genericValue:
+      print "compiled", name, "wrong:", compiledValue, "- should be", genericValue
+      return False
+  compiledFrame = CCSDS.FRAME.TMframe(testData.TM_FRAME_01)
+  try:
+    compiledFrame.secondaryHeaderSize
+    print "secondary header of a frame without secondary header read"
+    return False
+  except AttributeError:
+    pass
+  try:
+    compiledFrame.secondaryHeaderSize = 3
+    print "secondary header of a frame without secondary header written"
+    return False
+  except AttributeError:
+    pass
+  return True
+# -----------------------------------------------------------------------------
+def test_DUviews():
+  """function to test data units that are views on a bytearray buffer"""
+  # NCTRS DU --> frame --> packet, all sharing the same bytearray
+  frameSize = len(testData.TM_FRAME_01)
+  tmDu = GRND.NCTRSDU.TMdataUnit(
+    bytearray(GRND.NCTRSDU.TM_DU_HEADER_BYTE_SIZE))
+  tmDu.setFrame(testData.TM_FRAME_01)
+  tmFrame = CCSDS.FRAME.TMframe(
+    tmDu.getBufferView(GRND.NCTRSDU.TM_DU_HEADER_BYTE_SIZE, frameSize))
+  if tmFrame.getBufferString() != array.array("B", testData.TM_FRAME_01).tostring():
+    print "frame view contents wrong:", tmFrame
+    return False
+  packetPos = CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_BYTE_SIZE + \
+              tmFrame.firstHeaderPointer
+  tmPacket = CCSDS.PACKET.TMpacket(
+    tmFrame.getBufferView(packetPos, CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE))
+  tmPacket.applicationProcessId = 0x123
+  tmPacket.sequenceControlCount = 0x2345
+  duPacketPos = GRND.NCTRSDU.TM_DU_HEADER_BYTE_SIZE + packetPos
+  referencePacket = CCSDS.PACKET.TMpacket(
+    tmDu.getBytes(duPacketPos, CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE))
+  if referencePacket.applicationProcessId != 0x123 or \
+     referencePacket.sequenceControlCount != 0x2345:
+    print "packet view not written into the NCTRS DU:", referencePacket
+    return False
+  tmFrame.setChecksum()
+  if not tmFrame.checkChecksum():
+    print "frame view checksum wrong"
+    return False
+  # the memoryview covers exactly the used buffer elements
+  memView = tmDu.getMemoryView()
+  if memView.tobytes() != tmDu.getBufferString():
+    print "memoryview wrong"
+    return False
+  del memView
+  try:
+    tmFrame.setLen(frameSize + 1)
+    print "frame view was enlarged"
+    return False
+  except IndexError:
+    pass
+  return True
+# -----------------------------------------------------------------------------
+def test_DUfieldPlans():
+  """function to test the bulk access to data unit attributes"""
+  tmFrame = CCSDS.FRAME.TMframe(testData.TM_FRAME_01)
+  frameFields = tmFrame.decode()
+  for name in CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_ATTRIBUTES:
+    if frameFields[name] != getattr(tmFrame, name):
+      print "decode", name, "wrong:", frameFields[name], "- should be", getattr(tmFrame, name)
+      return False
+  fieldValues = {"spacecraftId": 0x2A5,
+                 "virtualChannelId": 5,
+                 "masterChannelFrameCount": 0xAB,
+                 "firstHeaderPointer": 0x7FE}
+  bulkFrame = CCSDS.FRAME.TMframe(testData.TM_FRAME_01)
+  bulkFrame.setFields(fieldValues)
+  for name, value in fieldValues.iteritems():
+    setattr(tmFrame, name, value)
+  if bulkFrame != tmFrame:
+    print "setFields wrong:", bulkFrame
+    return False
+  if bulkFrame.getFields(["virtualChannelId", "firstHeaderPointer"]) != \
+     {"virtualChannelId": 5, "firstHeaderPointer": 0x7FE}:
+    print "getFields wrong:", bulkFrame
+    return False
+  # validation happens before the buffer is modified
+  try:
+    bulkFrame.setFields({"virtualChannelId": 2, "spacecraftId": 0x400})
+    print "setFields accepted a value out of range"
+    return False
+  except ValueError:
+    pass
+  if bulkFrame.virtualChannelId != 5:
+    print "setFields modified the buffer before the validation"
+    return False
+  try:
+    bulkFrame.setFields({"unknownAttribute": 0})
+    print "setFields accepted an unknown attribute"
+    return False
+  except AttributeError:
+    pass
+  # negative values are delegated to the generic setters
+  tmPacket = CCSDS.PACKET.TMpacket("\0" * 6)
+  tmPacket.setFields({"applicationProcessId": 0x123, "packetLength": -1})
+  if tmPacket.applicationProcessId != 0x123 or \
+     tmPacket.packetLength != 0xFFFF:
+    print "setFields on packet wrong:", tmPacket
+    return False
+  # mixed integer, BYTES and TIME attributes
+  responseFields = {"time": 1234567890.123456,
+                    "serviceType": 2,
+                    "sequenceCounter": 0x12345678,
+                    "lastCLCW": "\x01\x02\x03\x04"}
+  bulkResponse = GRND.NCTRSDU.TCpacketResponseDataUnit()
+  bulkResponse.setFields(responseFields)
+  response = GRND.NCTRSDU.TCpacketResponseDataUnit()
+  for name, value in responseFields.iteritems():
+    setattr(response, name, value)
+  if bulkResponse != response:
+    print "setFields with mixed attributes wrong:", bulkResponse
+    return False
+  # a single invalid value leaves the buffer unchanged
+  shortTMdu = GRND.NCTRSDU.TMdataUnit("\0" * 12)
+  for dataUnit, fieldValues in [
+    (bulkResponse, {"serviceType": 3, "time": -1.0}),
+    (bulkResponse, {"sequenceCounter": 5, "lastCLCW": "\x01\x02\x03\x04\x05"}),
+    (bulkResponse, {"acknowledgement": 1, "time": "now"}),
+    (bulkFrame, {"virtualChannelId": 3, "spacecraftId": -1}),
+    (bulkFrame, {"virtualChannelId": 3, "spacecraftId": "high"}),
+    (shortTMdu, {"spacecraftId": 1, "qualityFlag": 1})]:
+    oldBuffer = dataUnit.getBufferString()
+    try:
+      dataUnit.setFields(fieldValues)
+      print "setFields accepted", fieldValues
+      return False
+    except (ValueError, IndexError, TypeError):
+      pass
+    if dataUnit.getBufferString() != oldBuffer:
+      print "setFields modified the buffer for", fieldValues
+      return False
+  # attributes that fit into a short buffer
+  shortTMdu.setFields({"spacecraftId": 1, "dataStreamType": 2})
+  if shortTMdu.spacecraftId != 1 or shortTMdu.dataStreamType != 2:
+    print "setFields on short data unit wrong:", shortTMdu
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def test_DUhexDump():
+  """function to test the hex dump and hex parse utilities"""
+  data = "Hello, world!\x00\xff\x7f\x20\x1f\x80"
+  expected = "\n0000 48 65 6C 6C 6F 2C 20 77 6F 72 6C 64 21 00 FF 7F Hello, world!..." + \
+             "\n0010 20 1F 80                                         .."
+  h = UTIL.DU.array2str(data)
+  if h != expected:
+    print "array2str wrong:", h
+    return False
+  stream = StringIO.StringIO()
+  UTIL.DU.writeHexDump(stream, array.array("B", data))
+  if stream.getvalue() != expected:
+    print "writeHexDump wrong:", stream.getvalue()
+    return False
+  if UTIL.DU.array2str(data, 3) != "\n0000 48 65 6C                                        Hel":
+    print "array2str with maxLen wrong:", UTIL.DU.array2str(data, 3)
+    return False
+  if UTIL.DU.array2str("") != "EMPTY":
+    print "array2str of empty data wrong"
+    return False
+  if UTIL.DU.str2array(data.encode("hex"), True).tostring() != data:
+    print "str2array without spaces wrong"
+    return False
+  if UTIL.DU.str2array("F 0x1F 20") != array.array("B", [15, 31, 32]):
+    print "str2array with single digits wrong"
+    return False
+  # mixed token widths with an even number of digits
+  if UTIL.DU.str2array("012 3") != array.array("B", [0x12, 0x03]):
+    print "str2array with mixed token widths wrong:", UTIL.DU.str2array("012 3")
+    return False
+  return True
+# -----------------------------------------------------------------------------
 def test_DUoperations():
   """function to test the data unit operations"""
   b = UTIL.DU.BinaryUnit()
@@ -139,7 +378,7 @@ def test_DUoperations():
   print 'str2array("0001FFFE6412", True) =', a
   h = UTIL.DU.array2str(a)
   print "array2str([0, 1, 255, 254, 100, 18]) =", h
-  return test_DUtimeOperations()
+  return True
 
 ########
 # main #
@@ -148,3 +387,18 @@ if __name__ == "__main__":
   print "***** test_DUoperations() start"
   retVal = test_DUoperations()
   print "***** test_DUoperations() done:", retVal
+  print "***** test_DUhexDump() start"
+  retVal = test_DUhexDump()
+  print "***** test_DUhexDump() done:", retVal
+  print "***** test_DUcompiledAttributes() start"
+  retVal = test_DUcompiledAttributes()
+  print "***** test_DUcompiledAttributes() done:", retVal
+  print "***** test_DUviews() start"
+  retVal = test_DUviews()
+  print "***** test_DUviews() done:", retVal
+  print "***** test_DUfieldPlans() start"
+  retVal = test_DUfieldPlans()
+  print "***** test_DUfieldPlans() done:", retVal
+  print "***** test_DUtimeOperations() start"
+  retVal = test_DUtimeOperations()
+  print "***** test_DUtimeOperations() done:", retVal
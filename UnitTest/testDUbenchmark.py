@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+#******************************************************************************
+# (C) 2017, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under the terms of the GNU Lesser General Public License as       *
+# published by the Free Software Foundation; either version 2.1 of the        *
+# License, or (at your option) any later version.                             *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser     *
+# General Public License for more details.                                    *
+#******************************************************************************
+# Unit Tests - performance of the compiled data unit attributes               *
+# usage: testDUbenchmark.py [nrAccesses]                                      *
+#******************************************************************************
+import sys, time
+import CCSDS.DU, CCSDS.FRAME, CCSDS.PACKET
+import GRND.NCTRSDU
+
+#############
+# functions #
+#############
+def measureStatement(dataUnit, statement, nrAccesses):
+  """
+  returns the duration of the statement in microseconds, the statement
+  accesses the attribute of the data unit p directly (e.g. p.packetType)
+  """
+  # the loop is generated to avoid getattr() / setattr() in the measurement
+  namespace = {}
+  exec ("def loop(p, accesses):\n" +
+        "  for i in accesses:\n" +
+        "    " + statement + "\n") in namespace
+  loop = namespace["loop"]
+  startTime = time.time()
+  loop(dataUnit, xrange(nrAccesses))
+  return (time.time() - startTime) * 1000000.0 / nrAccesses
+# -----------------------------------------------------------------------------
+def measureReads(dataUnit, names, nrAccesses):
+  """returns the average duration of one attribute read in microseconds"""
+  durations = [measureStatement(dataUnit, "p." + name, nrAccesses)
+               for name in names]
+  return sum(durations) / len(durations)
+# -----------------------------------------------------------------------------
+def measureWrites(dataUnit, names, nrAccesses):
+  """returns the average duration of one attribute write in microseconds"""
+  durations = [measureStatement(dataUnit, "p." + name + " = 1", nrAccesses)
+               for name in names]
+  return sum(durations) / len(durations)
+# -----------------------------------------------------------------------------
+def compareDataUnits(label, genericDU, compiledDU, attributeMap, nrAccesses):
+  """compares the generic with the compiled attribute access"""
+  names = sorted(attributeMap.keys())
+  genericDuration = measureReads(genericDU, names, nrAccesses)
+  compiledDuration = measureReads(compiledDU, names, nrAccesses)
+  print "%-14s read:  generic = %.3f us, compiled = %.3f us, factor = %.1f" % \
+    (label, genericDuration, compiledDuration,
+     genericDuration / compiledDuration)
+  genericDuration = measureWrites(genericDU, names, nrAccesses)
+  compiledDuration = measureWrites(compiledDU, names, nrAccesses)
+  print "%-14s write: generic = %.3f us, compiled = %.3f us, factor = %.1f" % \
+    (label, genericDuration, compiledDuration,
+     genericDuration / compiledDuration)
+  if genericDU.getBufferString() != compiledDU.getBufferString():
+    print label, "generic and compiled attributes differ"
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def test_DUbenchmark(nrAccesses=100000):
+  """function to compare the compiled with the generic attribute access"""
+  # an empty property is the lower bound of a compiled attribute access
+  class EmptyProperty(object):
+    __slots__ = ()
+    value = property(lambda self: 0)
+  emptyDuration = measureStatement(EmptyProperty(), "p.value", nrAccesses)
+  print "empty property read = %.3f us" % emptyDuration
+  binaryString = "\0" * 16
+  if not compareDataUnits("TM packet",
+    CCSDS.DU.DataUnit(binaryString,
+                      CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE,
+                      CCSDS.PACKET.PRIMARY_HEADER_ATTRIBUTES),
+    CCSDS.PACKET.TMpacket(binaryString),
+    CCSDS.PACKET.PRIMARY_HEADER_ATTRIBUTES,
+    nrAccesses):
+    return False
+  if not compareDataUnits("TM frame",
+    CCSDS.DU.DataUnit(binaryString,
+                      CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_BYTE_SIZE,
+                      CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_ATTRIBUTES),
+    CCSDS.FRAME.TMframe(binaryString),
+    CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_ATTRIBUTES,
+    nrAccesses):
+    return False
+  binaryString = "\0" * 32
+  if not compareDataUnits("NCTRS TM DU",
+    CCSDS.DU.DataUnit(binaryString,
+                      GRND.NCTRSDU.TM_DU_HEADER_BYTE_SIZE,
+                      GRND.NCTRSDU.TM_DU_ATTRIBUTES),
+    GRND.NCTRSDU.TMdataUnit(binaryString),
+    GRND.NCTRSDU.TM_DU_ATTRIBUTES,
+    nrAccesses):
+    return False
+  return True
+
+########
+# main #
+########
+if __name__ == "__main__":
+  nrAccesses = 100000
+  if len(sys.argv) > 1:
+    nrAccesses = int(sys.argv[1])
+  print "***** test_DUbenchmark() start"
+  retVal = test_DUbenchmark(nrAccesses)
+  print "***** test_DUbenchmark() done:", retVal
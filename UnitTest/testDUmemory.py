@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+#******************************************************************************
+# (C) 2017, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under the terms of the GNU Lesser General Public License as       *
+# published by the Free Software Foundation; either version 2.1 of the        *
+# License, or (at your option) any later version.                             *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser     *
+# General Public License for more details.                                    *
+#******************************************************************************
+# Unit Tests - memory usage of queued packets                                 *
+# usage: testDUmemory.py [nrPackets]                                          *
+#******************************************************************************
+import gc, resource, sys
+import CCSDS.PACKET, UTIL.DU
+
+#############
+# functions #
+#############
+def getMaxRSS():
+  """returns the peak resident set size of the process in bytes"""
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+# -----------------------------------------------------------------------------
+def test_DUmemory(nrPackets=1000000, packetSize=64):
+  """function to measure the memory of queued packets"""
+  packetData = "\0" * packetSize
+  packet = CCSDS.PACKET.TMpacket(packetData)
+  if hasattr(packet, "__dict__"):
+    print "TMpacket has a per-instance __dict__"
+    return False
+  objectSize = sys.getsizeof(packet)
+  bufferSize = sys.getsizeof(packet.buffer)
+  # the dictionary that held the bookkeeping attributes before
+  dictSize = sys.getsizeof(dict.fromkeys(UTIL.DU.BinaryUnit.__slots__))
+  print "packet object size =", objectSize
+  print "packet buffer size =", bufferSize
+  print "saved __dict__ size =", dictSize
+  gc.collect()
+  startRSS = getMaxRSS()
+  queue = [CCSDS.PACKET.TMpacket(packetData) for i in xrange(nrPackets)]
+  endRSS = getMaxRSS()
+  print "queued packets =", len(queue)
+  print "memory per packet =", (endRSS - startRSS) / nrPackets
+  print "overhead per packet =", (endRSS - startRSS) / nrPackets - packetSize
+  return True
+
+########
+# main #
+########
+if __name__ == "__main__":
+  nrPackets = 1000000
+  if len(sys.argv) > 1:
+    nrPackets = int(sys.argv[1])
+  print "***** test_DUmemory() start"
+  retVal = test_DUmemory(nrPackets)
+  print "***** test_DUmemory() done:", retVal
@@ -14,7 +14,7 @@
 #******************************************************************************
 # CCSDS Stack - Unit Tests                                                    *
 #******************************************************************************
-import CCSDS.FRAME, testData
+import CCSDS.FRAME, CCSDS.PACKET, UTIL.BATCH, testData
 
 #############
 # functions #
@@ -83,6 +83,78 @@ def test_FRAME_DUoperations():
   clcw = CCSDS.FRAME.CLCW()
   print "clcw =", clcw
   return True
+# -----------------------------------------------------------------------------
+def test_FRAME_batchDecoding():
+  """function to test the batch decoding of TM frame headers"""
+  if UTIL.BATCH.numpy == None:
+    print "NumPy not available, batch decoding not tested"
+    return True
+  # frames with different counters and first header pointers
+  frames = []
+  firstHeaderPointers = [0, 5, 100, CCSDS.FRAME.FHP_IDLE_FRAME]
+  for i in range(8):
+    tmFrame = CCSDS.FRAME.TMframe(testData.TM_FRAME_01)
+    tmFrame.virtualChannelId = i % 8
+    tmFrame.masterChannelFrameCount = (i * 37) & 0xFF
+    tmFrame.virtualChannelFCountLow = (i * 11) & 0xFF
+    tmFrame.firstHeaderPointer = firstHeaderPointers[i % 4]
+    frames.append(tmFrame)
+  frameSize = len(frames[0])
+  binaryString = "".join([tmFrame.getBufferString() for tmFrame in frames])
+  frameArray = UTIL.BATCH.createDataUnitArray(binaryString, frameSize)
+  columns = CCSDS.FRAME.decodeTMframeHeaders(frameArray)
+  for name in CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_ATTRIBUTES:
+    for i, tmFrame in enumerate(frames):
+      if columns[name][i] != getattr(tmFrame, name):
+        print "batch", name, "wrong:", columns[name][i], "- should be", getattr(tmFrame, name)
+        return False
+  valid, columns = CCSDS.FRAME.decodeFirstPacketHeaders(frameArray)
+  for i, tmFrame in enumerate(frames):
+    firstHeaderPointer = tmFrame.firstHeaderPointer
+    if valid[i] != (firstHeaderPointer != CCSDS.FRAME.FHP_IDLE_FRAME):
+      print "batch valid wrong for frame", i
+      return False
+    if not valid[i]:
+      continue
+    packetPos = CCSDS.FRAME.TM_FRAME_PRIMARY_HEADER_BYTE_SIZE + \
+                firstHeaderPointer
+    packetHeader = CCSDS.PACKET.Packet(
+      tmFrame.getBytes(packetPos, CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE))
+    for name in CCSDS.PACKET.PRIMARY_HEADER_ATTRIBUTES:
+      if columns[name][i] != getattr(packetHeader, name):
+        print "batch packet", name, "wrong:", columns[name][i], "- should be", getattr(packetHeader, name)
+        return False
+  return True
+# -----------------------------------------------------------------------------
+def test_FRAME_aosDUoperations():
+  """function to test the AOS frame and M_PDU data units"""
+  aosFrame = CCSDS.FRAME.AOSframe()
+  if aosFrame.versionNumber != CCSDS.FRAME.AOS_VERSION_NUMBER:
+    print "aosFrame versionNumber wrong:", aosFrame.versionNumber
+    return False
+  aosFrame.spacecraftId = 0xAB
+  aosFrame.virtualChannelId = 0x2A
+  aosFrame.virtualChannelFrameCount = 0x123456
+  aosFrame.replayFlag = 1
+  aosFrame.vcFrameCountCycle = 0x5
+  if aosFrame.getBufferString() != "\x6A\xEA\x12\x34\x56\x85":
+    print "aosFrame header wrong:", aosFrame.getBufferString().encode("hex")
+    return False
+  # 2 bytes insert zone, M_PDU with 4 bytes packet zone, 6 bytes trailer
+  aosFrame.append("\xAA\xBB" + "\x00\x00" + "\x01\x02\x03\x04" + "\0" * 6)
+  mpdu = aosFrame.getMPDU(2, 6)
+  mpdu.firstHeaderPointer = 0x7FE
+  if aosFrame.getBytes(8, 2) != "\x07\xFE" or \
+     mpdu.getPacketZone() != "\x01\x02\x03\x04":
+    print "M_PDU wrong:", aosFrame.getBufferString().encode("hex")
+    return False
+  copiedFrame = CCSDS.FRAME.AOSframe(aosFrame.getBufferString())
+  if copiedFrame.virtualChannelFrameCount != 0x123456 or \
+     copiedFrame.vcFrameCountUsageFlag != 0 or \
+     copiedFrame.getMPDU(2, 6).firstHeaderPointer != 0x7FE:
+    print "copied aosFrame wrong"
+    return False
+  return True
 
 ########
 # main #
@@ -91,4 +163,9 @@ if __name__ == "__main__":
   print "***** test_FRAME_DUoperations() start"
   retVal = test_FRAME_DUoperations()
   print "***** test_FRAME_DUoperations() done:", retVal
-
+  print "***** test_FRAME_batchDecoding() start"
+  retVal = test_FRAME_batchDecoding()
+  print "***** test_FRAME_batchDecoding() done:", retVal
+  print "***** test_FRAME_aosDUoperations() start"
+  retVal = test_FRAME_aosDUoperations()
+  print "***** test_FRAME_aosDUoperations() done:", retVal
@@ -0,0 +1,910 @@
+#!/usr/bin/env python
+#******************************************************************************
+# (C) 2017, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under the terms of the GNU Lesser General Public License as       *
+# published by the Free Software Foundation; either version 2.1 of the        *
+# License, or (at your option) any later version.                             *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser     *
+# General Public License for more details.                                    *
+#******************************************************************************
+# Link Simulation - Unit Tests                                                *
+#******************************************************************************
+import UTIL.SYS
+UTIL.SYS.s_configuration.setDefaults([["TM_TT_TIME_BYTE_OFFSET", "0"]])
+import CCSDS.DEMUX, CCSDS.FRAME, CCSDS.PACKET
+import GRND.IF, GRND.NCTRS, GRND.NCTRSDU
+import LINK.IF, LINK.RATE, LINK.TMGEN, LINK.TMTC, LINK.VCMUX
+import SCOS.ENV
+import SPACE.IF, SPACE.TMGEN
+import UTIL.TASK, UTIL.TIME
+
+###########
+# classes #
+###########
+# =============================================================================
+class LinkTestTask(UTIL.TASK.ProcessingTask):
+  """processing task without GUI, the timers are executed by runTimers"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    """Initialise the Task as processing model"""
+    UTIL.TASK.ProcessingTask.__init__(self, isParent=True)
+  # ---------------------------------------------------------------------------
+  def notifyGUItask(self, status):
+    """no GUI"""
+    pass
+
+# =============================================================================
+class GroundLinkRecorder(GRND.IF.TMmcsLink):
+  """records the received TM frames with their reception time"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    """Initialise attributes only"""
+    self.receivedFrames = []
+  # ---------------------------------------------------------------------------
+  def pushTMframe(self, tmFrameDu, ertUTC):
+    """the frame is copied, the buffer is recycled by the space link"""
+    self.receivedFrames.append((UTIL.TIME.getActualTime(),
+                                CCSDS.FRAME.TMframe(tmFrameDu.getBufferString())))
+
+# =============================================================================
+class NCTRSpacketRecorder(GRND.NCTRS.TMpacketReceiver):
+  """records the TM packets that are extracted from NCTRS TM data units"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    """Initialise attributes only"""
+    GRND.NCTRS.TMpacketReceiver.__init__(self)
+    self.apidPackets = {}
+    self.earthReceptionTimes = []
+  # ---------------------------------------------------------------------------
+  def notifyTMpacket(self, tmPacket, earthReceptionTime):
+    """TM packet received"""
+    self.apidPackets.setdefault(tmPacket.applicationProcessId, []).append(
+      tmPacket)
+    self.earthReceptionTimes.append(earthReceptionTime)
+
+#############
+# functions #
+#############
+def createTMpacket(packetSize, applicationProcessId, sequenceControlCount):
+  """creates a CCSDS TM packet with a CRC"""
+  tmPacket = CCSDS.PACKET.TMpacket("\0" * packetSize)
+  tmPacket.applicationProcessId = applicationProcessId
+  tmPacket.sequenceControlCount = sequenceControlCount
+  tmPacket.setPacketLength()
+  tmPacket.setChecksum()
+  return tmPacket
+# -----------------------------------------------------------------------------
+def getFrameStreamPackets(tmFrames, dataFieldPos, dataFieldEndPos):
+  """
+  returns the TM packets (including idle packets) of consecutive TM frames,
+  checks the firstHeaderPointer of each frame
+  """
+  dataFieldSize = dataFieldEndPos - dataFieldPos
+  dataStream = "".join([tmFrame.getBufferString()[dataFieldPos:dataFieldEndPos]
+                        for tmFrame in tmFrames])
+  packets = []
+  packetStarts = set()
+  bytePos = 0
+  while bytePos < len(dataStream):
+    packetStarts.add(bytePos)
+    packetHeader = CCSDS.PACKET.TMpacket(
+      dataStream[bytePos:bytePos + CCSDS.PACKET.PRIMARY_HEADER_BYTE_SIZE])
+    packetSize = packetHeader.packetLength + 7
+    packets.append(CCSDS.PACKET.TMpacket(
+      dataStream[bytePos:bytePos + packetSize]))
+    bytePos += packetSize
+  if bytePos != len(dataStream):
+    print "packets do not end at the frame data field end"
+    return None
+  for frameNr, tmFrame in enumerate(tmFrames):
+    frameStartPos = frameNr * dataFieldSize
+    firstHeaderPointer = CCSDS.FRAME.FHP_NO_PACKET_START
+    for i in xrange(dataFieldSize):
+      if frameStartPos + i in packetStarts:
+        firstHeaderPointer = i
+        break
+    if tmFrame.firstHeaderPointer != firstHeaderPointer:
+      print "invalid firstHeaderPointer", tmFrame.firstHeaderPointer, \
+            "in frame", frameNr, "- should be", firstHeaderPointer
+      return None
+  return packets
+# -----------------------------------------------------------------------------
+def checkFrameStream(tmFrames, packetSizes):
+  """checks TM frames that are packed with the packetSizes"""
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  dataFieldPos = tmFrameGenerator.getDataFieldPos()
+  dataFieldEndPos = tmFrameGenerator.getDataFieldEndPos()
+  idleAPID = SPACE.IF.s_tmPacketGenerator.packetDefaults.idlePacketAPID
+  for frameNr, tmFrame in enumerate(tmFrames):
+    if len(tmFrame) != tmFrameGenerator.frameDefaults.transferFrameSize:
+      print "invalid frame size", len(tmFrame)
+      return False
+    if CCSDS.FRAME.CRC_CHECK and not tmFrame.checkChecksum():
+      print "invalid frame CRC in frame", frameNr
+      return False
+    if tmFrame.virtualChannelFCountLow != \
+       (tmFrames[0].virtualChannelFCountLow + frameNr) % 256:
+      print "invalid frame counter", tmFrame.virtualChannelFCountLow
+      return False
+  packets = getFrameStreamPackets(tmFrames, dataFieldPos, dataFieldEndPos)
+  if packets == None:
+    return False
+  # extract the packets again and check the sequence counters
+  nrPackets = 0
+  for packet in packets:
+    if packet.applicationProcessId == idleAPID:
+      continue
+    if packet.sequenceControlCount != nrPackets or \
+       len(packet) != packetSizes[nrPackets]:
+      print "packet", nrPackets, "wrongly packed"
+      return False
+    if not packet.checkChecksum():
+      print "packet", nrPackets, "has an invalid CRC"
+      return False
+    nrPackets += 1
+  if nrPackets != len(packetSizes):
+    print "packets lost:", len(packetSizes) - nrPackets
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def packFrames(packetSizes, flushPeriod=0):
+  """packs TM packets into TM frames with a flush after flushPeriod packets"""
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  tmFrames = []
+  for i, packetSize in enumerate(packetSizes):
+    tmPacket = createTMpacket(packetSize, 100 + (i % 4), i)
+    tmFrames += tmFrameGenerator.packTMpacket(tmPacket)
+    if flushPeriod > 0 and (i + 1) % flushPeriod == 0:
+      # latency expired ---> flush
+      tmFrame = tmFrameGenerator.flushTMframe()
+      if tmFrame != None:
+        tmFrames.append(tmFrame)
+  # final flush, includes the rest of a segmented idle packet
+  while tmFrameGenerator.isTMframePending():
+    tmFrames.append(tmFrameGenerator.flushTMframe())
+  return tmFrames
+# -----------------------------------------------------------------------------
+def test_LINK_framePacking():
+  """function to test the packing of multiple TM packets into TM frames"""
+  SPACE.TMGEN.init()
+  LINK.TMGEN.init()
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  dataFieldSize = tmFrameGenerator.getDataFieldEndPos() - \
+                  tmFrameGenerator.getDataFieldPos()
+  # typical housekeeping packet sizes
+  packetSizes = [64, 128, 40, 256, 96, 200, 48, 512, 72, 100] * 20
+  tmFrames = packFrames(packetSizes, flushPeriod=50)
+  if not checkFrameStream(tmFrames, packetSizes):
+    return False
+  if tmFrameGenerator.flushTMframe() != None:
+    print "flushTMframe without pending frame shall return None"
+    return False
+  packetsPerFrame = float(len(packetSizes)) / len(tmFrames)
+  print "packed", len(packetSizes), "packets into", len(tmFrames), "frames,", \
+        "%.1f packets per frame" % packetsPerFrame
+  # an exactly fitting packet completes the frame without idle packet
+  tmPacket = createTMpacket(dataFieldSize, 100, 0)
+  tmFrames = tmFrameGenerator.packTMpacket(tmPacket)
+  if len(tmFrames) != 1 or tmFrameGenerator.isTMframePending():
+    print "full frame not completed"
+    return False
+  # a remaining space that is too small for an idle packet
+  # continues the idle packet in a pending frame
+  packetSizes = [dataFieldSize - 3]
+  tmFrames = packFrames(packetSizes, flushPeriod=1)
+  if len(tmFrames) != 2 or \
+     tmFrames[1].firstHeaderPointer != \
+     LINK.TMGEN.IDLE_PACKET_MIN_SIZE - 3:
+    print "too small idle space not handled"
+    return False
+  if not checkFrameStream(tmFrames, packetSizes):
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_packetSegmentation():
+  """function to test TM packets that are segmented over TM frames"""
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  dataFieldSize = tmFrameGenerator.getDataFieldEndPos() - \
+                  tmFrameGenerator.getDataFieldPos()
+  # large packets, mixed with small packets
+  packetSizes = [4000, 64, dataFieldSize * 2, 100, 3 * dataFieldSize + 17,
+                 dataFieldSize - 1, 8, 65542, 200]
+  tmFrames = packFrames(packetSizes, flushPeriod=4)
+  if not checkFrameStream(tmFrames, packetSizes):
+    return False
+  nrNoPacketStart = 0
+  for tmFrame in tmFrames:
+    if tmFrame.firstHeaderPointer == CCSDS.FRAME.FHP_NO_PACKET_START:
+      nrNoPacketStart += 1
+  if nrNoPacketStart == 0:
+    print "no frames without packet start"
+    return False
+  print "segmented", len(packetSizes), "packets into", len(tmFrames), \
+        "frames,", nrNoPacketStart, "frames without packet start"
+  # the old generator interface still rejects packets that do not fit
+  tmPacket = createTMpacket(dataFieldSize + 1, 100, 0)
+  try:
+    tmFrameGenerator.getTMframe(tmPacket)
+    print "oversize packet not rejected by getTMframe"
+    return False
+  except UTIL.SYS.Error:
+    pass
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_frameRecycling():
+  """function to test the reuse of recycled TM frames"""
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  packetSizes = [64, 2000, 40, 256, 96, 200, 48, 512, 72, 100] * 5
+  tmFrames = packFrames(packetSizes, flushPeriod=7)
+  frameIds = set()
+  for tmFrame in tmFrames:
+    frameIds.add(id(tmFrame))
+    tmFrameGenerator.recycleTMframe(tmFrame)
+  # the recycled frames must be completely overwritten
+  tmFrames = packFrames(packetSizes, flushPeriod=3)
+  if not checkFrameStream(tmFrames, packetSizes):
+    return False
+  nrReusedFrames = 0
+  for tmFrame in tmFrames:
+    if id(tmFrame) in frameIds:
+      nrReusedFrames += 1
+  if nrReusedFrames != min(len(frameIds), len(tmFrames)):
+    print "recycled frames not reused:", nrReusedFrames
+    return False
+  # frames with another size are not reused
+  tmFrameGenerator.recycleTMframe(CCSDS.FRAME.TMframe(bytearray(100)))
+  if len(tmFrameGenerator.framePool) != 0:
+    print "frame with wrong size recycled"
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def multiplexFrames(vcMultiplexer, packetSizes, apids):
+  """
+  pushes TM packets without packing latency through the VC multiplexer,
+  returns the sent frames and the packet sizes per VC
+  """
+  vcPacketSizes = {}
+  for i, packetSize in enumerate(packetSizes):
+    applicationProcessId = apids[i % len(apids)]
+    virtualChannelId = vcMultiplexer.getVirtualChannelId(applicationProcessId)
+    sizes = vcPacketSizes.setdefault(virtualChannelId, [])
+    tmPacket = createTMpacket(packetSize, applicationProcessId, len(sizes))
+    sizes.append(packetSize)
+    vcMultiplexer.pushTMpacket(tmPacket, None, None)
+  tmFrames = []
+  queueDepth = vcMultiplexer.getQueueDepth()
+  while True:
+    nextFrame = vcMultiplexer.getNextTMframe()
+    if nextFrame == None:
+      break
+    tmFrames.append(nextFrame[0])
+  if len(tmFrames) != queueDepth or vcMultiplexer.getQueueDepth() != 0:
+    print "invalid queue depth", queueDepth
+    return None, None
+  return tmFrames, vcPacketSizes
+# -----------------------------------------------------------------------------
+def checkMultiplexedFrames(tmFrames, vcPacketSizes):
+  """checks the master channel counter and the packets per VC"""
+  vcFrames = {}
+  for i, tmFrame in enumerate(tmFrames):
+    if tmFrame.masterChannelFrameCount != \
+       (tmFrames[0].masterChannelFrameCount + i) % 256:
+      print "invalid master channel counter", tmFrame.masterChannelFrameCount
+      return False
+    vcFrames.setdefault(tmFrame.virtualChannelId, []).append(tmFrame)
+  for virtualChannelId, frames in vcFrames.items():
+    if not checkFrameStream(frames, vcPacketSizes[virtualChannelId]):
+      print "invalid frames on VC", virtualChannelId
+      return False
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_vcMultiplexing():
+  """function to test the VC multiplexer"""
+  SPACE.TMGEN.init()
+  LINK.TMGEN.init()
+  vcMultiplexer = LINK.VCMUX.VCmultiplexerImpl(LINK.IF.s_tmFrameGenerator, 0)
+  vcMultiplexer.addVirtualChannel(0, priority=2, weight=1)
+  vcMultiplexer.addVirtualChannel(1, priority=0, weight=3)
+  vcMultiplexer.addVirtualChannel(5, priority=1, weight=2)
+  vcMultiplexer.addAPIDrule(100, 199, 1)
+  vcMultiplexer.addAPIDrule(200, 299, 5)
+  vcMultiplexer.addAPIDrule(150, 250, 0)
+  for applicationProcessId, virtualChannelId in [(100, 1), (199, 1), (200, 5),
+                                                 (250, 5), (300, 0), (5, 0)]:
+    if vcMultiplexer.getVirtualChannelId(applicationProcessId) != \
+       virtualChannelId:
+      print "invalid routing of APID", applicationProcessId
+      return False
+  try:
+    vcMultiplexer.addAPIDrule(300, 399, 7)
+    print "APID rule for unknown VC not rejected"
+    return False
+  except UTIL.SYS.Error:
+    pass
+  # 1 frame per packet
+  packetSizes = [1000] * 60
+  apids = [100, 200, 300]
+  # priority: all VC 1 frames, then VC 5, then VC 0
+  tmFrames, vcPacketSizes = multiplexFrames(vcMultiplexer, packetSizes, apids)
+  if tmFrames == None or not checkMultiplexedFrames(tmFrames, vcPacketSizes):
+    return False
+  vcSequence = [tmFrame.virtualChannelId for tmFrame in tmFrames]
+  if vcSequence != [1] * 20 + [5] * 20 + [0] * 20:
+    print "invalid priority sequence", vcSequence
+    return False
+  # weighted round-robin: 3 frames VC 1, 2 frames VC 5, 1 frame VC 0
+  vcMultiplexer.setPolicy(LINK.IF.VC_POLICY_WEIGHTED_ROUND_ROBIN)
+  tmFrames, vcPacketSizes = multiplexFrames(vcMultiplexer, packetSizes, apids)
+  if tmFrames == None or not checkMultiplexedFrames(tmFrames, vcPacketSizes):
+    return False
+  vcSequence = [tmFrame.virtualChannelId for tmFrame in tmFrames]
+  if vcSequence[:12] != [1, 1, 1, 5, 5, 0] * 2:
+    print "invalid round-robin sequence", vcSequence
+    return False
+  # rate share: 3/6 VC 1, 2/6 VC 5, 1/6 VC 0 as long as all VCs have frames
+  vcMultiplexer.setPolicy(LINK.IF.VC_POLICY_RATE_SHARE)
+  tmFrames, vcPacketSizes = multiplexFrames(vcMultiplexer, packetSizes, apids)
+  if tmFrames == None or not checkMultiplexedFrames(tmFrames, vcPacketSizes):
+    return False
+  vcSequence = [tmFrame.virtualChannelId for tmFrame in tmFrames]
+  for virtualChannelId, share in [(1, 3), (5, 2), (0, 1)]:
+    if vcSequence[:30].count(virtualChannelId) != share * 5:
+      print "invalid rate share sequence", vcSequence
+      return False
+  if len(set(vcSequence[:6])) != 3:
+    print "rate share slots not interleaved", vcSequence
+    return False
+  # packing latency per VC: frames are only sent when they are flushed
+  vcMultiplexer.setPolicy(LINK.IF.VC_POLICY_PRIORITY)
+  vcMultiplexer.pushTMpacket(createTMpacket(100, 100, 0), None, 10.0)
+  vcMultiplexer.pushTMpacket(createTMpacket(100, 200, 0), None, 20.0)
+  # a further packet does not extend the latency of the pending frame
+  vcMultiplexer.pushTMpacket(createTMpacket(100, 100, 0), None, 12.0)
+  if vcMultiplexer.getNextFlushTime() != 10.0:
+    print "invalid next flush time", vcMultiplexer.getNextFlushTime()
+    return False
+  vcMultiplexer.flushExpiredFrames(15.0)
+  if vcMultiplexer.getQueueDepth() != 1 or \
+     vcMultiplexer.getNextTMframe()[0].virtualChannelId != 1:
+    print "invalid latency flush"
+    return False
+  if vcMultiplexer.getNextFlushTime() != 20.0:
+    print "invalid next flush time", vcMultiplexer.getNextFlushTime()
+    return False
+  vcMultiplexer.flushExpiredFrames(20.0)
+  if vcMultiplexer.getQueueDepth() != 1 or \
+     vcMultiplexer.getNextTMframe()[0].virtualChannelId != 5:
+    print "invalid latency flush"
+    return False
+  if vcMultiplexer.getNextFlushTime() != None:
+    print "invalid next flush time", vcMultiplexer.getNextFlushTime()
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def demultiplexFrames(tmFrameDemultiplexer, tmFrames):
+  """returns the extracted TM packets per APID"""
+  apidPackets = {}
+  for tmFrame in tmFrames:
+    for tmPacket in tmFrameDemultiplexer.pushFrame(tmFrame):
+      apidPackets.setdefault(tmPacket.applicationProcessId, []).append(tmPacket)
+  return apidPackets
+# -----------------------------------------------------------------------------
+def checkDemultiplexedPackets(apidPackets, apidPacketSizes):
+  """checks the extracted TM packets against the sent packet sizes"""
+  for applicationProcessId, packetSizes in apidPacketSizes.items():
+    packets = apidPackets.get(applicationProcessId, [])
+    if [len(packet) for packet in packets] != packetSizes:
+      print "invalid packets of APID", applicationProcessId
+      return False
+    for i, packet in enumerate(packets):
+      if packet.sequenceControlCount != i or not packet.checkChecksum():
+        print "packet", i, "of APID", applicationProcessId, "corrupted"
+        return False
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_frameDemultiplexing():
+  """function to test the extraction of TM packets from TM frames"""
+  SPACE.TMGEN.init()
+  LINK.TMGEN.init()
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  dataFieldSize = tmFrameGenerator.getDataFieldEndPos() - \
+                  tmFrameGenerator.getDataFieldPos()
+  vcMultiplexer = LINK.VCMUX.VCmultiplexerImpl(
+    tmFrameGenerator, 0, LINK.IF.VC_POLICY_WEIGHTED_ROUND_ROBIN)
+  vcMultiplexer.addVirtualChannel(1)
+  vcMultiplexer.addVirtualChannel(5)
+  vcMultiplexer.addAPIDrule(100, 100, 1)
+  vcMultiplexer.addAPIDrule(200, 200, 5)
+  # small, segmented and exactly fitting packets on interleaved VCs,
+  # each VC has one APID ---> the sequence counter is the packet number
+  packetSizes = [64, 3 * dataFieldSize + 17, 40, dataFieldSize, 8, 2000,
+                 dataFieldSize - 3, 256, 65542, 100] * 3
+  apids = [100, 200, 300]
+  tmFrames, vcPacketSizes = multiplexFrames(vcMultiplexer, packetSizes, apids)
+  if tmFrames == None:
+    return False
+  apidPacketSizes = {100: vcPacketSizes[1],
+                     200: vcPacketSizes[5],
+                     300: vcPacketSizes[0]}
+  tmFrameDemultiplexer = CCSDS.DEMUX.TMframeDemultiplexer()
+  # frames as data units and as binary strings
+  apidPackets = demultiplexFrames(
+    tmFrameDemultiplexer,
+    [tmFrame if i % 2 else tmFrame.getBufferString()
+     for i, tmFrame in enumerate(tmFrames)])
+  if not checkDemultiplexedPackets(apidPackets, apidPacketSizes):
+    return False
+  if tmFrameDemultiplexer.packetCounter != len(packetSizes) or \
+     tmFrameDemultiplexer.frameCounter != len(tmFrames) or \
+     tmFrameDemultiplexer.discontinuityCounter != 0:
+    print "invalid demultiplexer counters"
+    return False
+  if tmFrameDemultiplexer.idlePacketCounter == 0:
+    print "idle packets not detected"
+    return False
+  print "extracted", tmFrameDemultiplexer.packetCounter, "packets and", \
+        tmFrameDemultiplexer.idlePacketCounter, "idle packets from", \
+        len(tmFrames), "frames"
+  # frames in NCTRS TM data units: bytearray buffers like GRND.NCTRS.TMsender
+  # and binary strings like GRND.NCTRS.TMreceiver.receiveCallback
+  nctrsPacketRecorder = NCTRSpacketRecorder()
+  for i, tmFrame in enumerate(tmFrames):
+    if i % 2:
+      tmDu = GRND.NCTRSDU.TMdataUnit(
+        bytearray(GRND.NCTRSDU.TM_DU_HEADER_BYTE_SIZE))
+      tmDu.setFrame(tmFrame.getBufferString())
+    else:
+      tmDu = GRND.NCTRSDU.TMdataUnit("\0" * GRND.NCTRSDU.TM_DU_HEADER_BYTE_SIZE)
+      tmDu.append(tmFrame.getBufferString())
+      tmDu.packetSize = len(tmDu)
+    tmDu.earthReceptionTime = 1000000000.0 + i
+    nctrsPacketRecorder.notifyTMdataUnit(tmDu)
+  if not checkDemultiplexedPackets(nctrsPacketRecorder.apidPackets,
+                                   apidPacketSizes):
+    return False
+  if len(nctrsPacketRecorder.earthReceptionTimes) != len(packetSizes) or \
+     nctrsPacketRecorder.earthReceptionTimes != \
+     sorted(nctrsPacketRecorder.earthReceptionTimes):
+    print "invalid earth reception times of the NCTRS packets"
+    return False
+  # idle frame (OID): counted, no packets
+  idleFrame = CCSDS.FRAME.TMframe(tmFrames[0].getBufferString())
+  idleFrame.virtualChannelFCountLow = tmFrames[-1].virtualChannelFCountLow + 1
+  idleFrame.virtualChannelId = tmFrames[-1].virtualChannelId
+  idleFrame.firstHeaderPointer = CCSDS.FRAME.FHP_IDLE_FRAME
+  idleFrame.setChecksum()
+  if tmFrameDemultiplexer.pushFrame(idleFrame) != [] or \
+     tmFrameDemultiplexer.idleFrameCounter != 1 or \
+     tmFrameDemultiplexer.discontinuityCounter != 0:
+    print "idle frame not handled"
+    return False
+  # a lost frame that contains the segment of a packet in the middle
+  # ---> only this packet is lost, the next packet start resynchronises
+  tmFrameDemultiplexer = CCSDS.DEMUX.TMframeDemultiplexer()
+  vc5frames = [tmFrame for tmFrame in tmFrames
+               if tmFrame.virtualChannelId == 5]
+  lostFrameNr = 2
+  if vc5frames[lostFrameNr].firstHeaderPointer != \
+     CCSDS.FRAME.FHP_NO_PACKET_START:
+    print "lost frame is not a continuation frame"
+    return False
+  apidPackets = demultiplexFrames(
+    tmFrameDemultiplexer,
+    vc5frames[:lostFrameNr] + vc5frames[lostFrameNr + 1:])
+  if tmFrameDemultiplexer.discontinuityCounter != 1:
+    print "frame count gap not detected"
+    return False
+  sequenceCounters = [packet.sequenceControlCount
+                      for packet in apidPackets[200]]
+  if sequenceCounters != range(1, len(apidPacketSizes[200])):
+    print "invalid packets after frame loss", sequenceCounters
+    return False
+  # corrupted frame: rejected by the CRC check
+  if CCSDS.FRAME.CRC_CHECK:
+    tmFrameDemultiplexer = CCSDS.DEMUX.TMframeDemultiplexer()
+    corruptedFrame = bytearray(vc5frames[0].getBufferString())
+    corruptedFrame[20] ^= 0x01
+    if tmFrameDemultiplexer.pushFrame(corruptedFrame) != [] or \
+       tmFrameDemultiplexer.crcErrorCounter != 1:
+      print "corrupted frame not rejected"
+      return False
+    # starts with a continuation frame ---> synchronised by the next FHP
+    apidPackets = demultiplexFrames(tmFrameDemultiplexer, vc5frames[1:])
+    sequenceCounters = [packet.sequenceControlCount
+                        for packet in apidPackets[200]]
+    if sequenceCounters != range(1, len(apidPacketSizes[200])):
+      print "invalid packets after corrupted frame", sequenceCounters
+      return False
+  # firstHeaderPointer that does not match the pending packet
+  tmFrameDemultiplexer = CCSDS.DEMUX.TMframeDemultiplexer()
+  tmFrameDemultiplexer.pushFrame(vc5frames[0])
+  wrongFrame = CCSDS.FRAME.TMframe(vc5frames[1].getBufferString())
+  wrongFrame.firstHeaderPointer = 0
+  wrongFrame.setChecksum()
+  tmFrameDemultiplexer.pushFrame(wrongFrame)
+  if tmFrameDemultiplexer.discontinuityCounter != 1:
+    print "firstHeaderPointer mismatch not detected"
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_idleGeneration():
+  """function to test the cached idle packets and idle frames"""
+  SPACE.TMGEN.init()
+  LINK.TMGEN.init()
+  tmPacketGenerator = SPACE.IF.s_tmPacketGenerator
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  # idle packets are reused, only the counter and the CRC change
+  idlePacket1 = tmPacketGenerator.getIdlePacket(100)
+  sequenceControlCount1 = idlePacket1.sequenceControlCount
+  idlePacket2 = tmPacketGenerator.getIdlePacket(100)
+  if idlePacket2 is not idlePacket1 or \
+     idlePacket2.sequenceControlCount != sequenceControlCount1 + 1 or \
+     not idlePacket2.checkChecksum():
+    print "idle packet not reused"
+    return False
+  idlePacket3 = tmPacketGenerator.getIdlePacket(LINK.TMGEN.IDLE_PACKET_MIN_SIZE)
+  if len(idlePacket3) != LINK.TMGEN.IDLE_PACKET_MIN_SIZE or \
+     idlePacket3.applicationProcessId != \
+     tmPacketGenerator.packetDefaults.idlePacketAPID or \
+     not idlePacket3.checkChecksum():
+    print "invalid idle packet", idlePacket3
+    return False
+  try:
+    tmPacketGenerator.getIdlePacket(LINK.TMGEN.IDLE_PACKET_MIN_SIZE - 1)
+    print "too small idle packet not rejected"
+    return False
+  except UTIL.SYS.Error:
+    pass
+  # idle frames between frames with packets
+  tmFrames = [tmFrameGenerator.getIdleTMframe(),
+              tmFrameGenerator.getIdleTMframe()]
+  tmFrames += tmFrameGenerator.packTMpacket(createTMpacket(100, 100, 0))
+  # a pending frame is flushed instead of an idle frame
+  tmFrames.append(tmFrameGenerator.getIdleTMframe())
+  tmFrames.append(tmFrameGenerator.getIdleTMframe())
+  firstHeaderPointers = [tmFrame.firstHeaderPointer for tmFrame in tmFrames]
+  if firstHeaderPointers != [CCSDS.FRAME.FHP_IDLE_FRAME,
+                             CCSDS.FRAME.FHP_IDLE_FRAME,
+                             0,
+                             CCSDS.FRAME.FHP_IDLE_FRAME]:
+    print "invalid idle frames", firstHeaderPointers
+    return False
+  tmFrameDemultiplexer = CCSDS.DEMUX.TMframeDemultiplexer()
+  apidPackets = demultiplexFrames(tmFrameDemultiplexer, tmFrames)
+  if tmFrameDemultiplexer.idleFrameCounter != 3 or \
+     tmFrameDemultiplexer.discontinuityCounter != 0 or \
+     tmFrameDemultiplexer.crcErrorCounter != 0 or \
+     len(apidPackets.get(100, [])) != 1:
+    print "idle frames not correctly decoded"
+    return False
+  for i, tmFrame in enumerate(tmFrames):
+    if tmFrame.masterChannelFrameCount != i or \
+       tmFrame.virtualChannelFCountLow != i:
+      print "invalid frame counters in idle frame", i
+      return False
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_constantRate():
+  """function to test the constant rate frame clock"""
+  SPACE.TMGEN.init()
+  LINK.TMGEN.init()
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  vcMultiplexer = LINK.VCMUX.VCmultiplexerImpl(tmFrameGenerator, 0)
+  # 2 Mbps with 1115 byte frames
+  frameRate = LINK.RATE.getFrameRate(2000000, 1115)
+  frameClock = LINK.RATE.ConstantRateFrameClock(
+    frameRate, vcMultiplexer, tmFrameGenerator, 7)
+  startTime = 1500000000.0
+  frameClock.start(startTime)
+  # irregular ticks over one minute, TM packets are pushed in between
+  actualTime = startTime
+  tickPeriods = [0.1, 0.037, 0.25, 0.0001, 0.5, 0.013]
+  sendTimes = []
+  vcFrameIds = []
+  i = 0
+  while actualTime < startTime + 60.0:
+    if i % 10 == 0:
+      vcMultiplexer.pushTMpacket(createTMpacket(3000, 100, i / 10), None, None)
+      if frameClock.getQueueDepth() != vcMultiplexer.getQueueDepth() or \
+         frameClock.getQueueDepth() == 0:
+        print "invalid queue depth", frameClock.getQueueDepth()
+        return False
+    for tmFrameDu, ertUTC, sendTime in frameClock.tick(actualTime):
+      sendTimes.append(sendTime)
+      vcFrameIds.append(tmFrameDu.virtualChannelId)
+      if tmFrameDu.virtualChannelId == 7 and \
+         tmFrameDu.firstHeaderPointer != CCSDS.FRAME.FHP_IDLE_FRAME:
+        print "idle frame without idle firstHeaderPointer"
+        return False
+      tmFrameGenerator.recycleTMframe(tmFrameDu)
+    actualTime += tickPeriods[i % len(tickPeriods)]
+    i += 1
+  lastTickTime = actualTime - tickPeriods[(i - 1) % len(tickPeriods)]
+  # exactly one frame per slot, the send times are not accumulated
+  nrFrames = int((lastTickTime - startTime) * frameRate) + 1
+  if len(sendTimes) != nrFrames or \
+     frameClock.frameCounter != nrFrames:
+    print "invalid number of frames", len(sendTimes), "- should be", nrFrames
+    return False
+  for frameNr in [0, 1, nrFrames / 2, nrFrames - 1]:
+    if sendTimes[frameNr] != startTime + frameNr / frameRate:
+      print "invalid send time of frame", frameNr
+      return False
+  nrPacketFrames = vcFrameIds.count(0)
+  if nrPacketFrames + frameClock.idleFrameCounter != nrFrames or \
+     nrPacketFrames == 0 or frameClock.idleFrameCounter == 0:
+    print "invalid idle frame insertion"
+    return False
+  print "sent", nrFrames, "frames in 60 s,", frameClock.idleFrameCounter, \
+        "idle frames,", nrPacketFrames, "frames with packets"
+  # a suspended clock skips the missed slots
+  nextFrameTime = frameClock.getNextFrameTime()
+  tmFrames = frameClock.tick(nextFrameTime + 10.0)
+  if len(tmFrames) > frameRate * LINK.RATE.MAX_LATENESS_SEC + 1 or \
+     frameClock.skippedFrameCounter == 0:
+    print "missed frame slots not skipped"
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_aosFrames():
+  """function to test the AOS frame generation and demultiplexing"""
+  SPACE.TMGEN.init()
+  # the idle VC of AOS frames is the default for an empty TM_IDLE_VC
+  UTIL.SYS.s_configuration.setDefaults([
+    ["TM_FRAME_LATENCY_MS", "0"],
+    ["TM_VC_POLICY", LINK.IF.VC_POLICY_PRIORITY],
+    ["TM_FRAME_RATE", "0"],
+    ["TM_IDLE_VC", ""],
+    ["TM_FRAME_FORMAT", LINK.IF.TM_FRAME_FORMAT_AOS],
+    ["AOS_INSERT_ZONE_SIZE", "0"]])
+  if LINK.IF.Configuration().tmIdleVirtualChannelId != \
+     CCSDS.FRAME.AOS_IDLE_VIRTUAL_CHANNEL_ID:
+    print "invalid default of the AOS idle VC"
+    return False
+  # the spacecraft ID must not be truncated to the 8 bit AOS spacecraftId
+  environment = SCOS.ENV.s_environment
+  spacecraftId = environment.spacecraftID
+  environment.spacecraftID = CCSDS.FRAME.AOS_MAX_SPACECRAFT_ID + 1
+  try:
+    LINK.TMGEN.AOSframeGeneratorImpl()
+    print "too large AOS spacecraft ID not detected"
+    return False
+  except UTIL.SYS.Error:
+    pass
+  environment.spacecraftID = CCSDS.FRAME.AOS_MAX_SPACECRAFT_ID
+  try:
+    return checkAOSframes()
+  finally:
+    environment.spacecraftID = spacecraftId
+# -----------------------------------------------------------------------------
+def checkAOSframes():
+  """checks the AOS frame generation and demultiplexing"""
+  insertZone = "\x01\x02\x03\x04"
+  tmFrameGenerator = LINK.TMGEN.AOSframeGeneratorImpl(len(insertZone))
+  tmFrameGenerator.setInsertZone(insertZone)
+  dataFieldPos = tmFrameGenerator.getDataFieldPos()
+  dataFieldSize = tmFrameGenerator.getDataFieldEndPos() - dataFieldPos
+  trailerSize = tmFrameGenerator.frameDefaults.transferFrameSize - \
+                tmFrameGenerator.getDataFieldEndPos()
+  vcMultiplexer = LINK.VCMUX.VCmultiplexerImpl(
+    tmFrameGenerator, 0, LINK.IF.VC_POLICY_WEIGHTED_ROUND_ROBIN)
+  vcMultiplexer.addVirtualChannel(1)
+  vcMultiplexer.addVirtualChannel(5)
+  vcMultiplexer.addAPIDrule(100, 100, 1)
+  vcMultiplexer.addAPIDrule(200, 200, 5)
+  packetSizes = [64, 3 * dataFieldSize + 17, 40, dataFieldSize, 8, 2000,
+                 dataFieldSize - 3, 256, 100] * 3
+  apids = [100, 200, 300]
+  tmFrames, vcPacketSizes = multiplexFrames(vcMultiplexer, packetSizes, apids)
+  if tmFrames == None:
+    return False
+  # AOS header, insert zone, M_PDU and 24 bit VC frame counter
+  vcFrameCounts = {}
+  for frameNr, tmFrame in enumerate(tmFrames):
+    if not isinstance(tmFrame, CCSDS.FRAME.AOSframe) or \
+       tmFrame.versionNumber != CCSDS.FRAME.AOS_VERSION_NUMBER or \
+       tmFrame.spacecraftId != CCSDS.FRAME.AOS_MAX_SPACECRAFT_ID or \
+       len(tmFrame) != tmFrameGenerator.frameDefaults.transferFrameSize:
+      print "invalid AOS frame", frameNr
+      return False
+    if CCSDS.FRAME.CRC_CHECK and not tmFrame.checkChecksum():
+      print "invalid frame CRC in frame", frameNr
+      return False
+    if tmFrame.getBufferString()[6:10] != insertZone:
+      print "invalid insert zone in frame", frameNr
+      return False
+    frameCount = vcFrameCounts.get(tmFrame.virtualChannelId, 0)
+    if tmFrame.virtualChannelFrameCount != frameCount:
+      print "invalid VC frame counter", tmFrame.virtualChannelFrameCount
+      return False
+    vcFrameCounts[tmFrame.virtualChannelId] = frameCount + 1
+    mpdu = tmFrame.getMPDU(len(insertZone), trailerSize)
+    if len(mpdu.getPacketZone()) != dataFieldSize or \
+       mpdu.firstHeaderPointer != \
+       tmFrameGenerator.getFirstHeaderPointer(tmFrame):
+      print "invalid M_PDU in frame", frameNr
+      return False
+  tmFrameDemultiplexer = CCSDS.DEMUX.AOSframeDemultiplexer(len(insertZone))
+  apidPackets = demultiplexFrames(tmFrameDemultiplexer, tmFrames)
+  apidPacketSizes = {100: vcPacketSizes[1],
+                     200: vcPacketSizes[5],
+                     300: vcPacketSizes[0]}
+  if not checkDemultiplexedPackets(apidPackets, apidPacketSizes):
+    return False
+  if tmFrameDemultiplexer.packetCounter != len(packetSizes) or \
+     tmFrameDemultiplexer.discontinuityCounter != 0:
+    print "invalid AOS demultiplexer counters"
+    return False
+  print "extracted", tmFrameDemultiplexer.packetCounter, "packets from", \
+        len(tmFrames), "AOS frames"
+  # idle frames on the idle VC and a lost frame
+  idleFrame = tmFrameGenerator.getIdleTMframe(
+    CCSDS.FRAME.AOS_IDLE_VIRTUAL_CHANNEL_ID)
+  if CCSDS.FRAME.CRC_CHECK and not idleFrame.checkChecksum():
+    print "invalid CRC of AOS idle frame"
+    return False
+  tmFrameDemultiplexer = CCSDS.DEMUX.AOSframeDemultiplexer(len(insertZone))
+  vc5frames = [tmFrame for tmFrame in tmFrames
+               if tmFrame.virtualChannelId == 5]
+  tmFrameDemultiplexer.pushFrame(idleFrame)
+  demultiplexFrames(tmFrameDemultiplexer, vc5frames[:2] + vc5frames[3:])
+  if tmFrameDemultiplexer.idleFrameCounter != 1 or \
+     tmFrameDemultiplexer.discontinuityCounter != 1:
+    print "AOS idle frame or frame count gap not handled"
+    return False
+  # wrap around of the 24 bit VC frame counter
+  tmFrameGenerator.getVirtualChannel(2).frameCount = \
+    CCSDS.FRAME.AOS_VC_FRAME_COUNT_MODULO - 1
+  tmFrameDemultiplexer = CCSDS.DEMUX.AOSframeDemultiplexer(len(insertZone))
+  frameCounts = []
+  for i in xrange(3):
+    idleFrame = tmFrameGenerator.getIdleTMframe(2)
+    if CCSDS.FRAME.CRC_CHECK and not idleFrame.checkChecksum():
+      print "invalid CRC of AOS idle frame", i
+      return False
+    frameCounts.append(idleFrame.virtualChannelFrameCount)
+    tmFrameDemultiplexer.pushFrame(idleFrame)
+  if frameCounts != [0xFFFFFF, 0, 1] or \
+     tmFrameDemultiplexer.discontinuityCounter != 0:
+    print "invalid VC frame counter wrap around", frameCounts
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def runTimers(task, endTime):
+  """
+  executes the timers of the task up to endTime on the discrete event clock,
+  returns the number of executed timers
+  """
+  clock = UTIL.TIME.getClock()
+  nrTimers = 0
+  while len(task.timerEvents) > 0 and task.timerEvents[0][0] <= endTime:
+    timeout, handler = task.timerEvents.pop(0)
+    clock.advance(timeout - clock.getTime())
+    handler()
+    nrTimers += 1
+  clock.advance(endTime - clock.getTime())
+  return nrTimers
+# -----------------------------------------------------------------------------
+def test_LINK_delayLines():
+  """function to test the uplink and downlink delay lines"""
+  # items with the same due time keep their order
+  delayLine = LINK.TMTC.DelayLine()
+  for item, dueTime in enumerate([3.0, 1.0, 2.0, 1.0, 3.0, 1.0]):
+    delayLine.push(dueTime, item)
+  if delayLine.getNextDueTime() != 1.0 or \
+     delayLine.popExpired(1.0) != [1, 3, 5] or \
+     delayLine.getEntries() != [(2.0, 2), (3.0, 0), (3.0, 4)] or \
+     len(delayLine) != 3:
+    print "invalid delay line order"
+    return False
+  UTIL.SYS.s_configuration.setDefaults([
+    ["TM_FRAME_LATENCY_MS", "0"],
+    ["TM_VC_POLICY", LINK.IF.VC_POLICY_PRIORITY],
+    ["TM_FRAME_RATE", "0"],
+    ["TM_IDLE_VC", "7"],
+    ["TM_FRAME_FORMAT", LINK.IF.TM_FRAME_FORMAT_TM],
+    ["AOS_INSERT_ZONE_SIZE", "0"]])
+  startTime = 1500000000.0
+  clock = UTIL.TIME.DiscreteEventClock(startTime)
+  UTIL.TIME.setClock(clock)
+  try:
+    return checkSpaceLinkTimers(startTime)
+  finally:
+    UTIL.TIME.setClock(UTIL.TIME.RealTimeClock())
+    LINK.IF.s_configuration = None
+# -----------------------------------------------------------------------------
+def checkSpaceLinkTimers(startTime):
+  """checks the delay lines and the timer of the space link"""
+  task = LinkTestTask()
+  groundLink = GroundLinkRecorder()
+  GRND.IF.s_tmMcsLink = groundLink
+  LINK.IF.s_configuration = LINK.IF.Configuration()
+  SPACE.TMGEN.init()
+  LINK.TMGEN.init()
+  LINK.VCMUX.init()
+  LINK.RATE.init()
+  LINK.TMTC.init()
+  spaceLink = LINK.IF.s_packetLink
+  if len(task.timerEvents) != 0:
+    print "timer armed without due time"
+    return False
+  # frames that are completed at the same time are all received,
+  # one timer serves them
+  for i in xrange(5):
+    spaceLink.pushTMpacket(createTMpacket(64, 100, i), None)
+  if len(spaceLink.getDownlinkQueue()) != 5 or len(task.timerEvents) != 1:
+    print "invalid downlink queue or timers", len(task.timerEvents)
+    return False
+  nrTimers = runTimers(task, startTime + 10.0)
+  receptionTime = startTime + LINK.TMTC.DOWNLINK_DELAY_SEC
+  if [frameTime for frameTime, tmFrame in groundLink.receivedFrames] != \
+     [receptionTime] * 5 or nrTimers != 1:
+    print "invalid reception of simultaneous frames", nrTimers
+    return False
+  if [tmFrame.virtualChannelFCountLow
+      for frameTime, tmFrame in groundLink.receivedFrames] != range(5):
+    print "simultaneous frames reordered"
+    return False
+  # the timer for the latency flush is superseded by an earlier downlink
+  groundLink.receivedFrames = []
+  pushTime = startTime + 10.0
+  LINK.IF.s_configuration.tmFrameLatencyMs = 5000
+  spaceLink.pushTMpacket(createTMpacket(64, 100, 5), None)
+  LINK.IF.s_configuration.tmFrameLatencyMs = 0
+  spaceLink.pushTMpacket(createTMpacket(64, 100, 6), None)
+  nrTimers = runTimers(task, pushTime + 10.0)
+  if len(groundLink.receivedFrames) != 1 or \
+     groundLink.receivedFrames[0][0] != \
+     pushTime + LINK.TMTC.DOWNLINK_DELAY_SEC or nrTimers != 2:
+    print "invalid timer for earlier due time", nrTimers
+    return False
+  # latency flush after 500 ms
+  groundLink.receivedFrames = []
+  pushTime += 10.0
+  LINK.IF.s_configuration.tmFrameLatencyMs = 500
+  spaceLink.pushTMpacket(createTMpacket(64, 100, 7), None)
+  runTimers(task, pushTime + 10.0)
+  if len(groundLink.receivedFrames) != 1 or \
+     abs(groundLink.receivedFrames[0][0] -
+         (pushTime + 0.5 + LINK.TMTC.DOWNLINK_DELAY_SEC)) > 0.001 or \
+     len(task.timerEvents) != 0:
+    print "invalid latency flush"
+    return False
+  return True
+
+########
+# main #
+########
+if __name__ == "__main__":
+  print "***** test_LINK_framePacking() start"
+  retVal = test_LINK_framePacking()
+  print "***** test_LINK_framePacking() done:", retVal
+  print "***** test_LINK_packetSegmentation() start"
+  retVal = test_LINK_packetSegmentation()
+  print "***** test_LINK_packetSegmentation() done:", retVal
+  print "***** test_LINK_frameRecycling() start"
+  retVal = test_LINK_frameRecycling()
+  print "***** test_LINK_frameRecycling() done:", retVal
+  print "***** test_LINK_vcMultiplexing() start"
+  retVal = test_LINK_vcMultiplexing()
+  print "***** test_LINK_vcMultiplexing() done:", retVal
+  print "***** test_LINK_frameDemultiplexing() start"
+  retVal = test_LINK_frameDemultiplexing()
+  print "***** test_LINK_frameDemultiplexing() done:", retVal
+  print "***** test_LINK_idleGeneration() start"
+  retVal = test_LINK_idleGeneration()
+  print "***** test_LINK_idleGeneration() done:", retVal
+  print "***** test_LINK_constantRate() start"
+  retVal = test_LINK_constantRate()
+  print "***** test_LINK_constantRate() done:", retVal
+  print "***** test_LINK_aosFrames() start"
+  retVal = test_LINK_aosFrames()
+  print "***** test_LINK_aosFrames() done:", retVal
+  print "***** test_LINK_delayLines() start"
+  retVal = test_LINK_delayLines()
+  print "***** test_LINK_delayLines() done:", retVal
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+#******************************************************************************
+# (C) 2017, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under the terms of the GNU Lesser General Public License as       *
+# published by the Free Software Foundation; either version 2.1 of the        *
+# License, or (at your option) any later version.                             *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser     *
+# General Public License for more details.                                    *
+#******************************************************************************
+# Unit Tests - throughput of the TM frame generation and demultiplexing       *
+# usage: testLINKbenchmark.py [nrFrames]                                      *
+#******************************************************************************
+import sys, time
+import UTIL.SYS
+UTIL.SYS.s_configuration.setDefaults([["TM_TT_TIME_BYTE_OFFSET", "0"]])
+import CCSDS.DEMUX
+import LINK.IF, LINK.TMGEN, LINK.TMTC, LINK.VCMUX
+import SPACE.TMGEN
+from testLINK import createTMpacket
+
+#############
+# functions #
+#############
+def packFrames(nrFrames, tmPackets, recycle):
+  """
+  packs TM packets until nrFrames are completed,
+  returns the number of different frame objects
+  """
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  frames = []
+  frameIds = set()
+  nrPackedFrames = 0
+  i = 0
+  while nrPackedFrames < nrFrames:
+    tmFrames = tmFrameGenerator.packTMpacket(tmPackets[i % len(tmPackets)])
+    i += 1
+    if i % 8 == 0:
+      # latency expired ---> flush with idle packet
+      tmFrame = tmFrameGenerator.flushTMframe()
+      if tmFrame != None:
+        tmFrames.append(tmFrame)
+    nrPackedFrames += len(tmFrames)
+    for tmFrame in tmFrames:
+      frameIds.add(id(tmFrame))
+      if recycle:
+        tmFrameGenerator.recycleTMframe(tmFrame)
+      else:
+        # keep the frame alive to get a new id for each allocated frame
+        frames.append(tmFrame)
+  return len(frameIds)
+# -----------------------------------------------------------------------------
+def test_LINK_frameGeneration(nrFrames=20000):
+  """function to measure the TM frame generation"""
+  SPACE.TMGEN.init()
+  LINK.TMGEN.init()
+  tmPackets = [createTMpacket(packetSize, 100, i)
+               for i, packetSize in enumerate([64, 128, 40, 256, 96, 2000])]
+  for recycle in [False, True]:
+    packFrames(100, tmPackets, recycle)
+    startTime = time.time()
+    nrFrameObjects = packFrames(nrFrames, tmPackets, recycle)
+    stopTime = time.time()
+    print "recycle =", recycle, \
+          "%.1f us per frame," % ((stopTime - startTime) * 1000000.0 / nrFrames), \
+          "%d frames per second," % (nrFrames / (stopTime - startTime)), \
+          "frame objects:", nrFrameObjects
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_vcScheduling(nrFrames=20000):
+  """function to measure the VC scheduling with few and many VCs"""
+  SPACE.TMGEN.init()
+  LINK.TMGEN.init()
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  dataFieldSize = tmFrameGenerator.getDataFieldEndPos() - \
+                  tmFrameGenerator.getDataFieldPos()
+  for policy in LINK.VCMUX.VC_POLICIES:
+    for nrVCs in [1, 8]:
+      vcMultiplexer = LINK.VCMUX.VCmultiplexerImpl(tmFrameGenerator, 0, policy)
+      tmPackets = []
+      for virtualChannelId in xrange(nrVCs):
+        vcMultiplexer.addVirtualChannel(virtualChannelId,
+                                        priority=virtualChannelId % 4,
+                                        weight=1 + virtualChannelId % 3)
+        vcMultiplexer.addAPIDrule(virtualChannelId, virtualChannelId,
+                                  virtualChannelId)
+        tmPackets.append(createTMpacket(dataFieldSize, virtualChannelId, 0))
+      # fill the VC queues
+      for i in xrange(nrFrames):
+        vcMultiplexer.pushTMpacket(tmPackets[i % nrVCs], None, None)
+      startTime = time.time()
+      while True:
+        nextFrame = vcMultiplexer.getNextTMframe()
+        if nextFrame == None:
+          break
+        tmFrameGenerator.recycleTMframe(nextFrame[0])
+      stopTime = time.time()
+      print policy, nrVCs, "VCs:", \
+            "%.1f us per frame" % ((stopTime - startTime) * 1000000.0 / nrFrames)
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_frameDemultiplexing(nrFrames=20000):
+  """
+  function to measure the extraction of TM packets from TM frames
+  and from AOS frames
+  """
+  SPACE.TMGEN.init()
+  frameFormats = [
+    ("TM", LINK.TMGEN.TMframeGeneratorImpl(),
+     CCSDS.DEMUX.TMframeDemultiplexer),
+    ("AOS", LINK.TMGEN.AOSframeGeneratorImpl(),
+     CCSDS.DEMUX.AOSframeDemultiplexer)]
+  for frameFormat, tmFrameGenerator, demultiplexerClass in frameFormats:
+    for packetSizes in [[64, 128, 40, 256, 96, 2000], [4000, 8000]]:
+      tmPackets = [createTMpacket(packetSize, 100, i)
+                   for i, packetSize in enumerate(packetSizes)]
+      tmFrames = []
+      i = 0
+      while len(tmFrames) < nrFrames:
+        tmFrames += tmFrameGenerator.packTMpacket(tmPackets[i % len(tmPackets)])
+        i += 1
+      frames = [tmFrame.getBufferString() for tmFrame in tmFrames[:nrFrames]]
+      tmFrameDemultiplexer = demultiplexerClass()
+      startTime = time.time()
+      for frame in frames:
+        tmFrameDemultiplexer.pushFrame(frame)
+      stopTime = time.time()
+      print frameFormat, "packet sizes", packetSizes, \
+            "%.1f us per frame," % ((stopTime - startTime) * 1000000.0 / nrFrames), \
+            "%d frames per second," % (nrFrames / (stopTime - startTime)), \
+            "%d packets" % tmFrameDemultiplexer.packetCounter
+      if tmFrameDemultiplexer.discontinuityCounter != 0:
+        print "unexpected discontinuity"
+        return False
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_idleGeneration(nrFrames=20000):
+  """function to measure the idle packet and idle frame generation"""
+  SPACE.TMGEN.init()
+  LINK.TMGEN.init()
+  tmFrameGenerator = LINK.IF.s_tmFrameGenerator
+  tmPacket = createTMpacket(64, 100, 0)
+  # frames that are flushed with an idle packet
+  startTime = time.time()
+  for i in xrange(nrFrames):
+    tmFrameGenerator.packTMpacket(tmPacket)
+    tmFrameGenerator.recycleTMframe(tmFrameGenerator.flushTMframe())
+  stopTime = time.time()
+  print "flushed frames:", \
+        "%.1f us per frame" % ((stopTime - startTime) * 1000000.0 / nrFrames)
+  # idle frames without packets
+  startTime = time.time()
+  for i in xrange(nrFrames):
+    tmFrameGenerator.recycleTMframe(tmFrameGenerator.getIdleTMframe())
+  stopTime = time.time()
+  print "idle frames:", \
+        "%.1f us per frame" % ((stopTime - startTime) * 1000000.0 / nrFrames)
+  return True
+# -----------------------------------------------------------------------------
+def test_LINK_delayLines(nrFrames=20000):
+  """function to measure the downlink delay line"""
+  # 2000 frames per second with 2 s delay ---> ~4000 queued frames
+  startTime = 1500000000.0
+  sendTimes = [startTime + i / 2000.0 for i in xrange(nrFrames)]
+  delayLine = LINK.TMTC.DelayLine()
+  nrReceivedFrames = 0
+  startClock = time.time()
+  for i, sendTime in enumerate(sendTimes):
+    delayLine.push(sendTime + LINK.TMTC.DOWNLINK_DELAY_SEC, i)
+    nrReceivedFrames += len(delayLine.popExpired(sendTime))
+  stopClock = time.time()
+  print "delay line:", \
+        "%.1f us per frame," % ((stopClock - startClock) * 1000000.0 / nrFrames), \
+        "%d frames queued" % len(delayLine)
+  return (nrReceivedFrames + len(delayLine) == nrFrames)
+
+########
+# main #
+########
+if __name__ == "__main__":
+  nrFrames = 20000
+  if len(sys.argv) > 1:
+    nrFrames = int(sys.argv[1])
+  print "***** test_LINK_frameGeneration() start"
+  retVal = test_LINK_frameGeneration(nrFrames)
+  print "***** test_LINK_frameGeneration() done:", retVal
+  print "***** test_LINK_vcScheduling() start"
+  retVal = test_LINK_vcScheduling(nrFrames)
+  print "***** test_LINK_vcScheduling() done:", retVal
+  print "***** test_LINK_frameDemultiplexing() start"
+  retVal = test_LINK_frameDemultiplexing(nrFrames)
+  print "***** test_LINK_frameDemultiplexing() done:", retVal
+  print "***** test_LINK_idleGeneration() start"
+  retVal = test_LINK_idleGeneration(nrFrames)
+  print "***** test_LINK_idleGeneration() done:", retVal
+  print "***** test_LINK_delayLines() start"
+  retVal = test_LINK_delayLines(nrFrames)
+  print "***** test_LINK_delayLines() done:", retVal
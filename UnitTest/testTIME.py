@@ -14,10 +14,27 @@
 #******************************************************************************
 # Unit Tests                                                                  *
 #******************************************************************************
-import CCSDS.TIME
-import UTIL.TCO, UTIL.TIME
+import array
+import CCSDS.DU, CCSDS.TIME
+import time
+import UI.TKI, UTIL.BATCH, UTIL.TASK, UTIL.TCO, UTIL.TIME
 import testData
 
+###########
+# classes #
+###########
+# =============================================================================
+class GUIrecorder(object):
+  """records the timers of a GUI task instead of a Tkinter main window"""
+  # ---------------------------------------------------------------------------
+  def __init__(self):
+    """initialise attributes"""
+    self.timers = []
+  # ---------------------------------------------------------------------------
+  def after(self, ms, handler):
+    """records the timer like Tkinter.Tk.after"""
+    self.timers.append((ms, handler))
+
 #############
 # functions #
 #############
@@ -105,6 +122,18 @@ def test_TIMEoperations():
   if zeroTimeStr2 != "1970.001.00.00.00.000000":
     print "Invalid ASD zero time 2:", zeroTimeStr2
     return False
+  leapDayTime = UTIL.TIME.getTimeFromASDstr("2016.366.23.59.59.500")
+  if leapDayTime != 1483228799.5:
+    print "Invalid ASD leap day time:", leapDayTime
+    return False
+  if UTIL.TIME.getASDtimeStr(leapDayTime) != "2016.366.23.59.59.500":
+    print "Invalid ASD leap day time string:", UTIL.TIME.getASDtimeStr(leapDayTime)
+    return False
+  for invalidStr in ["2016.000.00.00.00.000", "2016.001.24.00.00.000",
+                     "16.001.00.00.00.000", "2016.001.00.00.00.0000"]:
+    if UTIL.TIME.getTimeFromASDstr(invalidStr) != 0.0:
+      print "Invalid ASD time string not rejected:", invalidStr
+      return False
   if not test_ERTandCDS2(UTIL.TCO.GPS_MISSION_EPOCH_STR,
                          UTIL.TCO.GPS_MISSION_EPOCH_DELTA):
     return False
@@ -154,6 +183,206 @@ def test_TIMEoperations():
     print "Invalid CUC time 6:", cucTime6Str
     return False
   return True
+# -----------------------------------------------------------------------------
+def test_TIMEcodec():
+  """tests the struct based time codec against the data unit conversion"""
+  pyTime = 1234567890.123456
+  for timeFormat in [CCSDS.TIME.TIME_FORMAT_CDS1, CCSDS.TIME.TIME_FORMAT_CDS2,
+                     CCSDS.TIME.TIME_FORMAT_CUC0, CCSDS.TIME.TIME_FORMAT_CUC1,
+                     CCSDS.TIME.TIME_FORMAT_CUC2, CCSDS.TIME.TIME_FORMAT_CUC3,
+                     CCSDS.TIME.TIME_FORMAT_CUC4]:
+    timeDU = CCSDS.TIME.convertToCCSDS(pyTime, timeFormat)
+    byteSize = CCSDS.TIME.byteArraySize(timeFormat)
+    # pack into an array and a bytearray at an offset
+    for buffer in [array.array("B", "\0" * (byteSize + 3)),
+                   bytearray(byteSize + 3)]:
+      CCSDS.TIME.packTime(buffer, 3, pyTime, timeFormat)
+      if bytearray(buffer[3:]) != timeDU.getBufferString():
+        print "packTime failed for time format", timeFormat
+        return False
+      expectedTime = CCSDS.TIME.convertFromCCSDS(timeDU, timeFormat)
+      if CCSDS.TIME.unpackTime(buffer, 3, timeFormat) != expectedTime:
+        print "unpackTime failed for time format", timeFormat
+        return False
+    dataUnit = CCSDS.DU.DataUnit("\0" * (byteSize + 1))
+    dataUnit.setTime(1, timeFormat, pyTime)
+    if dataUnit.getTime(1, timeFormat) != expectedTime:
+      print "DataUnit time access failed for time format", timeFormat
+      return False
+  # times that do not fit into the time formats
+  for pyTime, timeFormat in [(-0.5, CCSDS.TIME.TIME_FORMAT_CUC2),
+                             (-1.0, CCSDS.TIME.TIME_FORMAT_CDS2),
+                             (float(0x100000000), CCSDS.TIME.TIME_FORMAT_CUC0),
+                             (float(0x100000000), CCSDS.TIME.TIME_FORMAT_CUC4),
+                             (0x10000 * 86400.0, CCSDS.TIME.TIME_FORMAT_CDS1)]:
+    buffer = bytearray(CCSDS.TIME.byteArraySize(timeFormat))
+    try:
+      CCSDS.TIME.packTime(buffer, 0, pyTime, timeFormat)
+      print "packTime did not reject", pyTime, "in time format", timeFormat
+      return False
+    except ValueError:
+      pass
+    if buffer != bytearray(len(buffer)):
+      print "packTime modified the buffer for", pyTime
+      return False
+  maxTime = CCSDS.TIME.unpackTime(bytearray("\xFF" * 5), 0,
+                                  CCSDS.TIME.TIME_FORMAT_CUC1)
+  buffer = bytearray(5)
+  CCSDS.TIME.packTime(buffer, 0, maxTime, CCSDS.TIME.TIME_FORMAT_CUC1)
+  if buffer != bytearray("\xFF" * 5):
+    print "packTime failed for the maximum CUC1 time"
+    return False
+  zeroTime = CCSDS.TIME.unpackTime(array.array("B", testData.ZERO_CUC2_TIME_FIELD),
+                                   0, CCSDS.TIME.TIME_FORMAT_CUC2)
+  if zeroTime != 0:
+    print "Invalid unpacked zero CUC time:", zeroTime
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def test_TIMEarrays():
+  """tests the vectorized time conversion against the scalar path"""
+  if UTIL.BATCH.numpy == None:
+    print "NumPy not available, time arrays not tested"
+    return True
+  # includes times with a fraction of exactly half a microsecond
+  pyTimes = [0.0, 0.0000005, 86399.9999995, 1234567890.123456, 1.5]
+  for timeFormat in [CCSDS.TIME.TIME_FORMAT_CDS1, CCSDS.TIME.TIME_FORMAT_CDS2,
+                     CCSDS.TIME.TIME_FORMAT_CUC0, CCSDS.TIME.TIME_FORMAT_CUC1,
+                     CCSDS.TIME.TIME_FORMAT_CUC2, CCSDS.TIME.TIME_FORMAT_CUC3,
+                     CCSDS.TIME.TIME_FORMAT_CUC4]:
+    timeBytes = CCSDS.TIME.packTimeArray(pyTimes, timeFormat)
+    for i in range(len(pyTimes)):
+      timeDU = CCSDS.TIME.convertToCCSDS(pyTimes[i], timeFormat)
+      if timeBytes[i].tostring() != timeDU.getBufferString():
+        print "packTimeArray failed for", pyTimes[i], "in time format", timeFormat
+        return False
+    unpackedTimes = CCSDS.TIME.unpackTimeArray(timeBytes, timeFormat)
+    for i in range(len(pyTimes)):
+      expectedTime = CCSDS.TIME.unpackTime(timeBytes[i], 0, timeFormat)
+      if unpackedTimes[i] != expectedTime:
+        print "unpackTimeArray failed for", pyTimes[i], "in time format", timeFormat
+        return False
+  # microseconds
+  microTimes = UTIL.BATCH.numpy.array([0, 1, 1234567890123456])
+  timeBytes = CCSDS.TIME.packTimeArray(microTimes, CCSDS.TIME.TIME_FORMAT_CDS2)
+  unpackedTimes = CCSDS.TIME.unpackTimeArray(timeBytes,
+                                             CCSDS.TIME.TIME_FORMAT_CDS2,
+                                             micros=True)
+  if list(unpackedTimes) != list(microTimes):
+    print "microsecond time arrays not symmetrical:", unpackedTimes
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def test_TIMEcorrelation():
+  """tests the time correlation object"""
+  correlation = UTIL.TCO.TimeCorrelation(UTIL.TCO.GPS_MISSION_EPOCH_STR)
+  correlation.setLeapSecondsTableStr(UTIL.TCO.GPS_LEAP_SECONDS_TABLE_STR)
+  leapTime = UTIL.TIME.getTimeFromASDstr("2017.001.00.00.00.000")
+  # GPS time before and after the leap second
+  gpsTime1 = correlation.toEpoch(leapTime - 1.0)
+  gpsTime2 = correlation.toEpoch(leapTime)
+  if gpsTime1 != leapTime - 1.0 - UTIL.TCO.GPS_MISSION_EPOCH_DELTA + 17 or \
+     gpsTime2 != leapTime - UTIL.TCO.GPS_MISSION_EPOCH_DELTA + 18:
+    print "Invalid GPS times around the leap second:", gpsTime1, gpsTime2
+    return False
+  if correlation.fromEpoch(gpsTime1) != leapTime - 1.0 or \
+     correlation.fromEpoch(gpsTime2) != leapTime:
+    print "GPS time correlation not symmetrical"
+    return False
+  # OBT that is 0.5 s ahead and runs 10 ppm too fast
+  correlation.setDrift(0.5, 0.00001, leapTime)
+  obtTime = correlation.toEpoch(leapTime + 1000.0)
+  expectedObtTime = gpsTime2 + 1000.0 + 0.5 + 0.01
+  if abs(obtTime - expectedObtTime) > 0.000001:
+    print "Invalid drifting OBT:", obtTime, expectedObtTime
+    return False
+  if abs(correlation.fromEpoch(obtTime) - (leapTime + 1000.0)) > 0.000001:
+    print "drifting OBT correlation not symmetrical"
+    return False
+  if UTIL.BATCH.numpy == None:
+    return True
+  utcTimes = [leapTime - 1.0, leapTime, leapTime + 1000.0]
+  epochTimes = correlation.toEpochArray(utcTimes)
+  for i in range(len(utcTimes)):
+    if epochTimes[i] != correlation.toEpoch(utcTimes[i]):
+      print "correlation arrays do not match the scalar path"
+      return False
+  utcTimes2 = correlation.fromEpochArray(epochTimes)
+  if abs(utcTimes2 - utcTimes).max() > 0.000001:
+    print "correlation arrays not symmetrical:", utcTimes2
+    return False
+  return True
+# -----------------------------------------------------------------------------
+def test_TIMEclocks():
+  """tests the scaled and the discrete event clock with task timers"""
+  if not isinstance(UTIL.TIME.createClock("scaled 50"), UTIL.TIME.ScaledClock):
+    print "scaled clock not created"
+    return False
+  scaledClock = UTIL.TIME.ScaledClock(100.0, startTime=0.0)
+  realStartTime = time.time()
+  scaledClock.sleep(1.0)
+  realDuration = time.time() - realStartTime
+  if scaledClock.getTime() < 1.0 or realDuration > 0.5:
+    print "invalid scaled clock:", scaledClock.getTime(), realDuration
+    return False
+  # 1 hour of cyclic timers with a discrete event clock
+  UTIL.TIME.setClock(UTIL.TIME.createClock("DISCRETE"))
+  task = UTIL.TASK.Task(isParent=False, isProcessing=False)
+  cycleTimes = []
+  def cyclicCallback():
+    cycleTimes.append(UTIL.TIME.getActualTime())
+    if len(cycleTimes) < 3600:
+      task.createTimeHandler(1000, cyclicCallback)
+    else:
+      task.stop()
+  task.createTimeHandler(1000, cyclicCallback)
+  realStartTime = time.time()
+  task.run()
+  realDuration = time.time() - realStartTime
+  UTIL.TIME.setClock(UTIL.TIME.RealTimeClock())
+  print "1 hour with discrete event clock =", realDuration, "s"
+  for i in range(1, len(cycleTimes)):
+    if abs(cycleTimes[i] - cycleTimes[i - 1] - 1.0) > UTIL.TASK.POLL_CYCLE:
+      print "invalid cycle time:", cycleTimes[i] - cycleTimes[i - 1]
+      return False
+  # GUI task timers with a discrete event clock
+  clock = UTIL.TIME.createClock("DISCRETE")
+  UTIL.TIME.setClock(clock)
+  guiRecorder = GUIrecorder()
+  UI.TKI.s_gui = guiRecorder
+  guiTimes = []
+  def guiCallback():
+    guiTimes.append(UTIL.TIME.getActualTime())
+  def nestedGuiCallback():
+    guiCallback()
+    guiTask.createTimeHandler(500, guiCallback)
+  startTime = clock.getTime()
+  parentTask = UTIL.TASK.s_parentTask
+  try:
+    # timers registered out of deadline order, one registers another timer
+    guiTask = UI.TKI.GUItask()
+    guiTask.createTimeHandler(2500, guiCallback)
+    guiTask.createTimeHandler(1000, guiCallback)
+    guiTask.createTimeHandler(10, nestedGuiCallback)
+    guiTask.createTimeHandler(1000, guiCallback)
+    while len(guiRecorder.timers) > 0:
+      if len(guiRecorder.timers) > 1:
+        print "GUI timers not polled by a single timer"
+        return False
+      ms, handler = guiRecorder.timers.pop()
+      if ms < int(UTIL.TASK.POLL_CYCLE * 1000):
+        print "GUI timer busy-loops with discrete event clock:", ms
+        return False
+      handler()
+  finally:
+    UTIL.TASK.s_parentTask = parentTask
+    UI.TKI.s_gui = None
+    UTIL.TIME.setClock(UTIL.TIME.RealTimeClock())
+  if guiTimes != [startTime + 0.01, startTime + 0.51, startTime + 1.0,
+                  startTime + 1.0, startTime + 2.5]:
+    print "invalid GUI timer times:", [t - startTime for t in guiTimes]
+    return False
+  return True
 
 ########
 # main #
@@ -162,3 +391,15 @@ if __name__ == "__main__":
   print "***** test_TIMEoperations() start"
   retVal = test_TIMEoperations()
   print "***** test_TIMEoperations() done:", retVal
+  print "***** test_TIMEcodec() start"
+  retVal = test_TIMEcodec()
+  print "***** test_TIMEcodec() done:", retVal
+  print "***** test_TIMEarrays() start"
+  retVal = test_TIMEarrays()
+  print "***** test_TIMEarrays() done:", retVal
+  print "***** test_TIMEcorrelation() start"
+  retVal = test_TIMEcorrelation()
+  print "***** test_TIMEcorrelation() done:", retVal
+  print "***** test_TIMEclocks() start"
+  retVal = test_TIMEclocks()
+  print "***** test_TIMEclocks() done:", retVal
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+#******************************************************************************
+# (C) 2017, Stefan Korner, Austria                                            *
+#                                                                             *
+# The Space Python Library is free software; you can redistribute it and/or   *
+# modify it under the terms of the GNU Lesser General Public License as       *
+# published by the Free Software Foundation; either version 2.1 of the        *
+# License, or (at your option) any later version.                             *
+#                                                                             *
+# The Space Python Library is distributed in the hope that it will be useful, *
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              *
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser     *
+# General Public License for more details.                                    *
+#******************************************************************************
+# Unit Tests - performance of the ASD time string conversion                  *
+# usage: testTIMEbenchmark.py [nrTimes]                                       *
+#******************************************************************************
+import sys, time
+import UTIL.TIME
+
+#############
+# functions #
+#############
+def strftimeASDtimeStr(pyTime, withMicros=False):
+  """reference formatter with time.gmtime and time.strftime"""
+  secs = int(pyTime)
+  tmStr = time.strftime("%Y.%j.%H.%M.%S", time.gmtime(secs))
+  if withMicros:
+    mics = min(int(round((pyTime - secs) * 1000000)), 999999)
+    return tmStr + (".%06d" % mics)
+  mils = min(int(round((pyTime - secs) * 1000)), 999)
+  return tmStr + (".%03d" % mils)
+# -----------------------------------------------------------------------------
+def strptimeASDstr(tmStr):
+  """reference parser with time.strptime and time.mktime"""
+  secondsStr, microStr = tmStr.rsplit(".", 1)
+  tm = time.strptime(secondsStr, "%Y.%j.%H.%M.%S")[:-1] + (0,)
+  return float(microStr) / 1000000 + int(time.mktime(tm)) - time.timezone
+# -----------------------------------------------------------------------------
+def measure(function, values):
+  """returns the duration of function calls for all values"""
+  startTime = time.time()
+  for value in values:
+    function(value)
+  return time.time() - startTime
+# -----------------------------------------------------------------------------
+def measureMicros(function, pyTimes):
+  """returns the duration of function calls with withMicros for all times"""
+  startTime = time.time()
+  for pyTime in pyTimes:
+    function(pyTime, True)
+  return time.time() - startTime
+# -----------------------------------------------------------------------------
+def test_TIMEbenchmark(nrTimes=100000):
+  """function to compare the ASD time conversions with the references"""
+  # 10 time stamps per second like in a TM packet stream
+  startTime = 1500000000.0
+  pyTimes = [startTime + i * 0.1 for i in xrange(nrTimes)]
+  timeStrs = [UTIL.TIME.getASDtimeStr(pyTime, withMicros=True)
+              for pyTime in pyTimes]
+  for i in xrange(0, nrTimes, 997):
+    if timeStrs[i] != strftimeASDtimeStr(pyTimes[i], withMicros=True):
+      print "formatter mismatch:", timeStrs[i]
+      return False
+    if UTIL.TIME.getASDtimeStr(pyTimes[i]) != strftimeASDtimeStr(pyTimes[i]):
+      print "formatter mismatch:", UTIL.TIME.getASDtimeStr(pyTimes[i])
+      return False
+    if UTIL.TIME.getTimeFromASDstr(timeStrs[i]) != strptimeASDstr(timeStrs[i]):
+      print "parser mismatch:", timeStrs[i]
+      return False
+  referenceDuration = measure(strftimeASDtimeStr, pyTimes)
+  duration = measure(UTIL.TIME.getASDtimeStr, pyTimes)
+  print "format: strftime = %.3f s, getASDtimeStr = %.3f s, factor = %.1f" % \
+    (referenceDuration, duration, referenceDuration / duration)
+  referenceDuration = measureMicros(strftimeASDtimeStr, pyTimes)
+  duration = measureMicros(UTIL.TIME.getASDtimeStr, pyTimes)
+  print "micros: strftime = %.3f s, getASDtimeStr = %.3f s, factor = %.1f" % \
+    (referenceDuration, duration, referenceDuration / duration)
+  referenceDuration = measure(strptimeASDstr, timeStrs)
+  duration = measure(UTIL.TIME.getTimeFromASDstr, timeStrs)
+  print "parse:  strptime = %.3f s, getTimeFromASDstr = %.3f s, factor = %.1f" % \
+    (referenceDuration, duration, referenceDuration / duration)
+  return True
+
+########
+# main #
+########
+if __name__ == "__main__":
+  nrTimes = 100000
+  if len(sys.argv) > 1:
+    nrTimes = int(sys.argv[1])
+  print "***** test_TIMEbenchmark() start"
+  retVal = test_TIMEbenchmark(nrTimes)
+  print "***** test_TIMEbenchmark() done:", retVal